@@ -8,7 +8,14 @@ import getpass
 from pathlib import Path
 from datetime import datetime
 from scripts.input_parser import main as run_parser
+from scripts.batch_input import run_batch
+from scripts.job_queue import JobQueue
+from scripts.http_cache import set_cache_mode
+from scripts.scheduler import STRATEGIES
+from scripts.work_queue import open_work_queue
+from scripts.worker import Worker, outputs_store, submit
 from scripts.correlation_engine import correlate_data
+from scripts.correlation_query import DEFAULT_HOPS, run_query
 from scripts.visualization import visualize_correlations
 import json
 import traceback
@@ -17,6 +24,11 @@ LOG_DIR = Path("logs")
 LOG_DIR.mkdir(exist_ok=True)
 LAST_RUN_PATH = Path("data/.last_run.json")
 
+# CLI fields that define a run's selectors; stored so --resume can replay them
+RUN_INPUT_FIELDS = (
+    "input", "phone", "email", "username", "target", "user_id", "discriminator", "batch_input"
+)
+
 CONFIG_DIR = Path("config/modules_config")
 CONFIG_HASH_FILE = CONFIG_DIR / ".config_hash.checksum"
 
@@ -44,6 +56,39 @@ def save_last_run(data):
         json.dump(data, f, indent=4)
 
 
+def run_inputs(args) -> dict:
+    return {
+        field: str(getattr(args, field))
+        for field in RUN_INPUT_FIELDS
+        if getattr(args, field, None)
+    }
+
+
+def open_run(args, queue: JobQueue) -> bool:
+    """
+    Begin a new run in the job queue, or with --resume reopen the last
+    interrupted one and restore its selectors onto `args`. Returns False if
+    there was nothing to resume.
+    """
+    if args.resume:
+        inputs = queue.resume()
+        if inputs is None:
+            return False
+        for field in RUN_INPUT_FIELDS:
+            setattr(args, field, inputs.get(field))
+        if args.batch_input:
+            args.batch_input = Path(args.batch_input)
+        if not args.silent:
+            print(f"🔁 Resuming run {queue.run_id}: {queue.counts()}")
+        return True
+
+    interrupted = queue.interrupted()
+    if interrupted and not args.silent:
+        print(f"ℹ️ Run {interrupted['id']} did not finish; pass --resume to continue it.")
+    queue.begin(run_inputs(args))
+    return True
+
+
 def main():
     parser = argparse.ArgumentParser(description="🧠 Auton-OSINT Suite Launcher")
     parser.add_argument(
@@ -86,9 +131,162 @@ def main():
     parser.add_argument(
         "--validate-config", action="store_true", help="Run config checksum check."
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Worker processes for parsing outputs during correlation.",
+    )
+    parser.add_argument(
+        "--live",
+        action="store_true",
+        help="Correlate and visualize after each username completes.",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        help="Maximum lookups in flight across all modules.",
+    )
+    parser.add_argument(
+        "--priority",
+        action="append",
+        metavar="SELECTOR=N",
+        help="Run SELECTOR's lookups ahead of lower priorities (default 0); repeatable.",
+    )
+    parser.add_argument(
+        "--schedule",
+        choices=STRATEGIES,
+        help="Lookup ordering: sejf (shortest expected first), ljf or fifo.",
+    )
+    cache_group = parser.add_mutually_exclusive_group()
+    cache_group.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Bypass the HTTP response cache in cache/cache.db entirely.",
+    )
+    cache_group.add_argument(
+        "--refresh",
+        action="store_true",
+        help="Ignore cached HTTP responses but store the fresh ones.",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Resume the last interrupted run, retrying only unfinished lookups.",
+    )
+
+    subparsers = parser.add_subparsers(dest="command")
+    query_parser = subparsers.add_parser(
+        "query", help="Look up an entity's neighborhood in the correlation index."
+    )
+    query_parser.add_argument(
+        "--entity", required=True, help="Entity as <type>:<value>, e.g. ip:1.2.3.4"
+    )
+    query_parser.add_argument(
+        "--hops",
+        type=int,
+        default=DEFAULT_HOPS,
+        help="How many artifact hops to expand from the entity.",
+    )
+    query_parser.add_argument(
+        "--json", action="store_true", help="Print the result as JSON."
+    )
+
+    submit_parser = subparsers.add_parser(
+        "submit", help="Queue lookups on the shared work queue for `worker` processes."
+    )
+    submit_parser.add_argument(
+        "selectors", nargs="*", help="Phones, emails, usernames, domains or IPs."
+    )
+    submit_parser.add_argument(
+        "--batch-input", type=Path, help="Also queue every selector in this file."
+    )
+    submit_parser.add_argument("--user-id", help="Optional platform-specific ID.")
+    submit_parser.add_argument("--discriminator", help="Optional tag/discriminator.")
+    submit_parser.add_argument(
+        "--queue", help="Work queue URL: sqlite:<path> or file:<shared dir>."
+    )
+
+    worker_parser = subparsers.add_parser(
+        "worker", help="Lease and run lookups from the shared work queue."
+    )
+    worker_parser.add_argument(
+        "--queue", help="Work queue URL: sqlite:<path> or file:<shared dir>."
+    )
+    worker_parser.add_argument(
+        "--concurrency", type=int, help="Lookups this worker runs at once."
+    )
+    worker_parser.add_argument("--worker-id", help="Name in leases (default host-pid).")
+    worker_parser.add_argument(
+        "--outputs", type=Path, help="Shared outputs store to copy results into."
+    )
+    worker_parser.add_argument(
+        "--exit-when-empty",
+        action="store_true",
+        help="Exit once no job is queued or leased instead of polling forever.",
+    )
+
+    correlate_parser = subparsers.add_parser(
+        "correlate", help="Correlate the shared outputs store that workers copy into."
+    )
+    correlate_parser.add_argument(
+        "--outputs",
+        type=Path,
+        help="Outputs store to correlate (default work_queue.outputs).",
+    )
+    correlate_parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Worker processes for parsing outputs during correlation.",
+    )
 
     args = parser.parse_args()
     start_time = time.time()
+    if args.no_cache or args.refresh:
+        set_cache_mode("off" if args.no_cache else "refresh")
+
+    if args.command == "submit":
+        with open_work_queue(args.queue) as queue:
+            added = submit(
+                queue,
+                args.selectors,
+                batch_input=args.batch_input,
+                options={"user_id": args.user_id, "discriminator": args.discriminator},
+            )
+            print(f"📬 Queued {added} new lookups · {queue.stats()}")
+        return
+
+    if args.command == "worker":
+        with open_work_queue(args.queue) as queue:
+            worker = Worker(
+                queue,
+                worker_id=args.worker_id,
+                concurrency=args.concurrency,
+                outputs=args.outputs,
+            )
+            print(f"👷 Worker {worker.worker_id} polling the work queue…")
+            try:
+                counts = worker.run(exit_when_empty=args.exit_when_empty)
+            except KeyboardInterrupt:
+                worker.stop()
+                counts = worker.counts
+            print(f"✅ Worker finished: {counts} · queue {queue.stats()}")
+        return
+
+    if args.command == "correlate":
+        outputs = outputs_store(args.outputs)
+        print(f"📎 Correlating {outputs}…")
+        correlate_data(workers=args.workers, outputs=outputs)
+        return
+
+    if args.command == "query":
+        try:
+            run_query(args.entity, hops=args.hops, as_json=args.json)
+        except ValueError as e:
+            print(f"❌ {e}")
+            sys.exit(1)
+        return
 
     if args.validate_config:
         if not validate_config_checksum():
@@ -121,18 +319,27 @@ def main():
             print(f"🧪 Module test for: {args.module_test} (not implemented)")
             return
 
-        if args.batch_input:
-            print(
-                f"📂 Batch input mode: {args.batch_input} (not implemented)"
-            )  # Add support later
-            return
+        with JobQueue() as queue:
+            if not open_run(args, queue):
+                print("⚠️ No interrupted run to resume.")
+                return
+
+            if args.batch_input:
+                if not args.silent:
+                    print(f"📂 Batch input mode: {args.batch_input}")
+                run_batch(args.batch_input, args, queue=queue)
+            else:
+                run_parser(override_flags=args, queue=queue)
 
-        run_parser(override_flags=args)
+            counts = queue.finish()
+            run_id = queue.run_id
+        if counts.get("failed") and not args.silent:
+            print(f"⚠️ {counts['failed']} lookups failed; `--resume` retries them.")
 
         if not args.skip_correlation:
             if not args.silent:
                 print("📎 Starting correlation engine...")
-            correlate_data()
+            correlate_data(workers=args.workers)
 
             if not args.headless:
                 if not args.silent:
@@ -142,7 +349,7 @@ def main():
         if args.output_summary:
             print(f"📝 Summary output ({args.output_summary}) not implemented yet.")
 
-        save_last_run({"timestamp": datetime.now().isoformat()})
+        save_last_run({"timestamp": datetime.now().isoformat(), "run_id": run_id})
 
         if not args.silent:
             print("\n✅ All processes completed successfully.")
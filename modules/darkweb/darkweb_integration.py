@@ -3,6 +3,7 @@ import yaml
 import logging
 from datetime import datetime
 from pathlib import Path
+from scripts.http_cache import cached_get
 
 # Load Configurations
 CONFIG_PATH = "config/modules_config/darkweb_config.yaml"
@@ -31,7 +32,7 @@ def search_darksearch(keyword: str, limit: int = config["query_limit"]) -> dict:
     headers = {"Accept": "application/json"}
 
     try:
-        response = requests.get(
+        response = cached_get(
             api_url, params=params, headers=headers, timeout=config["timeout"]
         )
         response.raise_for_status()
@@ -4,6 +4,7 @@ import socket
 from pathlib import Path
 from datetime import datetime
 
+from scripts.correlation_engine import index_output
 from .utils import (
     query_dns_records,
     query_whois,
@@ -67,6 +68,7 @@ def domain_ip_lookup(target: str) -> str:
     out_path = OUTPUT_DIR / f"domain_ip_lookup_{safe_target}_{timestamp}.json"
     with open(out_path, "w") as f:
         json.dump(result, f, indent=4)
+    index_output(out_path, result)
 
     logging.info(f"Domain/IP lookup complete. Results saved to {out_path}")
     return str(out_path)
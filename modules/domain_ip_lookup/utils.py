@@ -1,12 +1,12 @@
 import json
 import socket
-import requests
 import whois
 import dns.resolver
 from pathlib import Path
 from typing import List, Optional
 import yaml
 import logging
+from scripts.http_cache import cached_get
 
 # === PATH SETUP ===
 ROOT = Path(__file__).parents[2]
@@ -66,7 +66,7 @@ def query_reverse_dns(ip: str) -> Optional[str]:
 def query_ip_geolocation(ip: str) -> Optional[dict]:
     endpoint = CONFIG["features"]["ip_geolocation"]["endpoint"].format(ip=ip)
     try:
-        resp = requests.get(endpoint, headers=HEADERS, timeout=10)
+        resp = cached_get(endpoint, headers=HEADERS, timeout=10)
         return resp.json() if resp.status_code == 200 else None
     except Exception as e:
         logging.warning(f"Geolocation failed for {ip}: {e}")
@@ -77,7 +77,7 @@ def query_ip_geolocation(ip: str) -> Optional[dict]:
 def query_asn(ip: str) -> Optional[dict]:
     endpoint = CONFIG["features"]["asn_lookup"]["endpoint"].format(ip=ip)
     try:
-        resp = requests.get(endpoint, headers=HEADERS, timeout=10)
+        resp = cached_get(endpoint, headers=HEADERS, timeout=10)
         return resp.json() if resp.status_code == 200 else None
     except Exception as e:
         logging.warning(f"ASN lookup failed for {ip}: {e}")
@@ -102,7 +102,7 @@ def query_blacklists(ip: str) -> Optional[dict]:
     headers[abuse_entry["headers"]["Key-Header"]] = "YOUR_API_KEY"  # replace as needed
 
     try:
-        resp = requests.get(
+        resp = cached_get(
             endpoint,
             headers=headers,
             params={"ipAddress": ip, "maxAgeInDays": 90},
@@ -1,4 +1,3 @@
-import requests
 import subprocess
 import logging
 import yaml
@@ -6,6 +5,8 @@ import json
 import re
 from pathlib import Path
 from datetime import datetime
+from scripts.correlation_engine import index_output
+from scripts.http_cache import cached_get
 
 # Config setup
 CONFIG_PATH = (
@@ -34,7 +35,7 @@ ansi_escape = re.compile(r"\x1B[@-_][0-?]*[ -/]*[@-~]")
 def check_xposed(email):
     try:
         url = f"https://api.xposedornot.com/v1/check-email/{email}"
-        resp = requests.get(url, timeout=config["xposed_timeout"])
+        resp = cached_get(url, timeout=config["xposed_timeout"])
         if resp.status_code == 200:
             data = resp.json()
             breaches = data.get("breaches", [])
@@ -75,7 +76,8 @@ def check_h8mail(email):
 
 def verify_email(email):
     logger.info(f"Verifying email: {email}")
-    results = {}
+    # The address itself is what links this output to the others
+    results = {"email": email}
 
     # First: Check via XposedOrNot
     xposed_results = check_xposed(email)
@@ -96,6 +98,7 @@ def verify_email(email):
 
         with open(filename, "w") as f:
             json.dump(results, f, indent=4)
+        index_output(filename, results)
 
         logger.info(f"Email verification results saved to {filename}")
     except Exception as e:
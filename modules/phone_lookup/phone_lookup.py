@@ -6,6 +6,7 @@ import json
 from pathlib import Path
 from datetime import datetime
 from .utils import parse_phoneinfoga_output
+from scripts.correlation_engine import index_output
 
 def mask_phone_number(phone_number):
     if len(phone_number) > 4:
@@ -59,6 +60,7 @@ def phone_lookup(phone_number):
         # Write to JSON file
         with open(filename, "w") as json_file:
             json.dump(structured_data, json_file, indent=4)
+        index_output(filename, structured_data)
 
         logging.info(
             f"Phone lookup and parsing successful, results saved in {filename}"
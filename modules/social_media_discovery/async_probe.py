@@ -0,0 +1,182 @@
+import atexit
+import asyncio
+import logging
+import threading
+from typing import Optional
+
+import aiohttp
+from aiohttp_socks import ProxyConnector
+
+from .utils import (
+    CHUNK_SIZE,
+    REQUEST_HEADERS,
+    BodyScanner,
+    load_social_config,
+    probe_key,
+    verdict_from_headers,
+)
+from scripts.http_cache import get_cache
+from scripts.rate_limiter import get_limiter
+
+# Requests in flight across every username being probed in this process
+DEFAULT_CONCURRENCY = 64
+# Connections per platform host, so one site never sees a burst from us
+DEFAULT_LIMIT_PER_HOST = 4
+DEFAULT_TIMEOUT = 10
+# Resolved DNS answers are reused this long (seconds)
+DNS_CACHE_TTL = 300
+
+
+def load_probe_config() -> dict:
+    """The `probe` block of social_media_discovery_config.yaml ({} if absent)."""
+    return load_social_config().get("probe") or {}
+
+
+def make_connector(proxy_url: Optional[str], limit: int, limit_per_host: int):
+    """
+    Pooled connector for the probe session; with `proxy_url` every
+    connection goes through that SOCKS/HTTP proxy (Tor). socks5h:// is
+    accepted as socks5 with hostnames resolved by the proxy.
+    """
+    if not proxy_url:
+        return aiohttp.TCPConnector(
+            limit=limit, limit_per_host=limit_per_host, ttl_dns_cache=DNS_CACHE_TTL
+        )
+    rdns = proxy_url.startswith("socks5h://")
+    if rdns:
+        proxy_url = "socks5://" + proxy_url[len("socks5h://"):]
+    return ProxyConnector.from_url(
+        proxy_url, rdns=rdns, limit=limit, limit_per_host=limit_per_host
+    )
+
+
+class ProbeEngine:
+    """
+    Check many profile URLs concurrently on one asyncio loop.
+
+    The loop runs in a daemon thread and owns a single aiohttp session, so
+    connections and DNS answers are pooled across every username probed in
+    the process, and the dispatcher threads running social_discovery all
+    share the same global and per-host connection limits. probe() blocks
+    the calling thread until its URLs are checked, which takes roughly one
+    round trip when the limits allow all of them at once.
+    """
+
+    def __init__(
+        self,
+        concurrency: int = None,
+        limit_per_host: int = None,
+        timeout: float = None,
+        proxy_url: str = None,
+    ):
+        config = load_probe_config()
+        self.concurrency = concurrency or config.get("concurrency", DEFAULT_CONCURRENCY)
+        self.limit_per_host = (
+            limit_per_host
+            if limit_per_host is not None
+            else config.get("limit_per_host", DEFAULT_LIMIT_PER_HOST)
+        )
+        self.timeout = timeout or config.get("timeout", DEFAULT_TIMEOUT)
+        self.proxy_url = proxy_url
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(
+            target=self.loop.run_forever, name="social-probe", daemon=True
+        )
+        self.thread.start()
+        self.session = asyncio.run_coroutine_threadsafe(self._open(), self.loop).result()
+
+    async def _open(self):
+        return aiohttp.ClientSession(
+            connector=make_connector(self.proxy_url, self.concurrency, self.limit_per_host),
+            headers=REQUEST_HEADERS,
+            timeout=aiohttp.ClientTimeout(total=self.timeout),
+        )
+
+    def close(self):
+        if self.loop.is_closed():
+            return
+        asyncio.run_coroutine_threadsafe(self.session.close(), self.loop).result()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+        self.loop.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    async def check(self, url: str, rule: dict = None) -> Optional[bool]:
+        """
+        True if `url` answers 200 without a not-found page, None if the
+        request failed or was throttled. Requests are paced by the shared
+        per-host rate limiter. The body is streamed only until `rule` can
+        decide (see utils.BodyScanner).
+        """
+        limiter = get_limiter()
+        try:
+            await limiter.acquire_async(url)
+            async with self.session.get(url) as resp:
+                if limiter.observe(url, resp.status, resp.headers) is not None:
+                    return None
+                if resp.status >= 500:
+                    return None  # server trouble says nothing about the profile
+                verdict = verdict_from_headers(resp.status, resp.headers)
+                if verdict is not None:
+                    return verdict
+                scanner = BodyScanner(rule)
+                async for chunk in resp.content.iter_chunked(CHUNK_SIZE):
+                    if scanner.feed(chunk) is not None:
+                        break
+                logging.debug(f"{url}: {scanner.reason or 'no marker'} after {scanner.seen} bytes")
+                return scanner.result()
+        except Exception as e:
+            logging.warning(f"Request to {url} failed: {e!r}")
+            return None
+
+    async def _probe(self, urls: list, rules: list) -> list:
+        return await asyncio.gather(*(self.check(url, rule) for url, rule in zip(urls, rules)))
+
+    def probe(self, urls: list, rules: list = None) -> list:
+        """
+        Check `urls` concurrently, each under the matching entry of `rules`
+        (default rule if omitted); returns one bool per URL, in order.
+        """
+        urls = list(urls)
+        rules = list(rules) if rules is not None else [None] * len(urls)
+        # Verdicts cached by earlier runs skip the network entirely
+        cache = get_cache()
+        keys = [probe_key(url, rule) for url, rule in zip(urls, rules)]
+        verdicts = [cache.get_verdict(key) for key in keys]
+        todo = [i for i, verdict in enumerate(verdicts) if verdict is None]
+        if todo:
+            fresh = asyncio.run_coroutine_threadsafe(
+                self._probe([urls[i] for i in todo], [rules[i] for i in todo]), self.loop
+            ).result()
+            for i, verdict in zip(todo, fresh):
+                if verdict is not None:
+                    cache.put_verdict(keys[i], urls[i], verdict)
+                verdicts[i] = bool(verdict)
+        return verdicts
+
+
+_engines = {}
+_engines_lock = threading.Lock()
+
+
+def get_engine(proxy_url: str = None) -> ProbeEngine:
+    """The process-wide engine for `proxy_url`, started on first use."""
+    with _engines_lock:
+        engine = _engines.get(proxy_url)
+        if engine is None:
+            engine = _engines[proxy_url] = ProbeEngine(proxy_url=proxy_url)
+        return engine
+
+
+@atexit.register
+def close_engines():
+    with _engines_lock:
+        engines = list(_engines.values())
+        _engines.clear()
+    for engine in engines:
+        engine.close()
@@ -2,14 +2,15 @@
 
 import json
 import logging
-import requests
 from pathlib import Path
 from typing import Optional
 from datetime import datetime
+from scripts.correlation_engine import index_output
+from .async_probe import get_engine
 from .utils import (
     generate_platform_urls,
     get_enabled_platforms,
-    validate_url,
+    platform_rule,
     sanitize_result,
     load_tor_config,
     save_normalized_social_discovery,  # NEW
@@ -40,25 +41,22 @@ def social_discovery(
     platforms = get_enabled_platforms()
     urls_to_check = generate_platform_urls(platforms, username, user_id, discriminator)
 
-    session = requests.Session()
+    proxy_url = None
     if TOR_CONFIG.get("enabled", False):
-        session.proxies = {
-            "http": TOR_CONFIG.get("tor_proxy_url", "socks5h://127.0.0.1:9050"),
-            "https": TOR_CONFIG.get("tor_proxy_url", "socks5h://127.0.0.1:9050"),
-        }
-
-    discovered = []
-
-    for entry in urls_to_check:
-        platform = entry["site"]
-        url = entry["url"]
-
-        try:
-            logging.info(f"Checking {platform}: {url}")
-            if validate_url(url, session=session):
-                discovered.append({"site": platform, "url": url})
-        except Exception as e:
-            logging.warning(f"Error checking {platform} at {url}: {e}")
+        proxy_url = TOR_CONFIG.get("tor_proxy_url", "socks5h://127.0.0.1:9050")
+
+    # All platforms are probed at once on the shared async engine
+    logging.info(f"Checking {len(urls_to_check)} platforms for {username}")
+    rules = {site: platform_rule(info) for site, info in platforms.items()}
+    found = get_engine(proxy_url).probe(
+        [entry["url"] for entry in urls_to_check],
+        [rules[entry["site"]] for entry in urls_to_check],
+    )
+    discovered = [
+        {"site": entry["site"], "url": entry["url"]}
+        for entry, hit in zip(urls_to_check, found)
+        if hit
+    ]
 
     result = sanitize_result(username, discovered)
 
@@ -69,6 +67,7 @@ def social_discovery(
 
     with open(out_path, "w") as f:
         json.dump(result, f, indent=4)
+    index_output(out_path, result)
 
     logging.info(f"Discovery results saved to {out_path}")
 
@@ -5,12 +5,24 @@ from datetime import datetime
 from typing import Optional
 import requests
 import json
+from scripts.correlation_engine import index_output
+from scripts.http_cache import get_cache, request_key
+from scripts.rate_limiter import get_limiter
+from scripts.signatures import POSITIVE, compile_signatures
 
 # === SETUP ===
 ROOT_DIR = Path(__file__).parents[2]
 CONFIG_PATH = ROOT_DIR / "config/modules_config/social_media_discovery_config.yaml"
 TOR_CONFIG_PATH = ROOT_DIR / "config/modules_config/tor_darkweb_config.yaml"
 LOG_PATH = ROOT_DIR / "logs/social_media_discovery.log"
+REQUEST_HEADERS = {"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64)"}
+# A 200 page containing any of these is a soft 404
+NOT_FOUND_MARKERS = ("not found", "404", "doesn’t exist", "page not available")
+# Body bytes inspected per probe unless a platform sets inspect_bytes
+DEFAULT_INSPECT_BYTES = 64 * 1024
+CHUNK_SIZE = 8192
+# Only bodies of these content types can hold a not-found page
+TEXT_CONTENT_TYPES = ("text/", "json", "xml", "javascript")
 
 logging.basicConfig(
     filename=LOG_PATH,
@@ -75,24 +87,123 @@ def check_tor():
     return tor.get("enabled", False)
 
 
-def validate_url(url: str, session=None, timeout=10) -> bool:
-    headers = {"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64)"}
+def platform_rule(info: dict = None) -> dict:
+    """
+    How to judge a platform's profile page, from its config entry:
+      inspect_bytes     body bytes to read at most (probe.inspect_bytes)
+      found_markers     text that proves the profile exists
+      not_found_markers extra soft-404 text besides probe.not_found_markers
+    All markers are compiled into one byte-level Signatures matcher, built
+    once per distinct marker set.
+    """
+    info = info or {}
+    probe = CONFIG.get("probe") or {}
+    inspect_bytes = info.get("inspect_bytes", probe.get("inspect_bytes", DEFAULT_INSPECT_BYTES))
+    found = tuple(info.get("found_markers", ()))
+    not_found = (
+        *probe.get("not_found_markers", NOT_FOUND_MARKERS),
+        *info.get("not_found_markers", ()),
+    )
+    return {
+        "inspect_bytes": inspect_bytes,
+        "signatures": compile_signatures(found, not_found, binary=True),
+        # Cached verdicts are only reused under the same rule
+        "variant": json.dumps([inspect_bytes, found, not_found]),
+    }
+
+
+def probe_key(url: str, rule: dict = None) -> str:
+    """Response-cache key for a profile probe of `url` under `rule`."""
+    return request_key("PROBE", url, variant=(rule or platform_rule())["variant"])
+
+
+def verdict_from_headers(status: int, headers) -> Optional[bool]:
+    """Decide a probe from the response head alone, or None to read the body."""
+    if status != 200:
+        return False
+    content_type = (headers.get("Content-Type") or "").lower()
+    if content_type and not any(t in content_type for t in TEXT_CONTENT_TYPES):
+        return True
+    if headers.get("Content-Length") == "0":
+        return True
+    return None
+
+
+class BodyScanner:
+    """
+    Incremental soft-404 check over a response body.
+
+    feed() takes raw chunks and returns the verdict as soon as one is
+    known: whichever marker appears first decides (False for not-found,
+    True for found), and a body with neither is found once the rule's
+    byte cap is reached. `reason` holds the deciding (kind, marker). The
+    last few bytes of each chunk are carried over so markers split across
+    chunks still match.
+    """
+
+    def __init__(self, rule: dict = None):
+        rule = rule or platform_rule()
+        self.signatures = rule["signatures"]
+        self.limit = rule["inspect_bytes"]
+        self.overlap = max(self.signatures.longest - 1, 0)
+        self.tail = b""
+        self.seen = 0
+        self.verdict = None
+        self.reason = None
+
+    def feed(self, chunk: bytes) -> Optional[bool]:
+        if self.verdict is not None:
+            return self.verdict
+        chunk = chunk[: self.limit - self.seen]
+        self.seen += len(chunk)
+        window = self.tail + chunk
+        self.reason = self.signatures.search(window)
+        if self.reason is not None:
+            self.verdict = self.reason[0] == POSITIVE
+        elif self.seen >= self.limit:
+            self.verdict = True
+        self.tail = window[-self.overlap:] if self.overlap else b""
+        return self.verdict
+
+    def result(self) -> bool:
+        """The verdict; a body that ended without any marker counts as found."""
+        return True if self.verdict is None else self.verdict
+
+
+def validate_url(url: str, session=None, timeout=10, rule: dict = None) -> bool:
+    """
+    True if `url` looks like an existing profile. The body is streamed and
+    only read until the platform rule can decide (see BodyScanner). Verdicts
+    are kept in the shared response cache.
+    """
+    cache = get_cache()
+    key = probe_key(url, rule)
+    verdict = cache.get_verdict(key)
+    if verdict is not None:
+        return verdict
     session = session or requests.Session()
 
+    limiter = get_limiter()
     try:
-        resp = session.get(url, headers=headers, timeout=timeout)
-        if resp.status_code != 200:
-            return False
-        page = resp.text.lower()
-        if any(
-            x in page
-            for x in ["not found", "404", "doesn’t exist", "page not available"]
-        ):
-            return False
-        return True
+        limiter.acquire(url)
+        with session.get(url, headers=REQUEST_HEADERS, timeout=timeout, stream=True) as resp:
+            if (
+                limiter.observe(url, resp.status_code, resp.headers) is not None
+                or resp.status_code >= 500
+            ):
+                return False  # throttled or failing: not cached
+            verdict = verdict_from_headers(resp.status_code, resp.headers)
+            if verdict is None:
+                scanner = BodyScanner(rule)
+                for chunk in resp.iter_content(CHUNK_SIZE):
+                    if scanner.feed(chunk) is not None:
+                        break
+                verdict = scanner.result()
     except Exception as e:
         logging.warning(f"Request to {url} failed: {e}")
         return False
+    cache.put_verdict(key, url, verdict)
+    return verdict
 
 
 def sanitize_result(username, platform_results):
@@ -119,5 +230,6 @@ def save_normalized_social_discovery(username: str, discovered: list) -> Path:
 
     with open(output_path, "w") as f:
         json.dump(normalized, f, indent=4)
+    index_output(output_path, normalized)
 
     return output_path
@@ -1,11 +1,11 @@
 # modules/tor_darkweb_integration/utils.py
 
 import yaml
-import subprocess
 import requests
 import logging
 from pathlib import Path
 from typing import List
+from scripts.tor_manager import TorUnavailable, get_tor
 
 ROOT_DIR = Path(__file__).parents[2]
 CONFIG_PATH = ROOT_DIR / "config/modules_config/tor_darkweb_config.yaml"
@@ -27,35 +27,24 @@ def load_tor_config():
 TOR_CONFIG = load_tor_config()
 
 
-# === Systemctl Controls ===
+# === Tor Controls (shared scripts.tor_manager instance) ===
 def start_tor():
     try:
         logging.info("Starting Tor...")
-        subprocess.run(
-            ["systemctl", "start", TOR_CONFIG["systemctl_service"]], check=True
-        )
-    except Exception as e:
+        get_tor().start()
+    except TorUnavailable as e:
         logging.error(f"Failed to start Tor: {e}")
 
 
 def stop_tor():
-    try:
-        logging.info("Stopping Tor...")
-        subprocess.run(
-            ["systemctl", "stop", TOR_CONFIG["systemctl_service"]], check=True
-        )
-    except Exception as e:
-        logging.error(f"Failed to stop Tor: {e}")
+    logging.info("Stopping Tor...")
+    get_tor().stop()
 
 
 def restart_tor():
-    try:
-        logging.info("Restarting Tor...")
-        subprocess.run(
-            ["systemctl", "restart", TOR_CONFIG["systemctl_service"]], check=True
-        )
-    except Exception as e:
-        logging.error(f"Failed to restart Tor: {e}")
+    """New circuits for later requests; Tor itself keeps running."""
+    logging.info("Rotating Tor circuits...")
+    get_tor().rotate()
 
 
 # === Status Check ===
@@ -63,8 +52,9 @@ def is_tor_enabled():
     return TOR_CONFIG.get("is_enabled", False)
 
 
-def get_proxy_session():
-    proxy = TOR_CONFIG.get("proxy_url", "socks5h://127.0.0.1:9050")
+def get_proxy_session(circuit: str = None):
+    """A requests session over Tor, on `circuit`'s own isolated circuit if given."""
+    proxy = get_tor().proxy(circuit)
     s = requests.Session()
     s.proxies = {"http": proxy, "https": proxy}
     s.verify = TOR_CONFIG.get("verify_https", True)
@@ -74,7 +64,7 @@ def get_proxy_session():
 def test_onion_access(onion_url: str) -> bool:
     try:
         timeout = TOR_CONFIG.get("timeout", 10)
-        session = get_proxy_session()
+        session = get_proxy_session(onion_url)
         resp = session.get(onion_url, timeout=timeout)
         return resp.status_code == 200
     except Exception as e:
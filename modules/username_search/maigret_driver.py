@@ -0,0 +1,168 @@
+import atexit
+import asyncio
+import logging
+import threading
+from pathlib import Path
+from typing import Optional
+
+import yaml
+
+CONFIG_PATH = (
+    Path(__file__).parents[2] / "config/modules_config/username_search_config.yaml"
+)
+# Sites checked per username, by rank (what the CLI ran with --top-sites)
+DEFAULT_TOP_SITES = 750
+# Seconds per site request; maigret_timeout bounds a whole search
+DEFAULT_REQUEST_TIMEOUT = 10
+DEFAULT_MAX_CONNECTIONS = 50
+
+
+def load_maigret_config() -> dict:
+    """The username_search section, with its `maigret` block merged in."""
+    with open(CONFIG_PATH, "r") as f:
+        config = yaml.safe_load(f)["username_search"] or {}
+    return {**config, **(config.get("maigret") or {})}
+
+
+def available() -> bool:
+    """True if the maigret package can be imported in this process."""
+    try:
+        import maigret  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def is_claimed(check) -> bool:
+    """True for a maigret check result whose status is Claimed."""
+    status = getattr(check, "status", check)
+    return str(getattr(status, "value", status)).lower() == "claimed"
+
+
+def report_from_results(username: str, results: dict) -> dict:
+    """
+    Turn maigret's {site: {"site", "status", "url_user", ...}} results into
+    the report shape parse_username_output reads: {"username", "sites":
+    {site: {"status", "url_user", "category", "tags"}}}.
+    """
+    sites = {}
+    for name, entry in (results or {}).items():
+        site = entry.get("site")
+        sites[name] = {
+            "status": "claimed" if is_claimed(entry.get("status")) else "available",
+            "url_user": entry.get("url_user"),
+            "category": None,
+            "tags": list(getattr(site, "tags", None) or []),
+        }
+    return {"username": username, "sites": sites}
+
+
+class MaigretDriver:
+    """
+    Run Maigret searches in-process through its async library API.
+
+    The site database is loaded and ranked once, and searches run on one
+    asyncio loop in a daemon thread, so every username after the first
+    skips interpreter startup and database parsing. Dispatcher threads
+    searching different usernames share that loop and its connection
+    limit. search() blocks the calling thread and returns the report as
+    a dict; nothing is written to disk. Each search can go through its
+    own proxy, e.g. a Tor circuit from scripts.tor_manager.
+    """
+
+    def __init__(
+        self,
+        top_sites: int = None,
+        request_timeout: float = None,
+        max_connections: int = None,
+        db_path: str = None,
+    ):
+        import maigret
+        from maigret.notify import QueryNotify
+
+        config = load_maigret_config()
+        self.maigret = maigret
+        self.notify = QueryNotify()
+        self.top_sites = top_sites or config.get("top_sites", DEFAULT_TOP_SITES)
+        self.request_timeout = request_timeout or config.get(
+            "request_timeout", DEFAULT_REQUEST_TIMEOUT
+        )
+        self.max_connections = max_connections or config.get(
+            "max_connections", DEFAULT_MAX_CONNECTIONS
+        )
+        db_path = db_path or config.get("db_path") or (
+            Path(maigret.__file__).parent / "resources/data.json"
+        )
+        db = maigret.MaigretDatabase().load_from_path(str(db_path))
+        self.sites = db.ranked_sites_dict(top=self.top_sites, disabled=False, id_type="username")
+        logging.info(f"Loaded {len(self.sites)} Maigret sites from {db_path}")
+        self.logger = logging.getLogger("maigret")
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(
+            target=self.loop.run_forever, name="maigret", daemon=True
+        )
+        self.thread.start()
+
+    def close(self):
+        if self.loop.is_closed():
+            return
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+        self.loop.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    async def _search(self, username: str, proxy: str = None) -> dict:
+        return await self.maigret.search(
+            username=username,
+            site_dict=self.sites,
+            logger=self.logger,
+            query_notify=self.notify,
+            proxy=proxy,
+            timeout=self.request_timeout,
+            is_parsing_enabled=False,
+            id_type="username",
+            max_connections=self.max_connections,
+            no_progressbar=True,
+        )
+
+    def search(self, username: str, timeout: float = None, proxy: str = None) -> Optional[dict]:
+        """
+        Check `username` on the loaded sites, through `proxy` if given; the
+        report (see report_from_results), or None if the search failed or
+        ran longer than `timeout` seconds.
+        """
+        future = asyncio.run_coroutine_threadsafe(self._search(username, proxy), self.loop)
+        try:
+            results = future.result(timeout)
+        except Exception as e:
+            future.cancel()
+            logging.error(f"Maigret search for {username} failed: {e!r}")
+            return None
+        return report_from_results(username, results)
+
+
+_driver = None
+_driver_lock = threading.Lock()
+
+
+def get_driver() -> MaigretDriver:
+    """The process-wide driver, loaded on first use."""
+    global _driver
+    with _driver_lock:
+        if _driver is None:
+            _driver = MaigretDriver()
+        return _driver
+
+
+@atexit.register
+def close_driver():
+    global _driver
+    with _driver_lock:
+        driver, _driver = _driver, None
+    if driver is not None:
+        driver.close()
@@ -4,7 +4,9 @@ import json
 import yaml
 from pathlib import Path
 from datetime import datetime
-import time
+from . import maigret_driver
+from .maigret_driver import get_driver
+from scripts.tor_manager import TorUnavailable, get_tor
 from .utils import move_maigret_output, parse_username_output, purge_rogue_txt_files
 
 # === CONFIG & LOGGING ===
@@ -27,33 +29,44 @@ MAIGRET_REPORTS_DIR = MAIGRET_DIR / "reports"
 
 
 # === TOR CONTROL ===
-def start_tor():
+def tor_circuit(username):
+    """
+    A SOCKS URL on this username's own isolated Tor circuit, or None if
+    Tor is unavailable. Tor is started once per process and stays up.
+    """
     try:
-        logging.info("Starting Tor service...")
-        subprocess.run(["systemctl", "start", "tor"], check=True)
-        time.sleep(3)
-    except Exception as e:
-        logging.exception("Failed to start Tor")
+        return get_tor().start().proxy(username, scheme="socks5")
+    except TorUnavailable as e:
+        logging.error(f"Tor unavailable: {e}")
+        return None
 
 
-def stop_tor():
-    try:
-        logging.info("Stopping Tor service...")
-        subprocess.run(["systemctl", "stop", "tor"], check=True)
-    except Exception as e:
-        logging.exception("Failed to stop Tor")
+# === MAIGRET RUN ===
+def maigret_in_process() -> bool:
+    """
+    Use the in-process driver when maigret is importable; --permute is
+    only offered by the CLI, so permuted searches keep the subprocess.
+    """
+    return maigret_driver.available() and not config.get("permute", False)
 
 
-def restart_tor():
+def search_maigret(username):
+    """Run Maigret on the warm in-process driver; the report dict, or None."""
+    proxy = None
+    if config.get("use_tor", False):
+        proxy = tor_circuit(username)
+        if proxy is None:
+            return None
     try:
-        logging.info("Restarting Tor service...")
-        subprocess.run(["systemctl", "restart", "tor"], check=True)
-        time.sleep(3)
+        logging.info(f"Running Maigret in-process for {username}")
+        return get_driver().search(
+            username, timeout=config.get("maigret_timeout"), proxy=proxy
+        )
     except Exception as e:
-        logging.exception("Failed to restart Tor")
+        logging.exception(f"Maigret driver failed: {e}")
+        return None
 
 
-# === MAIGRET RUN ===
 def run_maigret(username):
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     output_path = OUTPUT_DIR / f"maigret_{username}_{timestamp}.json"
@@ -74,7 +87,10 @@ def run_maigret(username):
     ]
 
     if config.get("use_tor", False):
-        cmd += ["--tor"]
+        proxy = tor_circuit(username)
+        if proxy is None:
+            return None
+        cmd += ["--proxy", proxy]
 
     if config.get("permute", False):
         cmd += ["--permute"]
@@ -108,18 +124,23 @@ def run_sherlock(username):
 # === MAIN ===
 def search_username(username):
     logging.info(f"Starting username search for {username}")
+    in_process = maigret_in_process()
 
-    try:
-        if config.get("use_tor", False):
-            start_tor()
-
+    if in_process:
+        maigret_report = search_maigret(username)
+    else:
         maigret_success = run_maigret(username)
 
-    finally:
-        if config.get("use_tor", False):
-            stop_tor()
+    if in_process and maigret_report is not None:
+        result = {"method": "maigret", "username": username, "report": maigret_report}
+        norm_path = parse_username_output(result)
+        if norm_path:
+            logging.info(f"Maigret success for {username}")
+            logging.info(f"Search completed for {username}")
+            return {"method": "maigret", "file": norm_path, "normalized": norm_path}
+        logging.warning("Maigret report could not be normalized.")
 
-    if maigret_success:
+    elif not in_process and maigret_success:
         moved_file = move_maigret_output(username)
         if moved_file:
             result = {"method": "maigret", "file": str(moved_file)}
@@ -161,7 +182,11 @@ if __name__ == "__main__":
     print(json.dumps(result, indent=4))
 
     file_path = result.get("file")
-    if file_path:
+    if result.get("normalized"):
+        # The driver returns the path of the normalized report
+        with open(result["normalized"]) as f:
+            parsed = json.load(f)
+    elif file_path:
         parsed = parse_username_output(result)
     else:
         parsed = {"error": "No file path provided"}
@@ -1,13 +1,22 @@
 import shutil
 from pathlib import Path
 from datetime import datetime
+from typing import Optional
 import logging
 import json
+import yaml
+from scripts.correlation_engine import index_output
+from scripts.signatures import NEGATIVE, compile_signatures
 
 # === PATH SETUP ===
 ROOT_DIR = Path(__file__).parents[2]
 MAIGRET_REPORTS_DIR = ROOT_DIR / "tools/maigret/reports"
 OUTPUT_DIR = ROOT_DIR / "data/outputs"
+CONFIG_PATH = ROOT_DIR / "config/modules_config/username_search_config.yaml"
+
+# URL fragments that mark a hit as an error or login page, not a profile
+URL_NEGATIVE_MARKERS = ("404", "notfound", "error", "login", "signup", "register")
+IGNORED_SITES = ("example.com", "localhost")
 
 # === LOGGING SETUP ===
 LOG_PATH = ROOT_DIR / "logs/username_search.log"
@@ -35,6 +44,7 @@ def move_maigret_output(username):
         dest_file = OUTPUT_DIR / f"maigret_{username}_{timestamp}.json"
 
         shutil.move(str(latest_file), str(dest_file))
+        index_output(dest_file)
         logging.info(f"Moved Maigret report to {dest_file}")
         return dest_file
     except Exception as e:
@@ -43,24 +53,57 @@ def move_maigret_output(username):
 
 
 # === FILTER FALSE POSITIVES ===
+def load_url_filter() -> dict:
+    """The `url_filter` block of username_search_config.yaml ({} if absent)."""
+    try:
+        with open(CONFIG_PATH, "r") as f:
+            return (yaml.safe_load(f)["username_search"] or {}).get("url_filter") or {}
+    except (FileNotFoundError, KeyError, TypeError):
+        return {}
+
+
+def url_signatures():
+    """
+    Compiled URL markers: negative_markers flag error/login pages, and
+    positive_markers are exceptions that shadow a negative marker they
+    contain (e.g. "errorist" keeps a profile named errorist).
+    """
+    config = load_url_filter()
+    return compile_signatures(
+        tuple(config.get("positive_markers", ())),
+        tuple(config.get("negative_markers", URL_NEGATIVE_MARKERS)),
+    )
+
+
+def false_positive_reason(entry: dict, signatures=None) -> Optional[str]:
+    """Why a found_on entry is not a real profile, or None if it looks genuine."""
+    url = entry.get("url") or ""
+    site = (entry.get("site") or "").lower()
+
+    if len(url.strip()) < 8:
+        return "missing or short URL"
+    negative = [
+        marker
+        for kind, marker in (signatures or url_signatures()).matches(url)
+        if kind == NEGATIVE
+    ]
+    if negative:
+        return f"URL contains {negative[0]!r}"
+    if site in IGNORED_SITES:
+        return f"ignored site {site}"
+    if url.endswith("/") and url.count("/") <= 3:
+        return "bare site root"
+    return None
+
+
 def filter_false_positives(found_on_list):
+    signatures = url_signatures()
     filtered = []
     for entry in found_on_list:
-        url = entry.get("url", "")
-        site = entry.get("site", "").lower()
-
-        if not url or len(url.strip()) < 8:
-            continue
-        if any(
-            term in url.lower()
-            for term in ["404", "notfound", "error", "login", "signup", "register"]
-        ):
-            continue
-        if site in ["example.com", "localhost"]:
-            continue
-        if url.endswith("/") and url.count("/") <= 3:
+        reason = false_positive_reason(entry, signatures)
+        if reason:
+            logging.debug(f"Dropped {entry.get('url')}: {reason}")
             continue
-
         filtered.append(entry)
 
     return filtered
@@ -87,29 +130,38 @@ def purge_rogue_txt_files(exceptions=None):
 
 # === PARSE AND SAVE NORMALIZED OUTPUT ===
 def parse_username_output(result_dict):
+    """
+    Normalize a username search result and save it to OUTPUT_DIR. The
+    result points at a tool's output `file`, or carries an in-process
+    Maigret `report` (see maigret_driver) with its `username`.
+    """
     method = result_dict.get("method")
-    file_path = str(Path(result_dict.get("file", "")))
-    if not Path(file_path).exists():
-        logging.error(f"Output file does not exist: {file_path}")
-        return None
-
-    username = Path(file_path).stem.split("_")[1]
+    report = result_dict.get("report")
+    if report is not None:
+        username = result_dict.get("username") or report.get("username")
+    else:
+        file_path = str(Path(result_dict.get("file", "")))
+        if not Path(file_path).exists():
+            logging.error(f"Output file does not exist: {file_path}")
+            return None
+        username = Path(file_path).stem.split("_")[1]
     normalized = {"username": username, "method": method, "found_on": []}
 
     try:
         if method == "maigret":
-            with open(file_path, "r", encoding="utf-8") as f:
-                data = json.load(f)
-                for site, info in data.get("sites", {}).items():
-                    if info.get("status") == "claimed":
-                        normalized["found_on"].append(
-                            {
-                                "site": site,
-                                "url": info.get("url_user"),
-                                "category": info.get("category"),
-                                "tags": info.get("tags", []),
-                            }
-                        )
+            if report is None:
+                with open(file_path, "r", encoding="utf-8") as f:
+                    report = json.load(f)
+            for site, info in report.get("sites", {}).items():
+                if info.get("status") == "claimed":
+                    normalized["found_on"].append(
+                        {
+                            "site": site,
+                            "url": info.get("url_user"),
+                            "category": info.get("category"),
+                            "tags": info.get("tags", []),
+                        }
+                    )
 
         elif method == "sherlock":
             with open(file_path, "r", encoding="utf-8") as f:
@@ -142,6 +194,7 @@ def parse_username_output(result_dict):
         norm_path = str(OUTPUT_DIR / f"normalized_username_{username}_{timestamp}.json")
         with open(norm_path, "w") as f:
             json.dump(normalized, f, indent=4)
+        index_output(norm_path, normalized)
 
         logging.info(f"Normalized data saved to {norm_path}")
         return norm_path
@@ -0,0 +1,215 @@
+import csv
+import json
+import time
+import logging
+import sqlite3
+import tempfile
+import threading
+from pathlib import Path
+from itertools import islice
+
+from scripts.classifier import INVALID, PATTERNS, classify_codes
+from scripts.dispatcher import Dispatcher
+from scripts.scheduler import Scheduler, parse_priorities
+from scripts.input_parser import lookups_for
+
+# Unfinished lookups allowed per dispatcher worker before reading pauses
+BACKLOG_PER_WORKER = 4
+PROGRESS_INTERVAL = 5.0
+# Selectors classified per classify_codes pass; small enough that the
+# chunk stays negligible next to the dispatcher backlog
+CLASSIFY_CHUNK = 1024
+# Category per classify_codes code
+CATEGORIES = [*PATTERNS, INVALID]
+# Column names recognised as the selector column in CSV and JSONL input
+SELECTOR_FIELDS = ("selector", "input", "target", "value")
+
+logger = logging.getLogger("batch_input")
+
+
+def _csv_selectors(f):
+    reader = csv.reader(f)
+    column = None
+    for row_number, row in enumerate(reader):
+        if row_number == 0:
+            header = [cell.strip().lower() for cell in row]
+            column = next((header.index(k) for k in SELECTOR_FIELDS if k in header), None)
+            if column is not None:
+                continue
+        cells = row if column is None else row[column : column + 1]
+        yield from cells
+
+
+def _jsonl_selectors(f):
+    for line in f:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError:
+            yield line
+            continue
+        if isinstance(record, dict):
+            record = next((record[k] for k in SELECTOR_FIELDS if k in record), None)
+        if isinstance(record, str):
+            yield record
+
+
+def iter_selectors(path):
+    """
+    Stream raw selectors from a batch file one at a time.
+
+    `.csv` files use the selector/input/target/value column when the header
+    names one, otherwise every cell; `.jsonl` lines are strings or objects
+    with one of those keys; anything else is plain text, one selector per
+    line, with `#` comments.
+    """
+    path = Path(path)
+    with open(path, "r", encoding="utf-8", errors="replace", newline="") as f:
+        suffix = path.suffix.lower()
+        if suffix == ".csv":
+            selectors = _csv_selectors(f)
+        elif suffix in (".jsonl", ".ndjson"):
+            selectors = _jsonl_selectors(f)
+        else:
+            selectors = (line for line in f if not line.lstrip().startswith("#"))
+        for selector in selectors:
+            selector = selector.strip()
+            if selector:
+                yield selector
+
+
+class SeenSet:
+    """
+    Exact case-insensitive membership over an unbounded stream.
+
+    Keys live in a throwaway SQLite database rather than a Python set, so
+    memory stays at SQLite's page cache however many selectors go by.
+    """
+
+    def __init__(self):
+        self.tmp = tempfile.TemporaryDirectory(prefix="auton_batch_")
+        self.conn = sqlite3.connect(Path(self.tmp.name) / "seen.db")
+        self.conn.execute("PRAGMA journal_mode=OFF")
+        self.conn.execute("PRAGMA synchronous=OFF")
+        self.conn.execute("CREATE TABLE seen (key TEXT PRIMARY KEY) WITHOUT ROWID")
+
+    def add(self, key: str) -> bool:
+        """Record `key`; returns False if it (ignoring case) was already seen."""
+        cur = self.conn.execute(
+            "INSERT OR IGNORE INTO seen (key) VALUES (?)", (key.casefold(),)
+        )
+        return cur.rowcount == 1
+
+    def close(self):
+        self.conn.close()
+        self.tmp.cleanup()
+
+
+class BatchStats:
+    """Thread-safe progress counters with periodic throughput reports."""
+
+    FIELDS = ("read", "duplicate", "invalid", "resumed", "queued", "done", "failed")
+
+    def __init__(self, interval: float = PROGRESS_INTERVAL, silent: bool = False):
+        self.lock = threading.Lock()
+        self.counts = dict.fromkeys(self.FIELDS, 0)
+        self.interval = interval
+        self.silent = silent
+        self.start = self.last_report = time.monotonic()
+
+    def incr(self, field: str):
+        with self.lock:
+            self.counts[field] += 1
+
+    def report(self, force: bool = False):
+        now = time.monotonic()
+        with self.lock:
+            if not force and now - self.last_report < self.interval:
+                return
+            self.last_report = now
+            c = dict(self.counts)
+        elapsed = max(now - self.start, 1e-9)
+        if not self.silent:
+            print(
+                f"📈 {c['read']:,} read · {c['queued']:,} queued · {c['done']:,} done · "
+                f"{c['failed']:,} failed · {c['resumed']:,} resumed · "
+                f"{c['duplicate']:,} dup · {c['invalid']:,} invalid · "
+                f"{c['read'] / elapsed:,.1f} lines/s · {c['done'] / elapsed:,.1f} lookups/s"
+            )
+
+
+def run_batch(
+    path, args=None, progress_interval: float = PROGRESS_INTERVAL, queue=None
+) -> dict:
+    """
+    Classify and dispatch every selector in a batch file.
+
+    The file is read lazily in chunks of CLASSIFY_CHUNK selectors, each
+    classified in one classify_codes call, and the dispatcher
+    blocks the reader once BACKLOG_PER_WORKER unfinished lookups per worker
+    are queued, so memory stays flat regardless of input size. Within that backlog the scheduler
+    decides what starts next, so cheap lookups are not stuck behind a run of
+    Maigret scans. With a JobQueue, lookups already done in its run count
+    as "resumed" instead of running again.
+    Returns the final counters.
+    """
+    stats = BatchStats(progress_interval, silent=getattr(args, "silent", False))
+    seen = SeenSet()
+
+    def on_done(future, module, item):
+        if future.exception():
+            stats.incr("failed")
+            logger.error(f"{module} failed for {item}: {future.exception()}")
+        else:
+            stats.incr("done")
+        stats.report()
+
+    priorities = parse_priorities(getattr(args, "priority", None))
+    scheduler = Scheduler(getattr(args, "schedule", None))
+    dispatcher = Dispatcher(max_workers=getattr(args, "concurrency", None), scheduler=scheduler)
+    dispatcher.max_pending = dispatcher.max_workers * BACKLOG_PER_WORKER
+    try:
+        with dispatcher:
+            selectors = iter_selectors(path)
+            while chunk := list(islice(selectors, CLASSIFY_CHUNK)):
+                codes = classify_codes(chunk)
+                for selector, code in zip(chunk, codes):
+                    stats.incr("read")
+                    category = CATEGORIES[code]
+                    if category == INVALID:
+                        stats.incr("invalid")
+                        logger.warning(f"Could not classify batch input: {selector}")
+                        continue
+                    item = selector.lstrip("@") if category == "username" else selector
+                    if not seen.add(f"{category}:{item}"):
+                        stats.incr("duplicate")
+                        continue
+                    for module, func, func_args, func_kwargs in lookups_for(
+                        category, item, args
+                    ):
+                        priority = priorities.get(item, 0)
+                        if queue is None:
+                            future = dispatcher.submit(
+                                module, func, *func_args, priority=priority, **func_kwargs
+                            )
+                        elif queue.completed(module, item) is not None:
+                            stats.incr("resumed")
+                            continue
+                        else:
+                            future = queue.submit(
+                                dispatcher, module, item, func, *func_args,
+                                priority=priority, **func_kwargs
+                            )
+                        stats.incr("queued")
+                        future.add_done_callback(
+                            lambda f, m=module, i=item: on_done(f, m, i)
+                        )
+                    stats.report()
+    finally:
+        seen.close()
+        scheduler.close()
+
+    stats.report(force=True)
+    return stats.counts
@@ -0,0 +1,72 @@
+import re
+from typing import Optional
+
+# ————————————————————————————————————————
+# Centralize your patterns here, in priority order: the first match wins.
+# None of them may cross a newline, so they also classify whole buffers.
+_OCTET = r"(?:25[0-5]|2[0-4]\d|1\d\d|[1-9]?\d)"
+PATTERNS = {
+    "email": re.compile(r"^[^@\s]++@[^@\s]+\.[^@\s]+$"),
+    "ip": re.compile(rf"^{_OCTET}(?:\.{_OCTET}){{3}}$"),
+    # 7+ digits, optionally with +, spaces, dashes, dots or parentheses
+    "phone": re.compile(r"^\+?\(?\d(?:[ \-().]*+\d){6,}+$"),
+    "domain": re.compile(
+        r"^(?:[A-Za-z0-9](?:[A-Za-z0-9\-]{0,61}[A-Za-z0-9])?\.)+[A-Za-z]{2,63}$"
+    ),
+    "username": re.compile(r"^@?[A-Za-z0-9_.\-]{3,}$"),
+}
+INVALID = "invalid"
+
+# Every pattern as one named-group alternation; `lastgroup` names the winner
+COMBINED = re.compile(
+    "|".join(f"(?P<{t}>{rx.pattern[1:-1]})" for t, rx in PATTERNS.items())
+)
+
+# Code of each type in classify_codes output; blank lines get -1
+_CODES = {kind: code for code, kind in enumerate([*PATTERNS, INVALID])}
+
+
+def detect_input_type(item: str) -> Optional[str]:
+    """
+    Returns one of PATTERNS keys or None.
+    """
+    match = COMBINED.fullmatch(item)
+    return match.lastgroup if match else None
+
+
+def classify_codes(lines: list) -> list:
+    """
+    Classify lines into codes (index into [*PATTERNS, "invalid"], -1 for
+    blank), trimming them in place. Each line takes one COMBINED match,
+    so results always agree with detect_input_type.
+    """
+    lines[:] = map(str.strip, lines)
+    invalid = _CODES[INVALID]
+    return [
+        _CODES[match.lastgroup] if match else invalid if line else -1
+        for line, match in zip(lines, map(COMBINED.fullmatch, lines))
+    ]
+
+
+def _lines_of(items) -> list:
+    if isinstance(items, bytes):
+        items = items.decode("utf-8", errors="replace")
+    if isinstance(items, str):
+        return items.split("\n")
+    return list(items)
+
+
+def classify_bulk(items) -> dict:
+    """
+    Classify many inputs at once into {type: [items]} plus "invalid".
+
+    `items` is an iterable of strings or one large str/bytes buffer with an
+    input per line. Entries are trimmed, blanks skipped, and order within
+    each bucket is preserved.
+    """
+    lines = _lines_of(items)
+    buckets = [[] for _ in _CODES]
+    for line, code in zip(lines, classify_codes(lines)):
+        if code >= 0:
+            buckets[code].append(line)
+    return dict(zip(_CODES, buckets))
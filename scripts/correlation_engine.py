@@ -1,187 +1,396 @@
+import os
 import json
-import re
+import hashlib
+import logging
+import threading
 from pathlib import Path
-from collections import defaultdict
+from contextlib import contextmanager
+from itertools import islice
+from collections import defaultdict, deque
+from concurrent.futures import ProcessPoolExecutor
+
+from scripts.correlation_index import CorrelationIndex
+from scripts.posting_lists import PostingLists
+from scripts.identity_clusters import build_clusters
+from scripts.fuzzy_match import DEFAULT_THRESHOLD, handle_scope, profile_scope, update_pairs
+from scripts.json_stream import CHUNK_SIZE, document_members, stream_members
+from scripts.extractors import extract_members, get_extractor
 
 OUTPUT_DIR = Path(__file__).parents[1] / "data/outputs"
 CORRELATED_OUTPUT = Path(__file__).parents[1] / "data/correlated_results.json"
-STATE_FILE = Path(__file__).parents[1] / "data/.corr_state.json"
+
+# Output files per map task; each shard is reduced in one index transaction
+SHARD_SIZE = 256
+
+# Outputs larger than this are parsed incrementally instead of loaded whole
+STREAM_THRESHOLD = 4 * 1024 * 1024
+
+# Entity types stored in the index and the result section each one feeds
+ENTITY_SECTIONS = {
+    "phone": "phones",
+    "email": "emails",
+    "breach": "breaches",
+    "username": "usernames",
+    "domain": "domains",
+    "ip": "ips",
+    "darkweb_keyword": "darkweb_keywords",
+    "darkweb_site": "darkweb_sites",
+    "handle": "handles",
+    "profile_url": "profile_urls",
+}
+
+# Entity types compared for near-duplicates in the fuzzy_usernames section,
+# with how each is scoped: profile URLs compare handles within one host
+FUZZY_TYPES = {"handle": handle_scope, "profile_url": profile_scope}
+
+logger = logging.getLogger("correlation_engine")
+
+# Paths handed to index_output on each thread inside written_outputs()
+_written = threading.local()
+
+
+def load_output(path: Path, raw: bytes = None):
+    try:
+        if raw is not None:
+            return json.loads(raw)
+        with open(path, "r") as f:
+            return json.load(f)
+    except Exception as e:
+        print(f"Error loading {path.name}: {e}")
+        return None
 
 
 def load_all_outputs():
-    all_data = []
+    """Lazily yield {"filename", "data"} for each output; one document in memory at a time."""
     for file in OUTPUT_DIR.glob("*.json"):
+        data = load_output(file)
+        if data is not None:
+            yield {"filename": file.name, "data": data}
+
+
+def extract_entities(name: str, data) -> dict:
+    """Pull correlatable values out of one parsed output document."""
+    return extract_members(name, document_members(data))
+
+
+def read_output(path: Path, stat, known_sha=None):
+    """
+    Read, hash and extract one output file.
+
+    Returns (fingerprint, entities); entities is None when the content hash
+    matches `known_sha` or the file cannot be parsed. Files larger than
+    STREAM_THRESHOLD are parsed incrementally so memory stays bounded by the
+    largest single member rather than the file. Outputs whose producer has
+    nothing to correlate are hashed but never parsed.
+    """
+    hasher = hashlib.sha256()
+    fingerprint = {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size}
+    parse = get_extractor(path.name) is not None
+
+    if not parse:
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+                hasher.update(chunk)
+        fingerprint["sha256"] = hasher.hexdigest()
+        return fingerprint, None if fingerprint["sha256"] == known_sha else {}
+
+    if stat.st_size <= STREAM_THRESHOLD:
+        raw = path.read_bytes()
+        hasher.update(raw)
+        fingerprint["sha256"] = hasher.hexdigest()
+        if fingerprint["sha256"] == known_sha:
+            return fingerprint, None
+        data = load_output(path, raw)
+        return fingerprint, None if data is None else extract_entities(path.name, data)
+
+    # A large file that may be unchanged is hashed before anything is decoded
+    if known_sha is not None:
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+                hasher.update(chunk)
+        fingerprint["sha256"] = hasher.hexdigest()
+        if fingerprint["sha256"] == known_sha:
+            return fingerprint, None
+        hasher = hashlib.sha256()
+
+    try:
+        with open(path, "rb") as f:
+            entities = extract_members(path.name, stream_members(f, hasher))
+            # Hash whatever trails the closing brace too
+            for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+                hasher.update(chunk)
+    except ValueError as e:
+        print(f"Error loading {path.name}: {e}")
+        entities = None
+    fingerprint["sha256"] = hasher.hexdigest()
+    return fingerprint, entities
+
+
+def output_root(outputs=None) -> str:
+    """The resolved outputs directory (default data/outputs) artifacts are recorded under."""
+    return str(Path(outputs or OUTPUT_DIR).resolve())
+
+
+def discover_outputs(manifest: dict, outputs=None):
+    """
+    Discovery stage: yield (path, known sha256 or None) for outputs in
+    `outputs` (default data/outputs) that are new or whose mtime/size no
+    longer match the manifest. Entries seen on disk are popped from
+    `manifest`, leaving behind artifacts whose files are gone once the
+    generator is exhausted.
+    """
+    with os.scandir(outputs or OUTPUT_DIR) as it:
+        for entry in it:
+            if not entry.name.endswith(".json") or not entry.is_file():
+                continue
+            stat = entry.stat()
+            known = manifest.pop(entry.name, None)
+            if known and known[:2] == (stat.st_mtime_ns, stat.st_size):
+                continue
+            yield entry.path, known[2] if known else None
+
+
+def iter_shards(items, size):
+    items = iter(items)
+    while shard := list(islice(items, size)):
+        yield shard
+
+
+@contextmanager
+def written_outputs():
+    """
+    Collect the output files this thread passes to index_output while the
+    block runs, i.e. every file a lookup writes; yields the list of Paths.
+    """
+    paths = []
+    outer, _written.paths = getattr(_written, "paths", None), paths
+    try:
+        yield paths
+    finally:
+        _written.paths = outer
+
+
+def index_output(path, data=None, index=None):
+    """
+    Add one output artifact to the correlation index.
+
+    Modules call this right after writing a file to data/outputs so the file
+    is indexed exactly once. Indexing problems are logged, never raised, so a
+    failed index write cannot fail the lookup that produced the file.
+    """
+    path = Path(path)
+    written = getattr(_written, "paths", None)
+    if written is not None:
+        written.append(path)
+    try:
+        stat = path.stat()
+        if data is None:
+            fingerprint, entities = read_output(path, stat)
+        else:
+            fingerprint = {
+                "mtime_ns": stat.st_mtime_ns,
+                "size": stat.st_size,
+                "sha256": hashlib.sha256(path.read_bytes()).hexdigest(),
+            }
+            entities = extract_entities(path.name, data)
+    except OSError as e:
+        logger.warning(f"Failed to read {path.name} for indexing: {e}")
+        return False
+    if entities is None:
+        return False
+    fingerprint["root"] = str(path.resolve().parent)
+
+    try:
+        if index is not None:
+            index.add_artifact(path.name, entities, **fingerprint)
+        else:
+            with CorrelationIndex() as idx:
+                idx.add_artifact(path.name, entities, **fingerprint)
+        return True
+    except Exception as e:
+        logger.warning(f"Failed to index {path.name}: {e}")
+        return False
+
+
+def map_shard(shard) -> dict:
+    """
+    Map step: read, hash, parse and extract one shard of output files.
+
+    `shard` is a list of (path, known sha256 or None). Each document is
+    discarded as soon as its entities are extracted; only a partial inverted
+    map {entity type: {value: [artifact names]}} is returned, along with the
+    fingerprints of re-indexed artifacts and the artifacts whose content
+    turned out to be unchanged.
+    """
+    partial = {"artifacts": {}, "postings": defaultdict(dict), "touched": {}}
+    for path, known_sha in shard:
+        path = Path(path)
+        root = str(path.parent)
         try:
-            with open(file, "r") as f:
-                data = json.load(f)
-                all_data.append({"filename": file.name, "data": data})
-        except Exception as e:
-            print(f"Error loading {file.name}: {e}")
-    return all_data
-
-
-def correlate_data(target_file=None):
-    # Gather entries
-    if target_file:
-        entries = []
-        target_path = Path(target_file)
-        if target_path.exists():
-            with open(target_path, "r") as f:
-                data = json.load(f)
-            entries.append({"filename": target_path.name, "data": data})
+            stat = path.stat()
+            fingerprint, entities = read_output(path, stat, known_sha)
+        except OSError as e:
+            print(f"Error loading {path.name}: {e}")
+            continue
+
+        if fingerprint["sha256"] == known_sha:
+            partial["touched"][path.name] = (stat.st_mtime_ns, stat.st_size, root)
+            continue
+        if entities is None:
+            continue
+
+        partial["artifacts"][path.name] = {**fingerprint, "root": root}
+        for etype, values in entities.items():
+            postings = partial["postings"][etype]
+            for value in dict.fromkeys(values):
+                postings.setdefault(value, []).append(path.name)
+
+    partial["postings"] = dict(partial["postings"])
+    return partial
+
+
+def reduce_partial(index, partial) -> int:
+    """Reduce step: merge one partial map into the index. Returns artifacts indexed."""
+    for name, (mtime_ns, size, root) in partial["touched"].items():
+        index.touch_artifact(name, mtime_ns, size, root)
+    index.add_artifacts(partial["artifacts"], partial["postings"])
+    index.commit()
+    return len(partial["artifacts"])
+
+
+def sync_index(index, workers: int = 1, outputs=None) -> int:
+    """
+    Bring the index in line with `outputs` (default data/outputs, or e.g.
+    the shared store workers copy into) using the artifact manifest.
+
+    Outputs whose mtime and size match the manifest are skipped without being
+    opened; the rest are hashed and only re-parsed when the content changed.
+    Artifacts found in `outputs` whose files disappeared are dropped; those
+    indexed from another directory are left alone. With workers > 1 the map
+    step runs on a process pool; shards are reduced in order, so the index
+    ends up identical to a serial run. Returns how many artifacts were added,
+    replaced or removed.
+    """
+    root = output_root(outputs)
+    manifest = index.manifest()
+    shards = iter_shards(discover_outputs(manifest, root), SHARD_SIZE)
+    changed = 0
+
+    if workers > 1:
+        # Keep a bounded window of shards in flight and reduce them in order
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            in_flight = deque()
+            for shard in shards:
+                in_flight.append(pool.submit(map_shard, shard))
+                if len(in_flight) >= workers * 2:
+                    changed += reduce_partial(index, in_flight.popleft().result())
+            while in_flight:
+                changed += reduce_partial(index, in_flight.popleft().result())
+    else:
+        for shard in shards:
+            changed += reduce_partial(index, map_shard(shard))
+
+    # Whatever discovery left in the manifest from this root no longer exists
+    # on disk; artifacts indexed before roots were recorded belong to OUTPUT_DIR
+    default_root = output_root()
+    gone = [name for name, known in manifest.items() if (known[3] or default_root) == root]
+    for name in gone:
+        index.remove_artifact(name)
+    index.commit()
+
+    return changed + len(gone)
+
+
+def fuzzy_usernames(index, threshold: float = DEFAULT_THRESHOLD) -> list:
+    """
+    Link near-identical handles and profile URLs (john_doe / johndoe / j0hndoe)
+    across artifacts via MinHash/LSH. The matching state lives in the index,
+    so only values indexed since the last run are matched (see update_pairs).
+    Pairs whose values only ever occur in the same single artifact are left out.
+    """
+    update_pairs(index, FUZZY_TYPES, threshold)
+    rows = index.iter_fuzzy_pairs(threshold).fetchall()
+    artifacts = index.entity_artifacts({i for row in rows for i in (row[1], row[3])})
+    order = list(FUZZY_TYPES)
+
+    pairs = []
+    for etype, a_id, a, b_id, b, sim in rows:
+        names_a, names_b = artifacts[a_id], artifacts[b_id]
+        if len(set(names_a) | set(names_b)) < 2:
+            continue
+        if b < a:
+            (a, names_a), (b, names_b) = (b, names_b), (a, names_a)
+        pairs.append({"type": etype, "similarity": sim, "values": {a: names_a, b: names_b}})
+    pairs.sort(
+        key=lambda p: (order.index(p["type"]), -p["similarity"], *p["values"])
+    )
+    return pairs
+
+
+def print_summary(result: dict):
+    """Print per-section counts; the full result lives in CORRELATED_OUTPUT."""
+    for section in ENTITY_SECTIONS.values():
+        if result[section]:
+            print(f"  {section}: {len(result[section])} shared values")
+    print(f"  clusters: {len(result['clusters'])}")
+    print(f"  fuzzy_usernames: {len(result['fuzzy_usernames'])} near-duplicate pairs")
+
+
+def correlate_data(target_file=None, workers: int = 1, outputs=None):
+    """
+    Sync the index with the output files in `outputs` (default
+    data/outputs) and write the correlations to CORRELATED_OUTPUT.
+    """
+    with CorrelationIndex() as index:
+        if target_file:
+            target_path = Path(target_file)
+            if not target_path.exists():
+                print(f"Specified file does not exist: {target_file}")
+                return
+            index_output(target_path, index=index)
         else:
-            print(f"Specified file does not exist: {target_file}")
+            changed = sync_index(index, workers=workers, outputs=outputs)
+            print(f"Correlation index synced ({changed} artifacts changed).")
+
+        # Outputs indexed by modules at write time bump the generation too,
+        # so an unchanged generation means the written result is current.
+        generation = index.generation()
+        if (
+            CORRELATED_OUTPUT.exists()
+            and index.get_meta("correlated_generation") == generation
+        ):
+            print(f"Correlations already up to date in {CORRELATED_OUTPUT}")
             return
-    else:
-        entries = load_all_outputs()
-
-    # Sort for deterministic order
-    entries.sort(key=lambda e: e["filename"])
-
-    # Load or initialize state
-    if STATE_FILE.exists():
-        with open(STATE_FILE, "r") as sf:
-            state = json.load(sf)
-        last_processed = state.get("last")
-        phone_map = defaultdict(list, state.get("phone_map", {}))
-        breach_map = defaultdict(
-            set, {k: set(v) for k, v in state.get("breach_map", {}).items()}
-        )
-        username_map = defaultdict(
-            set, {k: set(v) for k, v in state.get("username_map", {}).items()}
-        )
-        domain_map = defaultdict(
-            set, {k: set(v) for k, v in state.get("domain_map", {}).items()}
-        )
-        ip_map = defaultdict(
-            set, {k: set(v) for k, v in state.get("ip_map", {}).items()}
-        )
-        darkweb_keywords = defaultdict(
-            set, {k: set(v) for k, v in state.get("darkweb_keywords", {}).items()}
-        )
-        darkweb_sites = defaultdict(
-            set, {k: set(v) for k, v in state.get("darkweb_sites", {}).items()}
-        )
-        print(f"Resuming correlation from: {last_processed}")
-    else:
-        last_processed = None
-        phone_map = defaultdict(list)
-        breach_map = defaultdict(set)
-        username_map = defaultdict(set)
-        domain_map = defaultdict(set)
-        ip_map = defaultdict(set)
-        darkweb_keywords = defaultdict(set)
-        darkweb_sites = defaultdict(set)
-        print(f"Loaded {len(entries)} data entries for correlation.")
-
-    # Process each entry
-    for entry in entries:
-        fname = entry["filename"]
-        if last_processed and fname <= last_processed:
-            continue  # Skip already‑processed
-
-        data = entry["data"]
-
-        # Phone number matching
-        for key in ["E164", "Local", "International", "Raw local"]:
-            if key in data:
-                norm = re.sub(r"[^\d+]", "", data[key])
-                if norm:
-                    phone_map[norm].append(fname)
-
-        # Breach name matching
-        breaches = data.get("xposed_breaches", [])
-        if isinstance(breaches, list):
-            for breach in breaches:
-                if isinstance(breach, str):
-                    breach_map[breach].add(fname)
-
-        # Username site matching
-        if "found_on" in data and isinstance(data["found_on"], list):
-            for item in data["found_on"]:
-                site = item.get("site")
-                if site:
-                    username_map[site].add(fname)
-
-        # Domain correlation
-        domain = data.get("domain")
-        if domain:
-            domain_map[domain].add(fname)
-
-        # IP correlation
-        ip = data.get("ip")
-        if ip:
-            ip_map[ip].add(fname)
-
-        # Darkweb correlation (NEW integration)
-        if data.get("source") == "darkweb":
-            keyword = data.get("keyword")
-            if keyword:
-                darkweb_keywords[keyword].add(fname)
-
-            for result_set in ["darksearch", "torbot"]:
-                results = data.get(result_set, [])
-                if isinstance(results, list):
-                    for result in results:
-                        link = result.get("link")
-                        if link:
-                            darkweb_sites[link].add(fname)
-
-        # Checkpoint state after each file
-        last_processed = fname
-        with open(STATE_FILE, "w") as sf:
-            json.dump(
-                {
-                    "last": last_processed,
-                    "phone_map": dict(phone_map),
-                    "breach_map": {k: list(v) for k, v in breach_map.items()},
-                    "username_map": {k: list(v) for k, v in username_map.items()},
-                    "domain_map": {k: list(v) for k, v in domain_map.items()},
-                    "ip_map": {k: list(v) for k, v in ip_map.items()},
-                    "darkweb_keywords": {
-                        k: list(v) for k, v in darkweb_keywords.items()
-                    },
-                    "darkweb_sites": {k: list(v) for k, v in darkweb_sites.items()},
-                },
-                sf,
-                indent=2,
-            )
-
-    # Filter only truly correlated results
-    correlated_phones = {k: v for k, v in phone_map.items() if len(v) > 1}
-    correlated_breaches = {k: list(v) for k, v in breach_map.items() if len(v) > 1}
-    correlated_usernames = {k: list(v) for k, v in username_map.items() if len(v) > 1}
-    correlated_domains = {k: list(v) for k, v in domain_map.items() if len(v) > 1}
-    correlated_ips = {k: list(v) for k, v in ip_map.items() if len(v) > 1}
-    correlated_darkweb_keywords = {
-        k: list(v) for k, v in darkweb_keywords.items() if len(v) > 1
-    }
-    correlated_darkweb_sites = {
-        k: list(v) for k, v in darkweb_sites.items() if len(v) > 1
-    }
 
+        lists = PostingLists.from_index(index)
+        fuzzy = fuzzy_usernames(index)
+
+    shared = lists.to_sections()
     result = {
-        "phones": correlated_phones,
-        "breaches": correlated_breaches,
-        "usernames": correlated_usernames,
-        "domains": correlated_domains,
-        "ips": correlated_ips,
-        "darkweb_keywords": correlated_darkweb_keywords,
-        "darkweb_sites": correlated_darkweb_sites,
+        section: shared.get(etype, {}) for etype, section in ENTITY_SECTIONS.items()
     }
+    result["clusters"] = build_clusters(lists)
+    result["fuzzy_usernames"] = fuzzy
 
     # Write final correlated output
     with open(CORRELATED_OUTPUT, "w") as f:
         json.dump(result, f, indent=4)
     print(f"Correlations written to {CORRELATED_OUTPUT}")
-    print(json.dumps(result, indent=4))
+    print_summary(result)
 
-    # Clean up state for fresh next run
-    try:
-        STATE_FILE.unlink()
-    except FileNotFoundError:
-        pass
+    with CorrelationIndex() as index:
+        index.set_meta("correlated_generation", generation)
 
 
 if __name__ == "__main__":
-    correlate_data()
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Auton-OSINT correlation engine")
+    parser.add_argument(
+        "--workers", type=int, default=1, help="Worker processes for correlation."
+    )
+    parser.add_argument(
+        "--outputs", type=Path, help="Directory of output files (default data/outputs)."
+    )
+    args = parser.parse_args()
+    correlate_data(workers=args.workers, outputs=args.outputs)
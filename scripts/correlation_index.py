@@ -0,0 +1,413 @@
+import sqlite3
+from pathlib import Path
+from collections import defaultdict
+from datetime import datetime
+
+CACHE_DB = Path(__file__).parents[1] / "cache/cache.db"
+
+# Map the database into memory so repeated queries are served from the page cache
+MMAP_SIZE = 256 * 1024 * 1024
+# Stay well under SQLite's bound-parameter limit when expanding id sets
+QUERY_CHUNK = 500
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS artifacts (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE,
+    indexed_at TEXT NOT NULL,
+    mtime_ns INTEGER,
+    size INTEGER,
+    sha256 TEXT,
+    root TEXT
+);
+CREATE TABLE IF NOT EXISTS entities (
+    id INTEGER PRIMARY KEY,
+    type TEXT NOT NULL,
+    value TEXT NOT NULL,
+    artifact_count INTEGER NOT NULL DEFAULT 0,
+    UNIQUE (type, value)
+);
+CREATE TABLE IF NOT EXISTS postings (
+    entity_id INTEGER NOT NULL REFERENCES entities(id),
+    artifact_id INTEGER NOT NULL REFERENCES artifacts(id),
+    PRIMARY KEY (entity_id, artifact_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_postings_artifact ON postings(artifact_id);
+CREATE INDEX IF NOT EXISTS idx_entities_shared
+    ON entities(type, value) WHERE artifact_count > 1;
+
+CREATE TRIGGER IF NOT EXISTS postings_count_insert AFTER INSERT ON postings
+BEGIN
+    UPDATE entities SET artifact_count = artifact_count + 1
+    WHERE id = NEW.entity_id;
+END;
+CREATE TRIGGER IF NOT EXISTS postings_count_delete AFTER DELETE ON postings
+BEGIN
+    UPDATE entities SET artifact_count = artifact_count - 1
+    WHERE id = OLD.entity_id;
+END;
+
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO meta (key, value) VALUES ('generation', 0);
+CREATE TRIGGER IF NOT EXISTS artifacts_generation_insert AFTER INSERT ON artifacts
+BEGIN
+    UPDATE meta SET value = value + 1 WHERE key = 'generation';
+END;
+CREATE TRIGGER IF NOT EXISTS artifacts_generation_delete AFTER DELETE ON artifacts
+BEGIN
+    UPDATE meta SET value = value + 1 WHERE key = 'generation';
+END;
+
+-- Near-duplicate matching state, kept up to date one new entity at a time
+CREATE TABLE IF NOT EXISTS fuzzy_keys (
+    entity_id INTEGER PRIMARY KEY REFERENCES entities(id),
+    type TEXT NOT NULL,
+    scope TEXT NOT NULL,
+    key TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_fuzzy_keys ON fuzzy_keys(type, scope, key);
+-- LSH bucket → the first entity seen with each key in it
+CREATE TABLE IF NOT EXISTS fuzzy_buckets (
+    bucket INTEGER NOT NULL,
+    entity_id INTEGER NOT NULL REFERENCES entities(id),
+    PRIMARY KEY (bucket, entity_id)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS fuzzy_pairs (
+    a INTEGER NOT NULL REFERENCES entities(id),
+    b INTEGER NOT NULL REFERENCES entities(id),
+    similarity REAL NOT NULL,
+    PRIMARY KEY (a, b)
+) WITHOUT ROWID;
+"""
+
+# Manifest columns added after the first index release
+ARTIFACT_MIGRATIONS = {
+    "mtime_ns": "ALTER TABLE artifacts ADD COLUMN mtime_ns INTEGER",
+    "size": "ALTER TABLE artifacts ADD COLUMN size INTEGER",
+    "sha256": "ALTER TABLE artifacts ADD COLUMN sha256 TEXT",
+    "root": "ALTER TABLE artifacts ADD COLUMN root TEXT",
+}
+
+
+class CorrelationIndex:
+    """
+    Persistent inverted index of (entity type, normalized value) → artifacts.
+
+    Backed by SQLite in cache/cache.db. Every entity keeps a running
+    artifact_count maintained by triggers, so "which values appear in more
+    than one artifact" is answered from a partial index instead of a scan.
+    The artifacts table doubles as the manifest of processed outputs: each
+    row records the mtime, size and content hash the postings came from,
+    and the directory (root) the file was found in.
+    """
+
+    def __init__(self, db_path=None):
+        self.db_path = Path(db_path or CACHE_DB)
+        self.db_path.parent.mkdir(exist_ok=True)
+        self.conn = sqlite3.connect(self.db_path, timeout=30)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(f"PRAGMA mmap_size={MMAP_SIZE}")
+        self.conn.executescript(SCHEMA)
+        self._migrate()
+
+    def _migrate(self):
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(artifacts)")}
+        for column, ddl in ARTIFACT_MIGRATIONS.items():
+            if column not in columns:
+                self.conn.execute(ddl)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.commit()
+        self.close()
+
+    def commit(self):
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+    def get_meta(self, key: str, default=None):
+        row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else default
+
+    def set_meta(self, key: str, value: int):
+        self.conn.execute(
+            "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value)
+        )
+
+    def generation(self) -> int:
+        """Counter bumped whenever an artifact is added, replaced or removed."""
+        return self.get_meta("generation", 0)
+
+    def manifest(self) -> dict:
+        """Return {artifact name: (mtime_ns, size, sha256, root)} for every indexed artifact."""
+        return {
+            name: (mtime_ns, size, sha256, root)
+            for name, mtime_ns, size, sha256, root in self.conn.execute(
+                "SELECT name, mtime_ns, size, sha256, root FROM artifacts"
+            )
+        }
+
+    def add_artifact(
+        self,
+        name: str,
+        entities: dict,
+        mtime_ns: int = None,
+        size: int = None,
+        sha256: str = None,
+        root: str = None,
+    ):
+        """
+        Index one artifact, replacing anything previously stored under its name.
+        `entities` maps entity type → iterable of normalized values.
+        """
+        postings = {
+            etype: {value: [name] for value in values}
+            for etype, values in entities.items()
+        }
+        self.add_artifacts(
+            {name: {"mtime_ns": mtime_ns, "size": size, "sha256": sha256, "root": root}},
+            postings,
+        )
+
+    def add_artifacts(self, artifacts: dict, postings: dict):
+        """
+        Bulk-index a batch of artifacts from an inverted map.
+
+        `artifacts` maps artifact name → fingerprint (mtime_ns, size, sha256,
+        root);
+        `postings` maps entity type → {value: [artifact names]}. Artifacts
+        already indexed under the same name are replaced.
+        """
+        now = datetime.now().isoformat()
+        artifact_ids = {}
+        for name, fp in artifacts.items():
+            self.remove_artifact(name)
+            cur = self.conn.execute(
+                "INSERT INTO artifacts (name, indexed_at, mtime_ns, size, sha256, root) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    name, now, fp.get("mtime_ns"), fp.get("size"), fp.get("sha256"),
+                    fp.get("root"),
+                ),
+            )
+            artifact_ids[name] = cur.lastrowid
+
+        self.conn.executemany(
+            "INSERT OR IGNORE INTO entities (type, value) VALUES (?, ?)",
+            ((etype, value) for etype, values in postings.items() for value in values),
+        )
+        self.conn.executemany(
+            "INSERT OR IGNORE INTO postings (entity_id, artifact_id) "
+            "SELECT id, ? FROM entities WHERE type = ? AND value = ?",
+            (
+                (artifact_ids[name], etype, value)
+                for etype, values in postings.items()
+                for value, names in values.items()
+                for name in names
+            ),
+        )
+
+    def touch_artifact(self, name: str, mtime_ns: int, size: int, root: str = None):
+        """Record a new mtime/size (and root) for an artifact whose content is unchanged."""
+        self.conn.execute(
+            "UPDATE artifacts SET mtime_ns = ?, size = ?, root = ? WHERE name = ?",
+            (mtime_ns, size, root, name),
+        )
+
+    def remove_artifact(self, name: str):
+        row = self.conn.execute(
+            "SELECT id FROM artifacts WHERE name = ?", (name,)
+        ).fetchone()
+        if row is None:
+            return
+        self.conn.execute("DELETE FROM postings WHERE artifact_id = ?", row)
+        self.conn.execute("DELETE FROM artifacts WHERE id = ?", row)
+
+    def iter_artifacts(self):
+        """Yield (artifact id, name) in name order."""
+        return self.conn.execute("SELECT id, name FROM artifacts ORDER BY name")
+
+    def iter_shared_postings(self):
+        """Yield (type, value, artifact id) for values in 2+ artifacts, grouped by value."""
+        return self.conn.execute(
+            """
+            SELECT e.type, e.value, p.artifact_id
+            FROM entities e
+            JOIN postings p ON p.entity_id = e.id
+            WHERE e.artifact_count > 1
+            ORDER BY e.type, e.value
+            """
+        )
+
+    def entities_after(self, entity_id: int, types):
+        """Yield (id, type, value) for entities of `types` added after `entity_id`, by id."""
+        marks = ",".join("?" * len(types))
+        return self.conn.execute(
+            f"SELECT id, type, value FROM entities WHERE id > ? AND type IN ({marks}) "
+            "ORDER BY id",
+            (entity_id, *types),
+        ).fetchall()
+
+    def fuzzy_entities(self, etype: str, scope: str, key: str) -> list:
+        """Ids of the entities whose values fold to `key` within one scope."""
+        return [
+            row[0]
+            for row in self.conn.execute(
+                "SELECT entity_id FROM fuzzy_keys WHERE type = ? AND scope = ? AND key = ?",
+                (etype, scope, key),
+            )
+        ]
+
+    def fuzzy_candidates(self, etype: str, scope: str, buckets) -> set:
+        """Keys of one type and scope sharing at least one LSH bucket with `buckets`."""
+        marks = ",".join("?" * len(buckets))
+        return {
+            row[0]
+            for row in self.conn.execute(
+                f"""
+                SELECT k.key
+                FROM fuzzy_buckets b
+                JOIN fuzzy_keys k ON k.entity_id = b.entity_id
+                WHERE b.bucket IN ({marks}) AND k.type = ? AND k.scope = ?
+                """,
+                (*buckets, etype, scope),
+            )
+        }
+
+    def add_fuzzy_state(self, keys, buckets, pairs):
+        """
+        Store fuzzy-matching state: (entity id, type, scope, key) rows,
+        (bucket, entity id) LSH buckets of new keys and (entity id, entity
+        id, similarity) near-duplicate pairs.
+        """
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO fuzzy_keys (entity_id, type, scope, key) VALUES (?, ?, ?, ?)",
+            keys,
+        )
+        self.conn.executemany(
+            "INSERT OR IGNORE INTO fuzzy_buckets (bucket, entity_id) VALUES (?, ?)",
+            buckets,
+        )
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO fuzzy_pairs (a, b, similarity) VALUES (?, ?, ?)",
+            ((min(a, b), max(a, b), sim) for a, b, sim in pairs),
+        )
+
+    def clear_fuzzy(self):
+        for table in ("fuzzy_keys", "fuzzy_buckets", "fuzzy_pairs"):
+            self.conn.execute(f"DELETE FROM {table}")
+
+    def iter_fuzzy_pairs(self, threshold: float = 0.0):
+        """
+        Yield (type, entity id a, value a, entity id b, value b, similarity)
+        for stored pairs at or above `threshold` whose values both still
+        occur in some artifact.
+        """
+        return self.conn.execute(
+            """
+            SELECT ea.type, ea.id, ea.value, eb.id, eb.value, f.similarity
+            FROM fuzzy_pairs f
+            JOIN entities ea ON ea.id = f.a
+            JOIN entities eb ON eb.id = f.b
+            WHERE f.similarity >= ? AND ea.artifact_count > 0 AND eb.artifact_count > 0
+            """,
+            (threshold,),
+        )
+
+    def entity_artifacts(self, entity_ids) -> dict:
+        """Return {entity id: [artifact names]} in name order."""
+        found = defaultdict(list)
+        for entity_id, name in self._select_in(
+            """
+            SELECT p.entity_id, a.name
+            FROM postings p
+            JOIN artifacts a ON a.id = p.artifact_id
+            WHERE p.entity_id IN ({ids})
+            ORDER BY a.name
+            """,
+            entity_ids,
+        ):
+            found[entity_id].append(name)
+        return found
+
+    def iter_values(self, etype: str):
+        """Yield (value, artifact name) for every indexed value of one entity type."""
+        return self.conn.execute(
+            """
+            SELECT e.value, a.name
+            FROM entities e
+            JOIN postings p ON p.entity_id = e.id
+            JOIN artifacts a ON a.id = p.artifact_id
+            WHERE e.type = ?
+            ORDER BY e.value, a.name
+            """,
+            (etype,),
+        )
+
+    def _select_in(self, sql: str, ids):
+        """Run `sql` (containing one `{ids}` placeholder) over `ids` in chunks."""
+        ids = list(ids)
+        for start in range(0, len(ids), QUERY_CHUNK):
+            chunk = ids[start : start + QUERY_CHUNK]
+            marks = ",".join("?" * len(chunk))
+            yield from self.conn.execute(sql.format(ids=marks), chunk)
+
+    def entity_id(self, etype: str, value: str):
+        row = self.conn.execute(
+            "SELECT id FROM entities WHERE type = ? AND value = ?", (etype, value)
+        ).fetchone()
+        return row[0] if row else None
+
+    def artifacts_of(self, entity_ids) -> set:
+        """Ids of the artifacts that contain any of the given entities."""
+        return {
+            row[0]
+            for row in self._select_in(
+                "SELECT DISTINCT artifact_id FROM postings WHERE entity_id IN ({ids})",
+                entity_ids,
+            )
+        }
+
+    def entities_of(self, artifact_ids):
+        """Yield (entity id, type, value, artifact_count) for entities in the given artifacts."""
+        return self._select_in(
+            """
+            SELECT DISTINCT e.id, e.type, e.value, e.artifact_count
+            FROM postings p
+            JOIN entities e ON e.id = p.entity_id
+            WHERE p.artifact_id IN ({ids})
+            """,
+            artifact_ids,
+        )
+
+    def artifact_names(self, artifact_ids) -> dict:
+        """Return {artifact id: name}."""
+        return dict(
+            self._select_in("SELECT id, name FROM artifacts WHERE id IN ({ids})", artifact_ids)
+        )
+
+    def shared_values(self) -> dict:
+        """Return {entity type: {value: [artifact names]}} for values in 2+ artifacts."""
+        shared = defaultdict(dict)
+        rows = self.conn.execute(
+            """
+            SELECT e.type, e.value, a.name
+            FROM entities e
+            JOIN postings p ON p.entity_id = e.id
+            JOIN artifacts a ON a.id = p.artifact_id
+            WHERE e.artifact_count > 1
+            ORDER BY e.type, e.value, a.name
+            """
+        )
+        for etype, value, name in rows:
+            shared[etype].setdefault(value, []).append(name)
+        return dict(shared)
@@ -0,0 +1,128 @@
+import json
+import time
+
+from scripts.correlation_index import CorrelationIndex
+from scripts.correlation_engine import ENTITY_SECTIONS
+from scripts.extractors import normalize_value
+
+DEFAULT_HOPS = 1
+
+# Query names for index types whose stored name reads differently: accounts
+# are indexed as `handle`, and `username` holds the sites they were found on
+QUERY_TYPES = {"username": "handle", "site": "username"}
+
+
+def parse_entity(spec: str) -> tuple:
+    """
+    Split a `type:value` query such as `ip:1.2.3.4` into a normalized
+    (index type, value); see QUERY_TYPES for the names that are translated.
+    """
+    etype, sep, value = spec.partition(":")
+    etype = etype.strip().lower()
+    if not sep or not value.strip():
+        raise ValueError(f"Expected <type>:<value>, got {spec!r}")
+    etype = QUERY_TYPES.get(etype, etype)
+    if etype not in ENTITY_SECTIONS:
+        known = ", ".join(sorted({*ENTITY_SECTIONS, *QUERY_TYPES}))
+        raise ValueError(f"Unknown entity type {etype!r} (expected one of: {known})")
+    return etype, normalize_value(etype, value)
+
+
+def query_entity(index, etype: str, value: str, hops: int = DEFAULT_HOPS) -> dict:
+    """
+    Expand the neighborhood of one entity in the prebuilt correlation index.
+
+    Hop 1 is every artifact mentioning the entity plus every entity those
+    artifacts contain; each further hop follows the newly found entities to
+    the artifacts that share them. Only entities held by 2+ artifacts are
+    followed, and nothing is re-parsed or re-synced, so a query costs a few
+    indexed lookups per hop.
+
+    Returns {"entity", "hops", "found", "artifacts": [{"name", "hop"}],
+    "entities": {type: {value: hop}}}.
+    """
+    value = normalize_value(etype, value)
+    result = {
+        "entity": {"type": etype, "value": value},
+        "hops": hops,
+        "found": False,
+        "artifacts": [],
+        "entities": {},
+    }
+    seed = index.entity_id(etype, value)
+    if seed is None:
+        return result
+    result["found"] = True
+
+    seen_entities = {seed}
+    artifact_hops = {}
+    linked = []
+    frontier = {seed}
+    for hop in range(1, hops + 1):
+        reached = index.artifacts_of(frontier) - artifact_hops.keys()
+        if not reached:
+            break
+        artifact_hops.update(dict.fromkeys(reached, hop))
+        frontier = set()
+        for entity_id, ltype, lvalue, artifact_count in index.entities_of(reached):
+            if entity_id in seen_entities:
+                continue
+            seen_entities.add(entity_id)
+            linked.append((ltype, lvalue, hop))
+            if artifact_count > 1:
+                frontier.add(entity_id)
+
+    names = index.artifact_names(artifact_hops)
+    result["artifacts"] = sorted(
+        ({"name": names[i], "hop": hop} for i, hop in artifact_hops.items()),
+        key=lambda a: (a["hop"], a["name"]),
+    )
+    for ltype, lvalue, hop in sorted(linked, key=lambda e: (e[0], e[2], e[1])):
+        result["entities"].setdefault(ltype, {})[lvalue] = hop
+    return result
+
+
+def run_query(spec: str, hops: int = DEFAULT_HOPS, as_json: bool = False) -> dict:
+    """Answer one `type:value` query from cache/cache.db and print the neighborhood."""
+    etype, value = parse_entity(spec)
+    start = time.perf_counter()
+    with CorrelationIndex() as index:
+        result = query_entity(index, etype, value, hops=hops)
+    result["elapsed_ms"] = round((time.perf_counter() - start) * 1000, 3)
+
+    if as_json:
+        print(json.dumps(result, indent=4))
+    else:
+        print_result(result)
+    return result
+
+
+def print_result(result: dict):
+    entity = f"{result['entity']['type']}:{result['entity']['value']}"
+    if not result["found"]:
+        print(f"No indexed artifact mentions {entity}.")
+        return
+
+    print(
+        f"🔗 {entity} — {len(result['artifacts'])} artifacts within "
+        f"{result['hops']} hop(s) ({result['elapsed_ms']} ms)"
+    )
+    for artifact in result["artifacts"]:
+        print(f"  [hop {artifact['hop']}] {artifact['name']}")
+    for etype, values in result["entities"].items():
+        print(f"  {ENTITY_SECTIONS.get(etype, etype)}:")
+        for value, hop in values.items():
+            print(f"    [hop {hop}] {value}")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Query the Auton-OSINT correlation index")
+    parser.add_argument("--entity", required=True, help="Entity to look up, e.g. ip:1.2.3.4")
+    parser.add_argument(
+        "--hops", type=int, default=DEFAULT_HOPS, help="Neighborhood radius to expand."
+    )
+    parser.add_argument("--json", action="store_true", help="Print the result as JSON.")
+    args = parser.parse_args()
+    run_query(args.entity, hops=args.hops, as_json=args.json)
@@ -0,0 +1,219 @@
+import time
+import heapq
+import logging
+import itertools
+import threading
+from pathlib import Path
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import yaml
+
+GLOBAL_CONFIG = Path(__file__).parents[1] / "config/global_config.yaml"
+
+DEFAULT_MAX_WORKERS = 8
+# Concurrent jobs allowed per module; subprocess-backed tools get fewer slots
+DEFAULT_MODULE_LIMITS = {
+    "phone_lookup": 2,
+    "email_verification": 4,
+    "username_search": 2,
+    "social_discovery": 4,
+    "domain_ip_lookup": 8,
+}
+
+logger = logging.getLogger("dispatcher")
+
+
+def load_global_section(section: str, path=None) -> dict:
+    """Read one top-level section of global_config.yaml ({} if absent)."""
+    try:
+        with open(path or GLOBAL_CONFIG, "r") as f:
+            return (yaml.safe_load(f) or {}).get(section) or {}
+    except FileNotFoundError:
+        return {}
+
+
+def load_dispatch_config(path=None) -> dict:
+    """Read the `dispatcher` section of global_config.yaml ({} if absent)."""
+    return load_global_section("dispatcher", path)
+
+
+class Dispatcher:
+    """
+    Run module lookups concurrently under a global and a per-module limit.
+
+    Lookups spend nearly all their time waiting on the network or on a child
+    process (phoneinfoga, h8mail, maigret), so threads are enough: a thread
+    blocked in subprocess.run or a socket read releases the GIL, and the
+    per-module limit caps how many of those child processes run at once.
+    Jobs wait in their module's queue rather than in the pool, so a backlog
+    of slow lookups never holds global slots that other modules could use.
+
+    Whenever a slot frees up, the next job is the highest-priority one among
+    modules under their limit; ties go to the lowest `scheduler` score (see
+    scripts.scheduler), or to submission order without a scheduler.
+    Deferred jobs (see defer) wait on a timer without holding any slot.
+    """
+
+    def __init__(
+        self,
+        max_workers: int = None,
+        module_limits: dict = None,
+        max_pending: int = None,
+        scheduler=None,
+    ):
+        config = load_dispatch_config()
+        self.max_workers = max_workers or config.get("max_workers", DEFAULT_MAX_WORKERS)
+        self.limits = {**DEFAULT_MODULE_LIMITS, **config.get("module_limits", {})}
+        self.limits.update(module_limits or {})
+        self.scheduler = scheduler
+        self.pool = ThreadPoolExecutor(self.max_workers, thread_name_prefix="dispatch")
+        self.lock = threading.Lock()
+        self.finished = threading.Condition(self.lock)
+        self.max_pending = max_pending
+        self.outstanding = 0
+        self.active = 0
+        self.running = {}
+        self.pending = {}
+        self.delayed = []
+        self.timer = None
+        self.timer_at = None
+        self.sequence = itertools.count()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.shutdown()
+
+    def shutdown(self):
+        """Wait for every submitted job, including those still queued per module."""
+        with self.finished:
+            self.finished.wait_for(lambda: self.outstanding == 0)
+        with self.lock:
+            if self.timer is not None:
+                self.timer.cancel()
+                self.timer = None
+        self.pool.shutdown()
+
+    def submit(self, module: str, func, *args, priority: int = 0, **kwargs) -> Future:
+        """
+        Queue `func(*args, **kwargs)` as a `module` job; returns its Future.
+        Higher `priority` jobs start first. With `max_pending` set, blocks
+        while that many jobs are unfinished, so a fast producer cannot queue
+        an unbounded backlog.
+        """
+        future = Future()
+        job = (future, func, args, kwargs)
+        with self.lock:
+            if self.max_pending:
+                self.finished.wait_for(lambda: self.outstanding < self.max_pending)
+            self.outstanding += 1
+            heapq.heappush(
+                self.pending.setdefault(module, []),
+                (-priority, next(self.sequence), time.monotonic(), job),
+            )
+            ready = self._take_ready()
+        for ready_module, ready_job in ready:
+            self._start(ready_module, ready_job)
+        return future
+
+    def defer(self, when: float, module: str, func, *args, priority: int = 0, **kwargs) -> Future:
+        """
+        Queue a `module` job that becomes ready at `when` (a time.time()
+        value); until then it holds no slot. Never blocks on max_pending,
+        so a running job can requeue itself (e.g. a retry after backoff).
+        """
+        future = Future()
+        job = (future, func, args, kwargs)
+        with self.lock:
+            self.outstanding += 1
+            heapq.heappush(self.delayed, (when, next(self.sequence), module, priority, job))
+            ready = self._take_ready()
+        for ready_module, ready_job in ready:
+            self._start(ready_module, ready_job)
+        return future
+
+    def _wake(self):
+        with self.lock:
+            self.timer = None
+            ready = self._take_ready()
+        for ready_module, ready_job in ready:
+            self._start(ready_module, ready_job)
+
+    def _release_due(self):
+        """Move deferred jobs whose time has come into their module queues (lock held)."""
+        now = time.time()
+        while self.delayed and self.delayed[0][0] <= now:
+            _, sequence, module, priority, job = heapq.heappop(self.delayed)
+            heapq.heappush(
+                self.pending.setdefault(module, []),
+                (-priority, sequence, time.monotonic(), job),
+            )
+        if not self.delayed:
+            return
+        when = self.delayed[0][0]
+        if self.timer is not None:
+            if self.timer_at <= when:
+                return
+            self.timer.cancel()
+        self.timer = threading.Timer(max(0.0, when - now), self._wake)
+        self.timer.daemon = True
+        self.timer_at = when
+        self.timer.start()
+
+    def _take_ready(self) -> list:
+        """Claim slots for as many queued jobs as limits allow (lock held)."""
+        self._release_due()
+        ready = []
+        now = time.monotonic()
+        while self.active < self.max_workers:
+            best = None
+            for module, queue in self.pending.items():
+                if not queue or self.running.get(module, 0) >= self.limits.get(
+                    module, self.max_workers
+                ):
+                    continue
+                negated_priority, sequence, queued_at, _ = queue[0]
+                score = self.scheduler.score(module, now - queued_at) if self.scheduler else 0.0
+                key = (negated_priority, score, sequence)
+                if best is None or key < best[0]:
+                    best = (key, module)
+            if best is None:
+                break
+            module = best[1]
+            job = heapq.heappop(self.pending[module])[-1]
+            self.running[module] = self.running.get(module, 0) + 1
+            self.active += 1
+            ready.append((module, job))
+        return ready
+
+    def _start(self, module: str, job):
+        self.pool.submit(self._run, module, job)
+
+    def _run(self, module: str, job):
+        future, func, args, kwargs = job
+        started = time.monotonic()
+        ran = ok = False
+        try:
+            if future.set_running_or_notify_cancel():
+                ran = True
+                try:
+                    future.set_result(func(*args, **kwargs))
+                    ok = True
+                except BaseException as e:
+                    logger.exception(f"{module} job failed: {e}")
+                    future.set_exception(e)
+        finally:
+            if ran and self.scheduler is not None:
+                try:
+                    self.scheduler.record(module, time.monotonic() - started, ok)
+                except Exception as e:
+                    logger.warning(f"Could not record {module} timing: {e}")
+            with self.lock:
+                self.outstanding -= 1
+                self.running[module] -= 1
+                self.active -= 1
+                self.finished.notify_all()
+                ready = self._take_ready()
+            for ready_module, ready_job in ready:
+                self._start(ready_module, ready_job)
@@ -0,0 +1,178 @@
+import re
+import ipaddress
+from collections import defaultdict
+from urllib.parse import urlsplit
+
+PHONE_KEYS = ("E164", "Local", "International", "Raw local")
+
+# producer (output filename prefix) → extractor, or None for hash-only outputs
+EXTRACTORS = {}
+
+
+def normalize_value(etype: str, value: str) -> str:
+    value = value.strip()
+    if etype == "phone":
+        return re.sub(r"[^\d+]", "", value)
+    if etype in ("domain", "ip"):
+        return value.lower().rstrip(".")
+    if etype == "email":
+        return value.lower()
+    if etype == "handle":
+        return value.lstrip("@").lower()
+    if etype == "profile_url":
+        # Scheme, www., query, fragment and trailing slashes do not identify a profile
+        parts = urlsplit(value if "//" in value else f"//{value}")
+        host = (parts.hostname or "").removeprefix("www.")
+        return f"{host}{parts.path.rstrip('/')}".lower() if host else ""
+    return value
+
+
+def is_ip(value) -> bool:
+    try:
+        ipaddress.ip_address(value.strip())
+        return True
+    except (AttributeError, ValueError):
+        return False
+
+
+class EntitySet:
+    """Normalized, de-duplicated values per entity type, in first-seen order."""
+
+    def __init__(self):
+        self.values = defaultdict(dict)
+
+    def add(self, etype: str, value):
+        if isinstance(value, str):
+            norm = normalize_value(etype, value)
+            if norm:
+                self.values[etype][norm] = None
+
+    def update(self, other):
+        for etype, values in other.values.items():
+            self.values[etype].update(values)
+
+    def to_dict(self) -> dict:
+        return {etype: list(values) for etype, values in self.values.items()}
+
+
+def register(*producers):
+    """Register an extractor for outputs whose filenames start with `<producer>_`."""
+
+    def decorator(func):
+        for producer in producers:
+            EXTRACTORS[producer] = func
+        return func
+
+    return decorator
+
+
+def producer_of(name: str):
+    """
+    Return the registered producer prefix for an output filename, if any.
+    Tries the name's underscore-delimited prefixes longest first, so the cost
+    is a few dict lookups however many producers are registered.
+    """
+    end = name.rfind("_")
+    while end > 0:
+        if name[:end] in EXTRACTORS:
+            return name[:end]
+        end = name.rfind("_", 0, end)
+    return None
+
+
+def get_extractor(name: str):
+    """
+    Pick the extractor for an output filename. Returns None when the output
+    carries nothing to correlate, so callers can skip parsing it entirely.
+    """
+    producer = producer_of(name)
+    return EXTRACTORS[producer] if producer else generic_entities
+
+
+def extract_members(name: str, members) -> dict:
+    """
+    Extract {entity type: [normalized values]} from one output's stream of
+    (key, subkey, value) events using the extractor for its producer.
+    """
+    extractor = get_extractor(name)
+    if extractor is None:
+        return {}
+    found = EntitySet()
+    extractor(members, found)
+    return found.to_dict()
+
+
+@register("phone_lookup")
+def phone_lookup_entities(members, found):
+    for key, subkey, value in members:
+        if subkey is None and key in PHONE_KEYS:
+            found.add("phone", value)
+
+
+@register("email_verification")
+def email_verification_entities(members, found):
+    for key, subkey, value in members:
+        if key == "email" and subkey is None:
+            found.add("email", value)
+        elif key == "xposed_breaches" and isinstance(subkey, int):
+            found.add("breach", value)
+
+
+@register("domain_ip_lookup")
+def domain_ip_lookup_entities(members, found):
+    for key, subkey, value in members:
+        if subkey is not None:
+            continue
+        if key == "target":
+            found.add("ip" if is_ip(value) else "domain", value)
+        elif key == "resolved_ip" and is_ip(value):
+            found.add("ip", value)
+
+
+@register("normalized_username", "normalized_social")
+def normalized_username_entities(members, found):
+    for key, subkey, value in members:
+        if key == "username" and subkey is None:
+            found.add("handle", value)
+        elif key == "found_on" and isinstance(value, dict):
+            found.add("username", value.get("site"))
+            found.add("profile_url", value.get("url"))
+
+
+# Raw reports whose entities are carried by their normalized_* counterparts;
+# indexing both would make every run correlate with itself.
+EXTRACTORS["maigret"] = None
+EXTRACTORS["social_discovery"] = None
+
+
+def generic_entities(members, found):
+    """
+    Fallback for outputs from unregistered producers (e.g. darkweb results):
+    probe every known key.
+    """
+    darkweb = EntitySet()  # held until "source" confirms a darkweb result
+    is_darkweb = False
+
+    for key, subkey, value in members:
+        if subkey is None:
+            if key in PHONE_KEYS:
+                found.add("phone", value)
+            elif key in ("domain", "ip", "email"):
+                found.add(key, value)
+            elif key == "username":
+                found.add("handle", value)
+            elif key == "keyword":
+                darkweb.add("darkweb_keyword", value)
+            elif key == "source":
+                is_darkweb = is_darkweb or value == "darkweb"
+        elif isinstance(subkey, int):
+            if key == "xposed_breaches":
+                found.add("breach", value)
+            elif key == "found_on" and isinstance(value, dict):
+                found.add("username", value.get("site"))
+                found.add("profile_url", value.get("url"))
+            elif key in ("darksearch", "torbot") and isinstance(value, dict):
+                darkweb.add("darkweb_site", value.get("link"))
+
+    if is_darkweb:
+        found.update(darkweb)
@@ -0,0 +1,234 @@
+import re
+import zlib
+from itertools import combinations
+from collections import defaultdict
+
+import numpy as np
+
+# Similarity (Jaccard over character shingles) a pair must reach to be reported
+DEFAULT_THRESHOLD = 0.6
+
+# 64 permutations in 16 bands of 4 rows puts the LSH S-curve midpoint near 0.5
+NUM_PERM = 64
+BANDS = 16
+SHINGLE_SIZE = 2
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_FNV_PRIME = np.uint64(0x100000001B3)
+_LEET = str.maketrans("013457@$", "oleastas")
+_SEPARATORS = re.compile(r"[\s_.\-]+")
+
+
+def handle_scope(value: str) -> tuple:
+    """(scope, fuzzy key) of a handle; every handle is compared with every other."""
+    return "", fuzzy_key(value)
+
+
+def profile_scope(url: str) -> tuple:
+    """(host, fuzzy key of the handle) of a profile URL; see similar_urls."""
+    host, handle = split_profile_url(url)
+    return host, fuzzy_key(handle) if handle else ""
+
+
+def split_profile_url(url: str) -> tuple:
+    """
+    (host, handle) of a normalized profile URL, the handle being its last
+    path segment: reddit.com/user/mark → ("reddit.com", "mark").
+    """
+    host, _, path = url.partition("/")
+    return host, path.rstrip("/").rpartition("/")[2]
+
+
+def fuzzy_key(value: str) -> str:
+    """Fold case, separators and common leetspeak: john_doe, JohnDoe, j0hn.doe → johndoe."""
+    return _SEPARATORS.sub("", value.lower().lstrip("@").translate(_LEET))
+
+
+def shingles(key: str, k: int = SHINGLE_SIZE) -> set:
+    """Stable hashes of the padded character k-grams of `key`."""
+    padded = f"^{key}$"
+    if len(padded) <= k:
+        return {zlib.crc32(padded.encode())}
+    return {
+        zlib.crc32(padded[i : i + k].encode()) for i in range(len(padded) - k + 1)
+    }
+
+
+def jaccard(a: set, b: set) -> float:
+    return len(a & b) / len(a | b) if a or b else 0.0
+
+
+class MinHashLSH:
+    """MinHash signatures bucketed by band; values sharing any band become candidates."""
+
+    def __init__(self, num_perm: int = NUM_PERM, bands: int = BANDS, seed: int = 1):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        rng = np.random.default_rng(seed)
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.a = rng.integers(1, _MERSENNE_PRIME, num_perm, dtype=np.uint64)
+        self.b = rng.integers(0, _MERSENNE_PRIME, num_perm, dtype=np.uint64)
+        self.buckets = defaultdict(list)
+
+    def signature(self, shingle_set: set) -> np.ndarray:
+        x = np.fromiter(shingle_set, dtype=np.uint64, count=len(shingle_set))
+        # uint64 wraparound stands in for the modular multiply; it stays a
+        # universal-style hash, which is all MinHash needs.
+        hashed = (np.outer(self.a, x) + self.b[:, None]) % _MERSENNE_PRIME
+        return hashed.min(axis=1)
+
+    def band_buckets(self, shingle_set: set, salt: int = 0) -> list:
+        """
+        One signed 64-bit bucket id per band, hashed from the band number,
+        its signature rows and `salt` (which keeps namespaces apart).
+        """
+        rows = self.signature(shingle_set).reshape(self.bands, self.rows)
+        ids = np.arange(self.bands, dtype=np.uint64) ^ np.uint64(salt)
+        for row in rows.T:
+            ids = ids * _FNV_PRIME ^ row
+        return ids.view(np.int64).tolist()
+
+    def add(self, item: int, shingle_set: set):
+        for bucket in self.band_buckets(shingle_set):
+            self.buckets[bucket].append(item)
+
+    def candidate_pairs(self) -> set:
+        pairs = set()
+        for items in self.buckets.values():
+            if len(items) > 1:
+                pairs.update(combinations(items, 2))
+        return pairs
+
+
+def similar_pairs(values, threshold: float = DEFAULT_THRESHOLD) -> list:
+    """
+    Find near-duplicate strings without comparing every pair.
+
+    Values folding to the same fuzzy key are paired directly (similarity 1.0);
+    distinct keys go through MinHash/LSH and candidates are verified against
+    the exact shingle Jaccard. Returns [(value_a, value_b, similarity)].
+    """
+    by_key = defaultdict(list)
+    for value in values:
+        key = fuzzy_key(value)
+        if key:
+            by_key[key].append(value)
+
+    results = []
+    for group in by_key.values():
+        results.extend((a, b, 1.0) for a, b in combinations(sorted(group), 2))
+
+    keys = list(by_key)
+    key_shingles = [shingles(key) for key in keys]
+    lsh = MinHashLSH()
+    for i, shingle_set in enumerate(key_shingles):
+        lsh.add(i, shingle_set)
+
+    for i, j in lsh.candidate_pairs():
+        sim = jaccard(key_shingles[i], key_shingles[j])
+        if sim >= threshold:
+            for a in by_key[keys[i]]:
+                for b in by_key[keys[j]]:
+                    results.append((*sorted((a, b)), round(sim, 3)))
+
+    results.sort(key=lambda r: (-r[2], r[0], r[1]))
+    return results
+
+
+def similar_urls(urls, threshold: float = DEFAULT_THRESHOLD) -> list:
+    """
+    Near-duplicate profile URLs (github.com/john_doe / github.com/johndoe).
+
+    Only the handles are shingled, and only URLs on the same host are
+    compared, so the host a pair shares never makes distinct handles look
+    alike. Accounts on different sites are linked by the handle type
+    instead. Returns [(url_a, url_b, similarity)] like similar_pairs.
+    """
+    by_host = defaultdict(lambda: defaultdict(list))
+    for url in urls:
+        host, handle = split_profile_url(url)
+        if handle:
+            by_host[host][handle].append(url)
+
+    results = []
+    for handles in by_host.values():
+        # The same handle under different paths (reddit.com/u/x, reddit.com/user/x)
+        for group in handles.values():
+            results.extend((a, b, 1.0) for a, b in combinations(sorted(group), 2))
+        if len(handles) < 2:
+            continue
+        for a, b, sim in similar_pairs(list(handles), threshold):
+            for url_a in handles[a]:
+                for url_b in handles[b]:
+                    results.append((*sorted((url_a, url_b)), sim))
+
+    results.sort(key=lambda r: (-r[2], r[0], r[1]))
+    return results
+
+
+def update_pairs(index, scopes: dict, threshold: float = DEFAULT_THRESHOLD) -> int:
+    """
+    Bring the near-duplicate pairs stored in a CorrelationIndex up to date.
+
+    `scopes` maps entity type → function(value) → (scope, fuzzy key), e.g.
+    profile_scope; only values of one type and scope are compared. Each
+    entity indexed since the last call is matched against the keys stored
+    by earlier calls and those new in this one: equal keys pair directly,
+    and every new entity looks up its key's LSH buckets and verifies the
+    candidates' exact Jaccard, so the cost follows the new values, not the
+    index. Pairs are
+    the ones similar_pairs / similar_urls would report. Changing `threshold`
+    rebuilds the state. Returns how many entities were processed.
+    """
+    last = index.get_meta("fuzzy_entity_id", 0)
+    if index.get_meta("fuzzy_threshold") != threshold:
+        index.clear_fuzzy()
+        index.set_meta("fuzzy_threshold", threshold)
+        last = 0
+    new = index.entities_after(last, list(scopes))
+    if not new:
+        return 0
+
+    lsh = MinHashLSH()
+    keys = defaultdict(list)  # (type, scope, key) → entity ids new in this call
+    buckets = defaultdict(list)  # bucket id → keys new in this call
+    key_rows, bucket_rows, pairs = [], [], []
+
+    def entities(etype, scope, key):
+        stored = index.fuzzy_entities(etype, scope, key) if last else []
+        return stored + keys[(etype, scope, key)]
+
+    for entity_id, etype, value in new:
+        scope, key = scopes[etype](value)
+        if not key:
+            continue
+        same = entities(etype, scope, key)
+        pairs.extend((entity_id, other, 1.0) for other in same)
+        # Every entity looks up its key's neighbours, even when the key is
+        # already stored: the pairs must not depend on insertion order.
+        key_shingles = shingles(key)
+        salt = zlib.crc32(f"{etype}\0{scope}".encode())
+        key_buckets = lsh.band_buckets(key_shingles, salt)
+        candidates = index.fuzzy_candidates(etype, scope, key_buckets) if last else set()
+        for bucket in key_buckets:
+            candidates.update(buckets[bucket])
+        candidates.discard(key)
+        if not same:
+            # Only a key's first entity is bucketed; candidates resolve to keys
+            for bucket in key_buckets:
+                buckets[bucket].append(key)
+                bucket_rows.append((bucket, entity_id))
+        for other_key in candidates:
+            sim = jaccard(key_shingles, shingles(other_key))
+            if sim >= threshold:
+                sim = round(sim, 3)
+                pairs.extend(
+                    (entity_id, other, sim) for other in entities(etype, scope, other_key)
+                )
+        keys[(etype, scope, key)].append(entity_id)
+        key_rows.append((entity_id, etype, scope, key))
+
+    index.add_fuzzy_state(key_rows, bucket_rows, pairs)
+    index.set_meta("fuzzy_entity_id", new[-1][0])
+    return len(new)
@@ -0,0 +1,304 @@
+import json
+import time
+import hashlib
+import logging
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from scripts import correlation_index
+from scripts.dispatcher import load_global_section
+from scripts.rate_limiter import polite_get
+
+# Cache modes: "on" reads and writes, "refresh" skips reads but stores
+# fresh answers, "off" bypasses the cache entirely (--refresh / --no-cache)
+MODES = ("on", "refresh", "off")
+DEFAULT_TTL = 24 * 3600
+# 404/410 answers ("no such profile / address") are kept for less time
+DEFAULT_NEGATIVE_TTL = 3600
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+# Eviction trims the cache to this fraction of max_bytes
+EVICT_TO = 0.9
+# Bytes charged per row on top of its body, URL and headers (key, times,
+# index entries), so bodiless probe verdicts count towards max_bytes too
+ROW_OVERHEAD = 128
+# Expired rows are deleted at most this often (seconds), whatever the size
+DEFAULT_PURGE_INTERVAL = 3600
+NEGATIVE_STATUSES = (404, 410)
+# Request headers that identify the caller rather than the request
+IGNORED_HEADERS = ("user-agent",)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS http_cache (
+    key TEXT PRIMARY KEY,
+    url TEXT NOT NULL,
+    status INTEGER NOT NULL,
+    headers TEXT NOT NULL,
+    body BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    stored_at REAL NOT NULL,
+    expires_at REAL NOT NULL,
+    accessed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_http_cache_accessed ON http_cache(accessed_at);
+"""
+
+logger = logging.getLogger("http_cache")
+
+
+def load_cache_config(path=None) -> dict:
+    """Read the `http_cache` section of global_config.yaml ({} if absent)."""
+    return load_global_section("http_cache", path)
+
+
+def entry_size(url: str, headers: str, body: bytes) -> int:
+    """Bytes a cached row is charged against max_bytes (headers as stored JSON)."""
+    return len(body) + len(url) + len(headers) + ROW_OVERHEAD
+
+
+def normalize_url(url: str, params=None) -> str:
+    """
+    Canonical form of a GET URL: lowercase scheme and host, default port
+    and fragment dropped, `params` merged into the query and every query
+    parameter sorted.
+    """
+    parts = urlsplit(url)
+    host = (parts.hostname or "").lower()
+    port = parts.port
+    if port and (parts.scheme, port) not in (("http", 80), ("https", 443)):
+        host = f"{host}:{port}"
+    query = parse_qsl(parts.query, keep_blank_values=True)
+    if params:
+        query += [(str(k), str(v)) for k, v in dict(params).items()]
+    return urlunsplit(
+        (parts.scheme.lower(), host, parts.path or "/", urlencode(sorted(query)), "")
+    )
+
+
+def request_key(method: str, url: str, params=None, headers=None, variant: str = "") -> str:
+    """Cache key for a request: method, normalized URL and identifying headers."""
+    headers = sorted(
+        (k.lower(), str(v)) for k, v in (headers or {}).items() if k.lower() not in IGNORED_HEADERS
+    )
+    material = json.dumps([method.upper(), normalize_url(url, params), headers, variant])
+    return hashlib.sha256(material.encode()).hexdigest()
+
+
+class CachedResponse:
+    """The parts of requests.Response that lookups use, served from the cache."""
+
+    from_cache = True
+
+    def __init__(self, url: str, status: int, headers: dict, body: bytes):
+        self.url = url
+        self.status_code = status
+        self.headers = CaseInsensitiveDict(headers)
+        self.content = body
+        self.ok = status < 400
+
+    @property
+    def text(self) -> str:
+        return self.content.decode("utf-8", errors="replace")
+
+    def json(self):
+        return json.loads(self.content)
+
+    def raise_for_status(self):
+        if not self.ok:
+            raise requests.HTTPError(f"{self.status_code} Error (cached) for url: {self.url}")
+
+
+class HttpCache:
+    """
+    Shared HTTP response cache in cache/cache.db.
+
+    Entries are keyed by normalized request (see request_key) and expire
+    after a per-endpoint TTL: `ttls` maps a host, or host/path prefix, to
+    seconds and the longest matching prefix wins. 404/410 answers are
+    cached for `negative_ttl`, other errors not at all. When the stored
+    rows outgrow `max_bytes` (see entry_size), the least recently used
+    entries are evicted, and expired rows are purged every
+    `purge_interval` seconds. Safe to share between threads; processes
+    share it through SQLite.
+    """
+
+    def __init__(self, db_path=None, mode: str = None):
+        config = load_cache_config()
+        self.mode = mode or ("on" if config.get("enabled", True) else "off")
+        if self.mode not in MODES:
+            raise ValueError(f"Unknown cache mode {self.mode!r}")
+        self.default_ttl = config.get("default_ttl", DEFAULT_TTL)
+        self.negative_ttl = config.get("negative_ttl", DEFAULT_NEGATIVE_TTL)
+        self.max_bytes = config.get("max_bytes", DEFAULT_MAX_BYTES)
+        self.purge_interval = config.get("purge_interval", DEFAULT_PURGE_INTERVAL)
+        self.next_purge = 0.0
+        self.ttls = sorted((config.get("ttls") or {}).items(), key=lambda kv: -len(kv[0]))
+        self.db_path = Path(db_path or correlation_index.CACHE_DB)
+        self.db_path.parent.mkdir(exist_ok=True)
+        self.conn = sqlite3.connect(
+            self.db_path, timeout=30, isolation_level=None, check_same_thread=False
+        )
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        self.lock = threading.Lock()
+        self.size = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM http_cache").fetchone()[0]
+        self.hits = self.misses = 0
+
+    def close(self):
+        self.conn.close()
+
+    def ttl_for(self, url: str, status: int) -> float:
+        if status in NEGATIVE_STATUSES:
+            return self.negative_ttl
+        parts = urlsplit(url)
+        target = f"{(parts.hostname or '').lower()}{parts.path}"
+        for prefix, ttl in self.ttls:
+            if target.startswith(prefix):
+                return ttl
+        return self.default_ttl
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        """The live entry for `key`, or None (always None unless mode is "on")."""
+        if self.mode != "on":
+            return None
+        now = time.time()
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT url, status, headers, body FROM http_cache WHERE key = ? AND expires_at > ?",
+                (key, now),
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.conn.execute("UPDATE http_cache SET accessed_at = ? WHERE key = ?", (now, key))
+        url, status, headers, body = row
+        return CachedResponse(url, status, json.loads(headers), body)
+
+    def put(self, key: str, url: str, status: int, headers: dict, body: bytes, ttl: float = None):
+        """
+        Store an answer for `ttl` seconds (default: per endpoint). 404/410
+        always get the negative TTL; other non-2xx statuses are not stored.
+        """
+        if self.mode == "off" or not (200 <= status < 300 or status in NEGATIVE_STATUSES):
+            return
+        if ttl is None or status in NEGATIVE_STATUSES:
+            ttl = self.ttl_for(url, status)
+        if ttl <= 0:
+            return
+        now = time.time()
+        headers = json.dumps(dict(headers))
+        size = entry_size(url, headers, body)
+        with self.lock:
+            old = self.conn.execute("SELECT size FROM http_cache WHERE key = ?", (key,)).fetchone()
+            self.conn.execute(
+                "INSERT OR REPLACE INTO http_cache "
+                "(key, url, status, headers, body, size, stored_at, expires_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, url, status, headers, body, size, now, now + ttl, now),
+            )
+            self.size += size - (old[0] if old else 0)
+            if self.size > self.max_bytes:
+                self._evict()
+            elif now >= self.next_purge:
+                self._purge_expired()
+
+    def get_verdict(self, key: str) -> Optional[bool]:
+        """A cached yes/no probe outcome (see put_verdict), or None."""
+        hit = self.get(key)
+        return None if hit is None else hit.status_code == 200
+
+    def put_verdict(self, key: str, url: str, found: bool):
+        """
+        Cache a probe outcome rather than the page behind it: found is kept
+        as a bodiless 200 (endpoint TTL), missing as a 404 (negative TTL).
+        """
+        self.put(key, url, 200 if found else 404, {}, b"")
+
+    def _purge_expired(self):
+        """Delete expired rows and recount the size (lock held)."""
+        now = time.time()
+        self.conn.execute("DELETE FROM http_cache WHERE expires_at <= ?", (now,))
+        # Other processes write here too, so recount rather than subtract
+        self.size = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM http_cache").fetchone()[0]
+        self.next_purge = now + self.purge_interval
+
+    def _evict(self):
+        """Drop expired, then least recently used entries (lock held)."""
+        self._purge_expired()
+        target = self.max_bytes * EVICT_TO
+        if self.size <= target:
+            return
+        freed = 0
+        doomed = []
+        for key, size in self.conn.execute(
+            "SELECT key, size FROM http_cache ORDER BY accessed_at"
+        ):
+            doomed.append((key,))
+            freed += size
+            if self.size - freed <= target:
+                break
+        self.conn.executemany("DELETE FROM http_cache WHERE key = ?", doomed)
+        self.size -= freed
+        logger.info(f"Evicted {len(doomed)} cached responses ({freed:,} bytes)")
+
+    def stats(self) -> dict:
+        with self.lock:
+            entries = self.conn.execute("SELECT COUNT(*) FROM http_cache").fetchone()[0]
+        return {"entries": entries, "bytes": self.size, "hits": self.hits, "misses": self.misses}
+
+
+_cache = None
+_cache_lock = threading.Lock()
+_mode = None
+
+
+def set_cache_mode(mode: str):
+    """Switch the process-wide cache to "on", "refresh" or "off" (CLI flags)."""
+    global _mode
+    if mode not in MODES:
+        raise ValueError(f"Unknown cache mode {mode!r}")
+    with _cache_lock:
+        _mode = mode
+        if _cache is not None:
+            _cache.mode = mode
+
+
+def get_cache() -> HttpCache:
+    """The process-wide cache, opened on first use."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = HttpCache(mode=_mode)
+        return _cache
+
+
+def reset_cache():
+    """Close the process-wide cache; the next get_cache() reopens it."""
+    global _cache, _mode
+    with _cache_lock:
+        if _cache is not None:
+            _cache.close()
+        _cache, _mode = None, None
+
+
+def cached_get(url: str, params=None, headers=None, ttl: float = None, **kwargs):
+    """
+    requests.get through the shared cache. Returns a CachedResponse on a
+    hit, otherwise the live response (stored when cacheable), fetched
+    under the host's rate limit (see scripts.rate_limiter.polite_get).
+    """
+    cache = get_cache()
+    key = request_key("GET", url, params, headers)
+    hit = cache.get(key)
+    if hit is not None:
+        return hit
+    resp = polite_get(url, params=params, headers=headers, **kwargs)
+    cache.put(key, normalize_url(url, params), resp.status_code, resp.headers, resp.content, ttl)
+    return resp
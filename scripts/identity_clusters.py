@@ -0,0 +1,71 @@
+from collections import defaultdict
+
+
+class UnionFind:
+    """Disjoint sets over 0..n-1 with union by rank and path halving."""
+
+    def __init__(self, n: int):
+        self.parent = list(range(n))
+        self.rank = [0] * n
+
+    def find(self, x: int) -> int:
+        parent = self.parent
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    def union(self, a: int, b: int) -> int:
+        ra, rb = self.find(a), self.find(b)
+        if ra == rb:
+            return ra
+        if self.rank[ra] < self.rank[rb]:
+            ra, rb = rb, ra
+        self.parent[rb] = ra
+        if self.rank[ra] == self.rank[rb]:
+            self.rank[ra] += 1
+        return ra
+
+
+def build_clusters(lists, types=None) -> list:
+    """
+    Merge artifacts transitively across shared entities into identity clusters.
+
+    `lists` is a PostingLists; each shared entity links all of its artifacts,
+    so a phone file and an email file joined only through a common domain end
+    up in the same cluster. `types` restricts which entity types may bridge.
+    Returns clusters of 2+ artifacts, largest first:
+    {"size", "artifacts": [names], "bridges": {type: [values]}}.
+    """
+    uf = UnionFind(len(lists.names))
+    bridging = []
+    linked = set()
+
+    for i, (etype, value) in enumerate(lists.keys):
+        if types is not None and etype not in types:
+            continue
+        ids = lists.entity_postings(i).tolist()
+        first = ids[0]
+        for other in ids[1:]:
+            uf.union(first, other)
+        bridging.append((first, etype, value))
+        linked.update(ids)
+
+    members = defaultdict(list)
+    for artifact in sorted(linked):
+        members[uf.find(artifact)].append(lists.names[artifact])
+
+    bridges = defaultdict(lambda: defaultdict(list))
+    for first, etype, value in bridging:
+        bridges[uf.find(first)][etype].append(value)
+
+    clusters = [
+        {
+            "size": len(names),
+            "artifacts": names,
+            "bridges": {etype: values for etype, values in bridges[root].items()},
+        }
+        for root, names in members.items()
+    ]
+    clusters.sort(key=lambda c: (-c["size"], c["artifacts"][0]))
+    return clusters
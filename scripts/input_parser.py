@@ -1,8 +1,7 @@
 #!/usr/bin/env python3
 import argparse
-import re
 import logging
-from typing import Optional
+from concurrent.futures import as_completed
 
 from modules.phone_lookup.phone_lookup import phone_lookup
 from modules.email_verification.email_verification import verify_email
@@ -11,29 +10,12 @@ from modules.social_media_discovery.social_media_discovery import social_discove
 from modules.domain_ip_lookup.domain_ip_lookup import domain_ip_lookup
 from scripts.correlation_engine import correlate_data
 from scripts.visualization import visualize_correlations
+from scripts.dispatcher import Dispatcher
+from scripts.scheduler import STRATEGIES, Scheduler, parse_priorities
+from scripts.classifier import PATTERNS, classify_bulk, detect_input_type  # noqa: F401
 
 logger = logging.getLogger("input_parser")
 
-# ————————————————————————————————————————
-# Centralize your patterns here
-PATTERNS = {
-    "phone": re.compile(r"^\+?\d[\d\s\-\(\)\.]+$"),
-    "email": re.compile(r"^[^@]+@[^@]+\.[^@]+$"),
-    "ip": re.compile(r"^(?:\d{1,3}\.){3}\d{1,3}$"),
-    "domain": re.compile(r"^[A-Za-z0-9\.\-]+\.[A-Za-z]{2,}$"),
-    "username": re.compile(r"^@?[A-Za-z0-9_.\-]{3,}$"),
-}
-
-
-def detect_input_type(item: str) -> Optional[str]:
-    """
-    Returns one of PATTERNS keys or None.
-    """
-    for t, rx in PATTERNS.items():
-        if rx.fullmatch(item):
-            return t
-    return None
-
 
 def split_items(field: str) -> list:
     """
@@ -42,10 +24,11 @@ def split_items(field: str) -> list:
     return [x.strip() for x in field.split(",") if x.strip()]
 
 
-def main(override_flags=None):
+def main(override_flags=None, queue=None):
     """
     If override_flags is a Namespace, skip argparse;
     otherwise, parse CLI exactly as before.
+    With a JobQueue, lookups are recorded in (and resumed from) its run.
     """
     if override_flags:
         args = override_flags
@@ -91,6 +74,27 @@ def main(override_flags=None):
             default="both",
             help="Choose output format for correlation graphs",
         )
+        parser.add_argument(
+            "--live",
+            action="store_true",
+            help="Correlate & visualize after each username instead of once at the end",
+        )
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            help="Maximum lookups in flight (default: dispatcher.max_workers)",
+        )
+        parser.add_argument(
+            "--priority",
+            action="append",
+            metavar="SELECTOR=N",
+            help="Run SELECTOR's lookups ahead of lower priorities (default 0)",
+        )
+        parser.add_argument(
+            "--schedule",
+            choices=STRATEGIES,
+            help="Lookup ordering (default: scheduler.strategy, sejf)",
+        )
 
         args = parser.parse_args()
 
@@ -114,60 +118,120 @@ def main(override_flags=None):
 
     # 2) Bare “input” (also comma‑lists)
     if getattr(args, "input", None):
-        for item in split_items(args.input):
-            cat = detect_input_type(item)
-            if cat in ("phone", "email", "username"):
-                buckets[cat].append(item.lstrip("@") if cat == "username" else item)
-            elif cat in ("domain", "ip"):
-                # domain/ip both feed into domain_ip_lookup
-                buckets[cat].append(item)
-            else:
-                logger.error(f"Could not classify input: {item}")
+        classified = classify_bulk(split_items(args.input))
+        for item in classified.pop("invalid"):
+            logger.error(f"Could not classify input: {item}")
+        for cat, items in classified.items():
+            if cat == "username":
+                items = [item.lstrip("@") for item in items]
+            # domain/ip both feed into domain_ip_lookup
+            buckets[cat].extend(items)
 
     # If nothing to do, bail early
     if not any(buckets.values()):
         print("⚠️ No valid inputs detected. Use `--help`.")
         return
 
-    # ————————————————————————————————————————
-    # Dispatch to each module
-    # PHONE
-    for num in buckets["phone"]:
-        logger.info(f"Dispatch phone_lookup → {num}")
-        print(f"📞 Phone lookup: {num}")
-        phone_lookup(num)
-        print("✅ Done.\n")
-
-    # EMAIL
-    for addr in buckets["email"]:
-        logger.info(f"Dispatch verify_email → {addr}")
-        print(f"📧 Email verify: {addr}")
-        verify_email(addr)
-        print("✅ Done.\n")
-
-    # USERNAME + SOCIAL + CORRELATE & VIS
-    for usr in buckets["username"]:
-        logger.info(f"Dispatch search_username → {usr}")
-        print(f"🔎 Username search: {usr}")
-        search_username(usr)
-        print("✅ Done.")
-
-        print(f"🌐 Social discovery: {usr}")
-        social_discovery(
-            usr,
-            user_id=getattr(args, "user_id", None),
-            discriminator=getattr(args, "discriminator", None),
-        )
-        print("✅ Done.\n")
+    dispatch(buckets, args, queue)
 
+    # main.py correlates and renders once after the parser returns
+    if not override_flags:
         print("📊 Correlating & visualizing…")
         correlate_data()
         visualize_correlations()
         print("✅ All processing complete.\n")
 
-    # DOMAIN & IP (same module)
-    for host in buckets["domain"] + buckets["ip"]:
-        logger.info(f"Dispatch domain_ip_lookup → {host}")
-        print(f"🌍 Domain/IP lookup: {host}")
-        domain_ip_lookup(host)
-        print("✅ Done.\n")
+
+def lookups_for(category: str, item: str, args) -> list:
+    """Return the (module, func, args, kwargs) jobs one classified input fans out to."""
+    if category == "phone":
+        return [("phone_lookup", phone_lookup, (item,), {})]
+    if category == "email":
+        return [("email_verification", verify_email, (item,), {})]
+    if category == "username":
+        return [
+            ("username_search", search_username, (item,), {}),
+            (
+                "social_discovery",
+                social_discovery,
+                (item,),
+                {
+                    "user_id": getattr(args, "user_id", None),
+                    "discriminator": getattr(args, "discriminator", None),
+                },
+            ),
+        ]
+    if category in ("domain", "ip"):
+        return [("domain_ip_lookup", domain_ip_lookup, (item,), {})]
+    return []
+
+
+def dispatch(buckets: dict, args, queue=None) -> dict:
+    """
+    Run every lookup concurrently and report each as it finishes.
+
+    Per-module limits come from the `dispatcher` section of
+    config/global_config.yaml; --concurrency overrides the global limit.
+    Correlation is left to the caller, once per run, unless --live asks for
+    a correlate & render after each username completes.
+    With a JobQueue, lookups that already finished in its run are skipped
+    and failures are retried with backoff.
+    Lookups start in scheduler order (cheapest expected module first by
+    default, --priority selectors ahead of the rest), and their timings
+    feed the scheduler's per-module statistics for the next run.
+    Returns {(module, item): result} for the lookups that succeeded.
+    """
+    jobs = {}
+    results = {}
+    live = getattr(args, "live", False)
+    user_jobs = {}  # username → lookups still running for it (live mode)
+    priorities = parse_priorities(getattr(args, "priority", None))
+
+    lookups = []
+    for category, items in buckets.items():
+        for item in items:
+            for module, func, func_args, func_kwargs in lookups_for(category, item, args):
+                done = queue.completed(module, item) if queue else None
+                if done is not None:
+                    print(f"⏭️ {module} already done: {item}")
+                    results[(module, item)] = done
+                    continue
+                lookups.append((module, item, category, func, func_args, func_kwargs))
+
+    with Scheduler(getattr(args, "schedule", None)) as scheduler, Dispatcher(
+        max_workers=getattr(args, "concurrency", None), scheduler=scheduler
+    ) as dispatcher:
+        for module, item, category, func, func_args, func_kwargs in scheduler.order(
+            lookups, priorities
+        ):
+            logger.info(f"Dispatch {module} → {item}")
+            print(f"🚀 Queued {module}: {item}")
+            priority = priorities.get(item, 0)
+            if queue:
+                future = queue.submit(
+                    dispatcher, module, item, func, *func_args, priority=priority, **func_kwargs
+                )
+            else:
+                future = dispatcher.submit(
+                    module, func, *func_args, priority=priority, **func_kwargs
+                )
+            jobs[future] = (module, item)
+            if category == "username":
+                user_jobs[item] = user_jobs.get(item, 0) + 1
+
+        for future in as_completed(jobs):
+            module, label = jobs[future]
+            if future.exception():
+                print(f"❌ {module} failed for {label}: {future.exception()}")
+            else:
+                print(f"✅ {module} done: {label}")
+                results[(module, label)] = future.result()
+
+            if live and label in user_jobs:
+                user_jobs[label] -= 1
+                if user_jobs[label] == 0:
+                    print(f"📊 Correlating & visualizing {label}…")
+                    correlate_data()
+                    visualize_correlations()
+
+    return results
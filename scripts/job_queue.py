@@ -0,0 +1,292 @@
+import json
+import time
+import logging
+import sqlite3
+import threading
+from pathlib import Path
+from concurrent.futures import Future
+from typing import Optional
+
+from scripts import correlation_index
+from scripts.dispatcher import load_global_section
+
+DEFAULT_MAX_ATTEMPTS = 3
+# Retry n waits DEFAULT_BACKOFF * 2**(n-1) seconds, capped at DEFAULT_BACKOFF_MAX
+DEFAULT_BACKOFF = 2.0
+DEFAULT_BACKOFF_MAX = 60.0
+
+PENDING, RUNNING, DONE, FAILED = "pending", "running", "done", "failed"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    inputs TEXT NOT NULL,
+    started_at REAL NOT NULL,
+    finished_at REAL
+);
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY,
+    run_id INTEGER NOT NULL REFERENCES runs(id),
+    module TEXT NOT NULL,
+    selector TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    result_path TEXT,
+    result TEXT,
+    error TEXT,
+    queued_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL,
+    duration REAL,
+    next_attempt_at REAL,
+    UNIQUE (run_id, module, selector)
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs(run_id, status);
+"""
+
+logger = logging.getLogger("job_queue")
+
+
+def load_queue_config(path=None) -> dict:
+    """Read the `job_queue` section of global_config.yaml ({} if absent)."""
+    return load_global_section("job_queue", path)
+
+
+def result_path(result) -> Optional[str]:
+    """The output file a lookup produced, when its return value names one."""
+    if isinstance(result, (str, Path)):
+        return str(result)
+    if isinstance(result, dict) and result.get("file"):
+        return str(result["file"])
+    return None
+
+
+def ensure_result(module: str, result):
+    """Raise LookupError for the None / {"error": ...} returns modules use to report failure."""
+    if result is None or (isinstance(result, dict) and result.get("error")):
+        raise LookupError((result or {}).get("error") or f"{module} returned no result")
+    return result
+
+
+class JobQueue:
+    """
+    Durable record of every (module, selector) lookup in a run.
+
+    Backed by SQLite in cache/cache.db next to the correlation index. Each
+    job row carries its status, attempt count, result (and output path) and
+    timing, and is committed as soon as it changes, so a crashed or
+    interrupted run can be resumed: finished lookups are answered from the
+    table and only pending or failed ones touch the network again. A failed
+    lookup is retried with exponential backoff: the attempt gives up its
+    dispatcher slot and the retry is deferred until `next_attempt_at`, so
+    backoff never holds a slot and only attempts themselves are timed.
+    """
+
+    def __init__(
+        self,
+        db_path=None,
+        max_attempts: int = None,
+        backoff: float = None,
+        backoff_max: float = None,
+    ):
+        config = load_queue_config()
+        self.max_attempts = max_attempts or config.get("max_attempts", DEFAULT_MAX_ATTEMPTS)
+        self.backoff = backoff if backoff is not None else config.get("backoff", DEFAULT_BACKOFF)
+        self.backoff_max = (
+            backoff_max if backoff_max is not None else config.get("backoff_max", DEFAULT_BACKOFF_MAX)
+        )
+        self.db_path = Path(db_path or correlation_index.CACHE_DB)
+        self.db_path.parent.mkdir(exist_ok=True)
+        # Autocommit: every status change is durable the moment it is made
+        self.conn = sqlite3.connect(
+            self.db_path, timeout=30, isolation_level=None, check_same_thread=False
+        )
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        self.lock = threading.Lock()
+        self.run_id = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def close(self):
+        self.conn.close()
+
+    def _execute(self, sql: str, params=()) -> list:
+        with self.lock:
+            return self.conn.execute(sql, params).fetchall()
+
+    # — Runs
+
+    def begin(self, inputs: dict) -> int:
+        """Start a new run for `inputs` (the CLI selectors); returns its id."""
+        with self.lock:
+            cur = self.conn.execute(
+                "INSERT INTO runs (inputs, started_at) VALUES (?, ?)",
+                (json.dumps(inputs), time.time()),
+            )
+        self.run_id = cur.lastrowid
+        return self.run_id
+
+    def interrupted(self) -> Optional[dict]:
+        """The most recent unfinished run as {"id", "inputs", "started_at"}, or None."""
+        rows = self._execute(
+            "SELECT id, inputs, started_at FROM runs WHERE finished_at IS NULL "
+            "ORDER BY id DESC LIMIT 1"
+        )
+        if not rows:
+            return None
+        run_id, inputs, started_at = rows[0]
+        return {"id": run_id, "inputs": json.loads(inputs), "started_at": started_at}
+
+    def resume(self, run_id: int = None) -> Optional[dict]:
+        """
+        Reopen `run_id` (default: the latest unfinished run) and return its
+        inputs, or None if there is nothing to resume. Jobs that were
+        mid-flight when the run stopped go back to pending.
+        """
+        if run_id is None:
+            run = self.interrupted()
+            if run is None:
+                return None
+            run_id, inputs = run["id"], run["inputs"]
+        else:
+            rows = self._execute("SELECT inputs FROM runs WHERE id = ?", (run_id,))
+            if not rows:
+                return None
+            inputs = json.loads(rows[0][0])
+        self._execute(
+            "UPDATE jobs SET status = ? WHERE run_id = ? AND status = ?",
+            (PENDING, run_id, RUNNING),
+        )
+        self._execute("UPDATE runs SET finished_at = NULL WHERE id = ?", (run_id,))
+        self.run_id = run_id
+        return inputs
+
+    def counts(self) -> dict:
+        """{status: jobs} for the current run."""
+        return dict(
+            self._execute(
+                "SELECT status, COUNT(*) FROM jobs WHERE run_id = ? GROUP BY status",
+                (self.run_id,),
+            )
+        )
+
+    def finish(self) -> dict:
+        """
+        Mark the run finished unless jobs failed or never ran, which keeps
+        it resumable. Returns counts().
+        """
+        counts = self.counts()
+        if not any(counts.get(status) for status in (PENDING, RUNNING, FAILED)):
+            self._execute(
+                "UPDATE runs SET finished_at = ? WHERE id = ?", (time.time(), self.run_id)
+            )
+        return counts
+
+    # — Jobs
+
+    def completed(self, module: str, selector: str):
+        """The stored result of a job that already finished in this run, else None."""
+        rows = self._execute(
+            "SELECT result FROM jobs WHERE run_id = ? AND module = ? AND selector = ? "
+            "AND status = ?",
+            (self.run_id, module, selector, DONE),
+        )
+        return json.loads(rows[0][0]) if rows else None
+
+    def submit(
+        self, dispatcher, module: str, selector: str, func, *args, priority: int = 0, **kwargs
+    ) -> Future:
+        """
+        Record the job and run `func(*args, **kwargs)` on `dispatcher` with
+        retries; the Future resolves with the final attempt. The first
+        attempt is submitted (and so blocks on the dispatcher's max_pending);
+        only backoff retries are deferred.
+        """
+        self._execute(
+            "INSERT OR IGNORE INTO jobs (run_id, module, selector, queued_at) "
+            "VALUES (?, ?, ?, ?)",
+            (self.run_id, module, selector, time.time()),
+        )
+        attempts, next_attempt_at = self._execute(
+            "SELECT attempts, next_attempt_at FROM jobs "
+            "WHERE run_id = ? AND module = ? AND selector = ?",
+            (self.run_id, module, selector),
+        )[0]
+        # Each run (or resume) gives a job max_attempts tries; the attempt
+        # counter itself is cumulative, so repeat offenders back off longer.
+        job = Future()
+        attempt = (dispatcher, job, module, selector, func, args, kwargs, priority)
+        budget = attempts + self.max_attempts
+        if next_attempt_at and next_attempt_at > time.time():
+            # A resumed job still backing off from its last run
+            dispatcher.defer(
+                next_attempt_at, module, self._attempt, attempt, budget, priority=priority
+            )
+        else:
+            # Goes through submit so the dispatcher's max_pending blocks the caller
+            dispatcher.submit(module, self._attempt, attempt, budget, priority=priority)
+        return job
+
+    def _update(self, module: str, selector: str, **fields):
+        columns = ", ".join(f"{name} = ?" for name in fields)
+        self._execute(
+            f"UPDATE jobs SET {columns} WHERE run_id = ? AND module = ? AND selector = ?",
+            (*fields.values(), self.run_id, module, selector),
+        )
+
+    def _attempt(self, attempt, budget: int):
+        """
+        One try of a job inside a dispatcher slot. A failure with tries
+        left defers the next one and re-raises, so the dispatcher frees
+        the slot and records this attempt as failed.
+        """
+        dispatcher, job, module, selector, func, args, kwargs, priority = attempt
+        attempts = self._execute(
+            "SELECT attempts FROM jobs WHERE run_id = ? AND module = ? AND selector = ?",
+            (self.run_id, module, selector),
+        )[0][0] + 1
+        started = time.time()
+        self._update(
+            module, selector, status=RUNNING, attempts=attempts,
+            started_at=started, next_attempt_at=None,
+        )
+        try:
+            result = ensure_result(module, func(*args, **kwargs))
+        except Exception as e:
+            finished = time.time()
+            retry = attempts < budget
+            next_attempt_at = (
+                finished + min(self.backoff_max, self.backoff * 2 ** (attempts - 1))
+                if retry
+                else None
+            )
+            self._update(
+                module, selector, status=FAILED, error=str(e), finished_at=finished,
+                duration=finished - started, next_attempt_at=next_attempt_at,
+            )
+            if retry:
+                logger.warning(
+                    f"{module} attempt {attempts} failed for {selector}: {e}; "
+                    f"retrying in {next_attempt_at - finished:.1f}s"
+                )
+                dispatcher.defer(
+                    next_attempt_at, module, self._attempt, attempt, budget, priority=priority
+                )
+            else:
+                job.set_exception(e)
+            raise
+
+        finished = time.time()
+        self._update(
+            module, selector, status=DONE, result=json.dumps(result, default=str),
+            result_path=result_path(result), error=None, finished_at=finished,
+            duration=finished - started,
+        )
+        job.set_result(result)
+        return result
@@ -0,0 +1,132 @@
+import json
+import codecs
+
+CHUNK_SIZE = 64 * 1024
+
+_WHITESPACE = " \t\n\r"
+_decoder = json.JSONDecoder()
+
+
+class _ChunkedText:
+    """UTF-8 text buffer filled from a binary file on demand, feeding an optional hasher."""
+
+    def __init__(self, fp, hasher=None, chunk_size=CHUNK_SIZE):
+        self.fp = fp
+        self.hasher = hasher
+        self.chunk_size = chunk_size
+        self.decoder = codecs.getincrementaldecoder("utf-8")()
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+
+    def fill(self):
+        """Read more input; grows geometrically so a huge value is not re-parsed per chunk."""
+        if self.eof:
+            return False
+        if self.pos > self.chunk_size:
+            self.buf = self.buf[self.pos :]
+            self.pos = 0
+        raw = self.fp.read(max(self.chunk_size, len(self.buf) - self.pos))
+        if self.hasher is not None and raw:
+            self.hasher.update(raw)
+        self.buf += self.decoder.decode(raw, final=not raw)
+        self.eof = not raw
+        return True
+
+    def peek(self):
+        """Return the next non-whitespace character without consuming it ('' at EOF)."""
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self.fill():
+                return ""
+
+    def expect(self, char):
+        if self.peek() != char:
+            raise ValueError(f"Expected {char!r} at offset {self.pos}")
+        self.pos += 1
+
+    def value(self):
+        """Decode one complete JSON value, reading more input until it is whole."""
+        self.peek()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.buf, self.pos)
+                # A number or literal touching the buffer edge may continue
+                if end < len(self.buf) or self.eof:
+                    self.pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            self.fill()
+
+
+def stream_members(fp, hasher=None, chunk_size=CHUNK_SIZE):
+    """
+    Incrementally parse a JSON object from a binary file.
+
+    Yields (key, subkey, value) events: top-level scalars arrive as
+    (key, None, value); arrays and objects one level down are unrolled into
+    (key, index, item) and (key, member_key, member) so only one item is in
+    memory at a time. `hasher` receives every byte read. A document whose top
+    level is not an object yields nothing.
+    """
+    text = _ChunkedText(fp, hasher, chunk_size)
+    if text.peek() != "{":
+        return
+    text.expect("{")
+    if text.peek() == "}":
+        return
+
+    while True:
+        key = text.value()
+        text.expect(":")
+        opener = text.peek()
+
+        if opener == "[":
+            text.expect("[")
+            index = 0
+            if text.peek() != "]":
+                while True:
+                    yield key, index, text.value()
+                    index += 1
+                    if text.peek() != ",":
+                        break
+                    text.expect(",")
+            text.expect("]")
+        elif opener == "{":
+            text.expect("{")
+            if text.peek() != "}":
+                while True:
+                    subkey = text.value()
+                    text.expect(":")
+                    yield key, subkey, text.value()
+                    if text.peek() != ",":
+                        break
+                    text.expect(",")
+            text.expect("}")
+        else:
+            yield key, None, text.value()
+
+        if text.peek() != ",":
+            break
+        text.expect(",")
+    text.expect("}")
+
+
+def document_members(data):
+    """Produce the same events as stream_members from an already-parsed document."""
+    if not isinstance(data, dict):
+        return
+    for key, value in data.items():
+        if isinstance(value, list):
+            for index, item in enumerate(value):
+                yield key, index, item
+        elif isinstance(value, dict):
+            for subkey, member in value.items():
+                yield key, subkey, member
+        else:
+            yield key, None, value
@@ -0,0 +1,98 @@
+from array import array
+from functools import reduce
+
+import numpy as np
+
+
+class PostingLists:
+    """
+    Compact posting lists for shared correlation entities.
+
+    Artifacts are interned to dense integer ids assigned in name order, and
+    every (entity type, value) owns a sorted uint32 slice of one flat
+    `postings` array (CSR layout: entity i spans offsets[i]:offsets[i + 1]).
+    A posting costs 4 bytes instead of a set entry pointing at a filename
+    string, and multi-entity questions become vectorized set operations.
+    """
+
+    def __init__(self, names, keys, offsets, postings):
+        self.names = names  # dense artifact id → artifact name
+        self.keys = keys  # entity index → (type, value)
+        self.offsets = offsets
+        self.postings = postings
+        self._lookup = {key: i for i, key in enumerate(keys)}
+
+    @classmethod
+    def from_index(cls, index):
+        """Load the postings of every entity shared by 2+ artifacts."""
+        names = []
+        dense = {}
+        for artifact_id, name in index.iter_artifacts():
+            dense[artifact_id] = len(names)
+            names.append(name)
+
+        keys = []
+        offsets = array("Q", [0])
+        postings = array("I")
+        for etype, value, artifact_id in index.iter_shared_postings():
+            if not keys or keys[-1] != (etype, value):
+                if keys:
+                    offsets.append(len(postings))
+                keys.append((etype, value))
+            postings.append(dense[artifact_id])
+        if keys:
+            offsets.append(len(postings))
+
+        postings = np.frombuffer(postings, dtype=np.uint32).copy()
+        offsets = np.frombuffer(offsets, dtype=np.uint64).astype(np.int64)
+
+        # Sort each entity's slice so set operations can assume ordered input
+        segment = np.repeat(np.arange(len(keys)), np.diff(offsets))
+        postings = postings[np.lexsort((postings, segment))]
+        return cls(names, keys, offsets, postings)
+
+    def __len__(self):
+        return len(self.keys)
+
+    @property
+    def nbytes(self) -> int:
+        return self.postings.nbytes + self.offsets.nbytes
+
+    def entity_postings(self, i: int) -> np.ndarray:
+        return self.postings[self.offsets[i] : self.offsets[i + 1]]
+
+    def lookup(self, etype: str, value: str) -> np.ndarray:
+        """Artifact ids for one entity (empty if it is not shared)."""
+        i = self._lookup.get((etype, value))
+        if i is None:
+            return np.empty(0, dtype=np.uint32)
+        return self.entity_postings(i)
+
+    def artifacts_sharing(self, etype: str) -> np.ndarray:
+        """Sorted ids of artifacts that share at least one `etype` value with another."""
+        slices = [
+            self.entity_postings(i) for i, key in enumerate(self.keys) if key[0] == etype
+        ]
+        if not slices:
+            return np.empty(0, dtype=np.uint32)
+        return np.unique(np.concatenate(slices))
+
+    def artifacts_sharing_all(self, *etypes) -> np.ndarray:
+        """
+        Sorted ids of artifacts sharing a value of every given type, e.g.
+        artifacts_sharing_all("breach", "domain").
+        """
+        sets = [self.artifacts_sharing(etype) for etype in etypes]
+        return reduce(lambda a, b: np.intersect1d(a, b, assume_unique=True), sets)
+
+    def names_for(self, ids) -> list:
+        return [self.names[i] for i in ids]
+
+    def to_sections(self) -> dict:
+        """Return {entity type: {value: [artifact names]}} in name order."""
+        sections = {}
+        for i, (etype, value) in enumerate(self.keys):
+            sections.setdefault(etype, {})[value] = self.names_for(
+                self.entity_postings(i)
+            )
+        return sections
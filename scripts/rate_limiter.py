@@ -0,0 +1,220 @@
+import time
+import asyncio
+import logging
+import threading
+from pathlib import Path
+from typing import Optional
+from urllib.parse import urlsplit
+from email.utils import parsedate_to_datetime
+
+import yaml
+import requests
+
+MODULES_CONFIG_DIR = Path(__file__).parents[1] / "config/modules_config"
+PERIODS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+# Answers that mean "slow down"
+THROTTLE_STATUSES = (429, 503)
+# Pause after a throttle without Retry-After: 2**strikes seconds, capped
+BACKOFF_MAX = 300.0
+# A throttled host's rate is multiplied by this (never below MIN_FRACTION
+# of its declared rate) and regains RECOVERY of the declared rate per success
+DECREASE = 0.5
+MIN_FRACTION = 0.05
+RECOVERY = 0.05
+# polite_get retries a throttled request this often, if the pause is short
+MAX_RETRIES = 2
+MAX_RETRY_WAIT = 60.0
+
+logger = logging.getLogger("rate_limiter")
+
+
+def parse_rate(spec) -> tuple:
+    """
+    "45/minute" or {"rate": "45/minute", "burst": 5} → (requests per
+    second, burst). The burst defaults to one request.
+    """
+    if isinstance(spec, dict):
+        rate, _ = parse_rate(spec["rate"])
+        return rate, max(1, int(spec.get("burst", 1)))
+    count, sep, period = str(spec).partition("/")
+    try:
+        seconds = PERIODS[period.strip().rstrip("s") or "second"] if sep else 1
+        return float(count) / seconds, 1
+    except (KeyError, ValueError):
+        raise ValueError(f"Invalid rate {spec!r}; expected N/second|minute|hour|day") from None
+
+
+def load_rate_limits(config_dir=None) -> dict:
+    """
+    Collect {host: spec} from every `rate_limits` block in the module
+    YAMLs, at the top of a file or under its module section.
+    """
+    limits = {}
+    for path in sorted(Path(config_dir or MODULES_CONFIG_DIR).glob("*.yaml")):
+        with open(path, "r") as f:
+            data = yaml.safe_load(f) or {}
+        sections = [data] + [v for v in data.values() if isinstance(v, dict)]
+        for section in sections:
+            for host, spec in (section.get("rate_limits") or {}).items():
+                limits[host.lower()] = spec
+    return limits
+
+
+def retry_after_seconds(value) -> Optional[float]:
+    """Seconds from a Retry-After header (delta-seconds or HTTP date), or None."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class TokenBucket:
+    """
+    Token bucket for one host that callers reserve slots from.
+
+    reserve() takes a token and returns how long the caller must wait for
+    it: tokens may go negative, so concurrent callers queue up fairly
+    instead of all waking at once. A host with no declared rate only
+    waits out pauses. throttled() applies a server's Retry-After (or an
+    exponential pause) and lowers the rate; each success restores some of
+    it, so the bucket settles just under what the server tolerates.
+    """
+
+    def __init__(self, rate: float = None, burst: int = 1):
+        self.max_rate = rate
+        self.rate = rate
+        self.capacity = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self.strikes = 0
+        self.lock = threading.Lock()
+
+    def reserve(self) -> float:
+        with self.lock:
+            now = time.monotonic()
+            delay = max(0.0, self.paused_until - now)
+            if self.rate:
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                self.tokens -= 1
+                if self.tokens < 0:
+                    delay = max(delay, -self.tokens / self.rate)
+            return delay
+
+    def throttled(self, retry_after: float = None) -> float:
+        """Record a 429/503; returns the pause applied."""
+        with self.lock:
+            self.strikes += 1
+            pause = retry_after if retry_after is not None else min(BACKOFF_MAX, 2.0 ** self.strikes)
+            self.paused_until = max(self.paused_until, time.monotonic() + pause)
+            if self.rate:
+                self.rate = max(self.max_rate * MIN_FRACTION, self.rate * DECREASE)
+                self.tokens = min(self.tokens, 0.0)
+            return pause
+
+    def succeeded(self):
+        with self.lock:
+            self.strikes = 0
+            if self.rate and self.rate < self.max_rate:
+                self.rate = min(self.max_rate, self.rate + self.max_rate * RECOVERY)
+
+
+class RateLimiter:
+    """
+    Process-wide politeness layer: one TokenBucket per host, shared by
+    every module's HTTP calls. Limits are declared per host in the module
+    YAMLs (`rate_limits`); a limit on example.com also covers its
+    subdomains unless they declare their own. Undeclared hosts run
+    unthrottled until they answer 429/503.
+    """
+
+    def __init__(self, limits: dict = None):
+        self.limits = {
+            host.lower(): parse_rate(spec)
+            for host, spec in (load_rate_limits() if limits is None else limits).items()
+        }
+        self.buckets = {}
+        self.lock = threading.Lock()
+
+    def bucket(self, url: str) -> TokenBucket:
+        host = (urlsplit(url).hostname or "").lower()
+        with self.lock:
+            bucket = self.buckets.get(host)
+            if bucket is None:
+                labels = host.split(".")
+                declared = next(
+                    (
+                        self.limits[".".join(labels[i:])]
+                        for i in range(len(labels))
+                        if ".".join(labels[i:]) in self.limits
+                    ),
+                    (None, 1),
+                )
+                bucket = self.buckets[host] = TokenBucket(*declared)
+            return bucket
+
+    def acquire(self, url: str):
+        """Block until a request to `url`'s host is allowed."""
+        delay = self.bucket(url).reserve()
+        if delay > 0:
+            time.sleep(delay)
+
+    async def acquire_async(self, url: str):
+        delay = self.bucket(url).reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def observe(self, url: str, status: int, headers=None) -> Optional[float]:
+        """
+        Feed a response back. Returns the pause imposed on the host when it
+        signalled throttling, else None.
+        """
+        bucket = self.bucket(url)
+        if status not in THROTTLE_STATUSES:
+            bucket.succeeded()
+            return None
+        pause = bucket.throttled(retry_after_seconds((headers or {}).get("Retry-After")))
+        logger.warning(f"{urlsplit(url).hostname} answered {status}; pausing it {pause:.1f}s")
+        return pause
+
+
+def polite_get(url: str, **kwargs):
+    """
+    requests.get paced by the host's bucket. A 429/503 pauses the host and
+    is retried up to MAX_RETRIES times when the pause is at most
+    MAX_RETRY_WAIT; otherwise the throttled response is returned.
+    """
+    limiter = get_limiter()
+    for attempt in range(MAX_RETRIES + 1):
+        limiter.acquire(url)
+        resp = requests.get(url, **kwargs)
+        pause = limiter.observe(url, resp.status_code, resp.headers)
+        if pause is None or pause > MAX_RETRY_WAIT:
+            return resp
+    return resp
+
+
+_limiter = None
+_limiter_lock = threading.Lock()
+
+
+def get_limiter() -> RateLimiter:
+    """The process-wide limiter, built from the module YAMLs on first use."""
+    global _limiter
+    with _limiter_lock:
+        if _limiter is None:
+            _limiter = RateLimiter()
+        return _limiter
+
+
+def reset_limiter():
+    global _limiter
+    with _limiter_lock:
+        _limiter = None
@@ -0,0 +1,168 @@
+import time
+import sqlite3
+import threading
+from pathlib import Path
+
+from scripts import correlation_index
+from scripts.dispatcher import load_global_section
+
+STRATEGIES = ("sejf", "ljf", "fifo")
+DEFAULT_STRATEGY = "sejf"
+# Expected seconds per lookup before a module has any history
+DEFAULT_COSTS = {
+    "phone_lookup": 30.0,
+    "email_verification": 20.0,
+    "username_search": 300.0,
+    "social_discovery": 10.0,
+    "domain_ip_lookup": 2.0,
+}
+DEFAULT_COST = 10.0
+# Weight of the newest sample in the moving averages
+EWMA_ALPHA = 0.2
+# Failure rates are clamped below 1 so expected cost stays finite
+MAX_FAILURE_RATE = 0.9
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS module_stats (
+    module TEXT PRIMARY KEY,
+    samples INTEGER NOT NULL,
+    latency REAL NOT NULL,
+    failure_rate REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+"""
+
+
+def load_scheduler_config(path=None) -> dict:
+    """Read the `scheduler` section of global_config.yaml ({} if absent)."""
+    return load_global_section("scheduler", path)
+
+
+def parse_priorities(specs) -> dict:
+    """
+    Turn ["SELECTOR=N", ...] into {selector: N}; higher runs first and the
+    default is 0. A leading '@' is dropped, as it is for usernames.
+    """
+    priorities = {}
+    for spec in specs or ():
+        selector, sep, value = spec.rpartition("=")
+        try:
+            if not sep or not selector:
+                raise ValueError
+            priorities[selector.strip().lstrip("@")] = int(value)
+        except ValueError:
+            raise ValueError(f"Invalid priority {spec!r}; expected SELECTOR=N") from None
+    return priorities
+
+
+class Scheduler:
+    """
+    Cost model for ordering lookups, learned across runs.
+
+    Every finished lookup updates its module's exponentially weighted mean
+    latency and failure rate in cache/cache.db, so estimates follow the
+    tools as they speed up or start failing. A module's expected cost is
+    its mean latency inflated by its failure rate, i.e. the time a
+    successful result is expected to take including retries.
+
+    score() ranks queued jobs for the Dispatcher, lowest first:
+      sejf  shortest expected job first (default): quick results appear
+            early and short jobs never queue behind Maigret scans
+      ljf   longest first, which tightens makespan on large batches
+      fifo  submission order
+    Waiting time is subtracted from every score, so a job that has waited
+    as long as its expected cost competes with a brand-new free job and
+    expensive modules cannot starve.
+    """
+
+    def __init__(self, strategy: str = None, db_path=None, alpha: float = EWMA_ALPHA):
+        config = load_scheduler_config()
+        self.strategy = strategy or config.get("strategy", DEFAULT_STRATEGY)
+        if self.strategy not in STRATEGIES:
+            raise ValueError(f"Unknown scheduling strategy {self.strategy!r}")
+        self.priors = {**DEFAULT_COSTS, **config.get("default_costs", {})}
+        self.alpha = alpha
+        self.lock = threading.Lock()
+        db_path = Path(db_path or correlation_index.CACHE_DB)
+        db_path.parent.mkdir(exist_ok=True)
+        self.conn = sqlite3.connect(
+            db_path, timeout=30, isolation_level=None, check_same_thread=False
+        )
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(SCHEMA)
+        self.stats = {
+            module: {"samples": samples, "latency": latency, "failure_rate": failure_rate}
+            for module, samples, latency, failure_rate in self.conn.execute(
+                "SELECT module, samples, latency, failure_rate FROM module_stats"
+            )
+        }
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def close(self):
+        self.conn.close()
+
+    def order(self, lookups: list, priorities: dict = None) -> list:
+        """
+        Sort (module, selector, ...) tuples into start order: priority
+        first, then by strategy, keeping submission order among equals.
+        """
+        priorities = priorities or {}
+        return sorted(lookups, key=lambda job: (-priorities.get(job[1], 0), self.score(job[0], 0.0)))
+
+    def expected_cost(self, module: str) -> float:
+        """Expected seconds until `module` delivers a result."""
+        with self.lock:
+            stats = self.stats.get(module)
+        if stats is None:
+            return self.priors.get(module, DEFAULT_COST)
+        return stats["latency"] / (1 - min(stats["failure_rate"], MAX_FAILURE_RATE))
+
+    def score(self, module: str, waited: float) -> float:
+        if self.strategy == "fifo":
+            return -waited
+        cost = self.expected_cost(module)
+        return (cost if self.strategy == "sejf" else -cost) - waited
+
+    def record(self, module: str, duration: float, ok: bool):
+        """Fold one finished lookup into the module's moving averages."""
+        with self.lock:
+            stats = self.stats.get(module)
+            if stats is None:
+                stats = {"samples": 0, "latency": duration, "failure_rate": 0.0 if ok else 1.0}
+            else:
+                a = self.alpha
+                stats = {
+                    "samples": stats["samples"],
+                    "latency": (1 - a) * stats["latency"] + a * duration,
+                    "failure_rate": (1 - a) * stats["failure_rate"] + a * (0.0 if ok else 1.0),
+                }
+            stats["samples"] += 1
+            self.stats[module] = stats
+            self.conn.execute(
+                "INSERT OR REPLACE INTO module_stats "
+                "(module, samples, latency, failure_rate, updated_at) VALUES (?, ?, ?, ?, ?)",
+                (module, stats["samples"], stats["latency"], stats["failure_rate"], time.time()),
+            )
+
+    def summary(self) -> dict:
+        """{module: {"samples", "latency", "failure_rate", "expected_cost"}} for known modules."""
+        with self.lock:
+            modules = sorted({*self.priors, *self.stats})
+            stats = {m: dict(self.stats.get(m, {"samples": 0})) for m in modules}
+        for module, entry in stats.items():
+            entry["expected_cost"] = round(self.expected_cost(module), 3)
+        return stats
+
+
+if __name__ == "__main__":
+    scheduler = Scheduler()
+    print(f"{'module':<22}{'samples':>9}{'latency s':>12}{'fail %':>9}{'expected s':>12}")
+    for module, s in scheduler.summary().items():
+        latency = f"{s['latency']:.2f}" if "latency" in s else "-"
+        failures = f"{100 * s['failure_rate']:.0f}" if "failure_rate" in s else "-"
+        print(f"{module:<22}{s['samples']:>9}{latency:>12}{failures:>9}{s['expected_cost']:>12}")
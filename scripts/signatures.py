@@ -0,0 +1,76 @@
+import re
+from functools import lru_cache
+from typing import Optional
+
+POSITIVE, NEGATIVE = "positive", "negative"
+
+
+def _trie_regex(markers) -> str:
+    """
+    A regex matching any of `markers`, shaped as their prefix trie so the
+    scan only follows branches that can still match. Optional tails are
+    greedy, so at one position the longest marker wins.
+    """
+    trie = {}
+    for marker in markers:
+        node = trie
+        for char in marker:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def build(node) -> str:
+        branches = [re.escape(char) + build(child) for char, child in node.items() if char]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else f"(?:{'|'.join(branches)})"
+        return f"(?:{body})?" if "" in node else body
+
+    return build(trie)
+
+
+class Signatures:
+    """
+    Positive and negative markers compiled into one matcher.
+
+    Markers are lowercased, de-duplicated and compiled into a single regex
+    shaped as their prefix trie at build time (see _trie_regex). Each body
+    or URL is then case-folded once and scanned in one pass whatever the
+    number of markers. At one position the longest marker wins, so "page
+    not found" is reported rather than "not found". A marker listed as
+    both positive and negative counts as negative. Works on str, or on
+    bytes with `binary` (markers UTF-8 encoded; only ASCII is case-folded).
+    """
+
+    def __init__(self, positive=(), negative=(), binary: bool = False):
+        encode = (lambda m: m.lower().encode()) if binary else (lambda m: m.lower())
+        self.kinds = {encode(m): POSITIVE for m in positive if m}
+        self.kinds.update({encode(m): NEGATIVE for m in negative if m})
+        self.longest = max(map(len, self.kinds), default=0)
+        self.pattern = None
+        if binary and self.kinds:
+            # Latin-1 maps bytes to code points one to one, and back
+            markers = [m.decode("latin-1") for m in self.kinds]
+            self.pattern = re.compile(_trie_regex(markers).encode("latin-1"))
+        elif self.kinds:
+            self.pattern = re.compile(_trie_regex(self.kinds))
+
+    def search(self, data, pos: int = 0) -> Optional[tuple]:
+        """(kind, marker) of the earliest marker in `data` from `pos`, or None."""
+        if self.pattern is None:
+            return None
+        match = self.pattern.search(data.lower(), pos)
+        return None if match is None else (self.kinds[match[0]], match[0])
+
+    def matches(self, data) -> list:
+        """Every non-overlapping (kind, marker) in `data`, in order."""
+        if self.pattern is None:
+            return []
+        return [(self.kinds[m[0]], m[0]) for m in self.pattern.finditer(data.lower())]
+
+
+@lru_cache(maxsize=1024)
+def compile_signatures(
+    positive: tuple = (), negative: tuple = (), binary: bool = False
+) -> Signatures:
+    """Shared Signatures for a marker set; each set is compiled only once."""
+    return Signatures(positive, negative, binary)
@@ -0,0 +1,339 @@
+import re
+import time
+import socket
+import atexit
+import logging
+import subprocess
+import threading
+import zlib
+from pathlib import Path
+from typing import Optional
+from urllib.parse import urlsplit
+
+import yaml
+import stem
+import stem.connection
+import stem.process
+from stem import Signal
+from stem.control import Controller
+
+ROOT_DIR = Path(__file__).parents[1]
+TOR_CONFIG_PATH = ROOT_DIR / "config/modules_config/tor_darkweb_config.yaml"
+DEFAULT_PROXY_URL = "socks5h://127.0.0.1:9050"
+DEFAULT_CONTROL_PORT = 9051
+# How Tor is brought up when nothing answers on the control port:
+# "systemctl" starts the system service, "process" launches a private tor
+# (needs the tor binary) and "none" only attaches to a running one
+LAUNCH_MODES = ("systemctl", "process", "none")
+DEFAULT_LAUNCH = "systemctl"
+DEFAULT_DATA_DIRECTORY = ROOT_DIR / "cache/tor"
+DEFAULT_BOOTSTRAP_TIMEOUT = 120
+# Isolated circuits handed out by proxy(); each is a distinct SOCKS login
+DEFAULT_CIRCUITS = 8
+# Seconds between control port connection attempts and bootstrap polls
+POLL_INTERVAL = 0.5
+# After a failed start(), later calls fail fast for this many seconds
+RETRY_AFTER_FAILURE = 60
+# SOCKS username prefix; with IsolateSOCKSAuth every login gets its own circuit
+CIRCUIT_USER = "autonosint"
+
+logger = logging.getLogger("tor_manager")
+
+
+class TorUnavailable(RuntimeError):
+    """Tor could not be reached, started or bootstrapped."""
+
+
+def load_tor_config(path=None) -> dict:
+    """The tor_darkweb section of tor_darkweb_config.yaml ({} if absent)."""
+    try:
+        with open(path or TOR_CONFIG_PATH, "r") as f:
+            return (yaml.safe_load(f) or {}).get("tor_darkweb") or {}
+    except FileNotFoundError:
+        return {}
+
+
+def bootstrap_progress(phase: str) -> int:
+    """Percent from a `status/bootstrap-phase` answer (0 if unreadable)."""
+    match = re.search(r"PROGRESS=(\d+)", phase or "")
+    return int(match.group(1)) if match else 0
+
+
+class TorManager:
+    """
+    One long-lived Tor instance for the whole process.
+
+    start() attaches to Tor's control port, or brings Tor up first
+    (systemctl service or a private tor process, see LAUNCH_MODES), and
+    returns once Tor itself reports bootstrap at 100%. It is idempotent, so
+    every search can call it and only the first pays for bootstrap.
+
+    proxy() hands out SOCKS URLs from a pool of `circuits` isolated
+    circuits: each slot logs in with its own SOCKS credentials, which
+    Tor's IsolateSOCKSAuth (on by default) keeps on separate circuits.
+    The same key always maps to the same slot, so one username's requests
+    share an exit while parallel usernames spread over the pool. rotate()
+    retires every circuit without restarting Tor: later proxy() URLs carry
+    fresh credentials and Tor gets NEWNYM when its rate limit allows.
+    stop() shuts Tor down only if this manager started it.
+
+    A Tor without a control port (a stock distro service) is used in
+    SOCKS-only mode: circuits are still isolated per SOCKS login, but there
+    is no bootstrap check and no NEWNYM.
+    """
+
+    def __init__(self, config: dict = None):
+        config = load_tor_config() if config is None else config
+        settings = config.get("controller") or {}
+        proxy = urlsplit(config.get("proxy_url", DEFAULT_PROXY_URL))
+        self.scheme = proxy.scheme
+        self.socks_host = proxy.hostname or "127.0.0.1"
+        self.socks_port = proxy.port or 9050
+        self.control_host = settings.get("control_host", self.socks_host)
+        self.control_port = settings.get("control_port", DEFAULT_CONTROL_PORT)
+        self.password = settings.get("control_password") or None
+        self.launch = settings.get("launch", DEFAULT_LAUNCH)
+        if self.launch not in LAUNCH_MODES:
+            raise ValueError(f"Unknown Tor launch mode {self.launch!r}")
+        self.service = config.get("systemctl_service", "tor")
+        self.data_directory = Path(settings.get("data_directory") or DEFAULT_DATA_DIRECTORY)
+        self.bootstrap_timeout = settings.get("bootstrap_timeout", DEFAULT_BOOTSTRAP_TIMEOUT)
+        self.circuits = max(1, int(settings.get("circuits", DEFAULT_CIRCUITS)))
+        self.controller = None
+        self.bootstrapped = False
+        self.socks_only = False
+        self.failure = None
+        self.process = None
+        self.started_service = False
+        self.generation = 0
+        self.handed_out = 0
+        self.lock = threading.RLock()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+    @property
+    def running(self) -> bool:
+        """Attached to a live, bootstrapped Tor (or its SOCKS port alone)."""
+        if not self.bootstrapped:
+            return False
+        return self.socks_only or (self.controller is not None and self.controller.is_alive())
+
+    def _socks_open(self) -> bool:
+        try:
+            socket.create_connection((self.socks_host, self.socks_port), timeout=1).close()
+        except OSError:
+            return False
+        return True
+
+    def _service_active(self) -> bool:
+        try:
+            return subprocess.run(
+                ["systemctl", "is-active", "--quiet", self.service], check=False
+            ).returncode == 0
+        except OSError:
+            return False
+
+    def _use_socks_only(self) -> bool:
+        """Fall back to SOCKS-only mode if Tor's SOCKS port answers."""
+        if not self._socks_open():
+            return False
+        logger.warning(
+            f"No Tor control port on {self.control_host}:{self.control_port}; using the "
+            f"SOCKS port {self.socks_port} without bootstrap checks or NEWNYM"
+        )
+        self.socks_only = self.bootstrapped = True
+        return True
+
+    def _connect(self) -> Optional[Controller]:
+        """An authenticated controller, or None if nothing listens yet."""
+        try:
+            controller = Controller.from_port(self.control_host, self.control_port)
+        except stem.SocketError:
+            return None
+        try:
+            controller.authenticate(password=self.password)
+        except stem.connection.AuthenticationFailure as e:
+            controller.close()
+            raise TorUnavailable(f"Tor control port refused authentication: {e}") from e
+        return controller
+
+    def _launch(self):
+        if self.launch == "systemctl":
+            if self._service_active():
+                # Someone else's Tor, still opening its ports: wait, never own it
+                logger.info(f"The {self.service} service is already running")
+                return
+            logger.info(f"Starting the {self.service} service")
+            try:
+                subprocess.run(["systemctl", "start", self.service], check=True)
+            except (OSError, subprocess.CalledProcessError) as e:
+                raise TorUnavailable(f"systemctl could not start {self.service}: {e}") from e
+            self.started_service = True
+        elif self.launch == "process":
+            logger.info(f"Launching tor on SOCKS port {self.socks_port}")
+            self.data_directory.mkdir(parents=True, exist_ok=True)
+            try:
+                # Returns once tor starts bootstrapping; wait_bootstrapped()
+                # follows the rest over the control port
+                self.process = stem.process.launch_tor_with_config(
+                    config={
+                        "SocksPort": f"{self.socks_host}:{self.socks_port} IsolateSOCKSAuth",
+                        "ControlPort": f"{self.control_host}:{self.control_port}",
+                        "CookieAuthentication": "1",
+                        "DataDirectory": str(self.data_directory),
+                    },
+                    completion_percent=0,
+                    take_ownership=True,
+                    # stem's own timeout needs the main thread; start() has a deadline
+                    timeout=None,
+                )
+            except OSError as e:
+                raise TorUnavailable(f"Could not launch tor: {e}") from e
+
+    def start(self) -> "TorManager":
+        """
+        Attach to (or start) Tor and wait for it to bootstrap. A failure is
+        remembered: calls within RETRY_AFTER_FAILURE seconds raise at once
+        instead of waiting out the bootstrap timeout again.
+        """
+        with self.lock:
+            if self.running:
+                return self
+            if self.failure and time.monotonic() - self.failure[1] < RETRY_AFTER_FAILURE:
+                raise TorUnavailable(self.failure[0])
+            try:
+                self._start()
+            except TorUnavailable as e:
+                self.failure = (str(e), time.monotonic())
+                raise
+            self.failure = None
+            return self
+
+    def _start(self):
+        deadline = time.monotonic() + self.bootstrap_timeout
+        if self.controller is None or not self.controller.is_alive():
+            self.controller = self._connect()
+        if self.controller is None:
+            if self._use_socks_only():
+                return
+            if self.launch == "none":
+                raise TorUnavailable(
+                    f"No Tor control port on {self.control_host}:{self.control_port} "
+                    f"and no SOCKS port on {self.socks_host}:{self.socks_port}"
+                )
+            self._launch()
+            while self.controller is None:
+                if time.monotonic() > deadline:
+                    raise TorUnavailable("Tor did not open its control or SOCKS port in time")
+                time.sleep(POLL_INTERVAL)
+                self.controller = self._connect()
+                if self.controller is None and self.process is None and self._use_socks_only():
+                    return
+        self.wait_bootstrapped(deadline - time.monotonic())
+        self.bootstrapped = True
+
+    def wait_bootstrapped(self, timeout: float = None):
+        """Block until Tor reports bootstrap at 100%."""
+        deadline = time.monotonic() + (self.bootstrap_timeout if timeout is None else timeout)
+        last = -1
+        while True:
+            progress = bootstrap_progress(self.controller.get_info("status/bootstrap-phase", ""))
+            if progress >= 100:
+                logger.info("Tor bootstrapped")
+                return
+            if progress != last:
+                logger.info(f"Tor bootstrapping: {progress}%")
+                last = progress
+            if time.monotonic() > deadline:
+                raise TorUnavailable(f"Tor bootstrap stalled at {progress}%")
+            time.sleep(POLL_INTERVAL)
+
+    def proxy(self, key: str = None, scheme: str = None) -> str:
+        """
+        SOCKS URL on one of the pooled isolated circuits: `key`'s own slot,
+        or the next slot in turn without one. `scheme` overrides the
+        configured one (e.g. "socks5" for clients that reject socks5h).
+        """
+        with self.lock:
+            if key is None:
+                slot = self.handed_out % self.circuits
+                self.handed_out += 1
+            else:
+                slot = zlib.crc32(key.encode()) % self.circuits
+            generation = self.generation
+        return self._url(slot, generation, scheme)
+
+    def proxies(self, scheme: str = None) -> list:
+        """Every slot of the pool, for spreading parallel requests."""
+        with self.lock:
+            generation = self.generation
+        return [self._url(slot, generation, scheme) for slot in range(self.circuits)]
+
+    def _url(self, slot: int, generation: int, scheme: str = None) -> str:
+        return (
+            f"{scheme or self.scheme}://{CIRCUIT_USER}-{slot}:{generation}"
+            f"@{self.socks_host}:{self.socks_port}"
+        )
+
+    def rotate(self) -> bool:
+        """
+        Move every later request onto new circuits. Returns True if Tor
+        also got NEWNYM; it accepts one every ten seconds, and the fresh
+        SOCKS credentials isolate new requests in the meantime anyway.
+        """
+        with self.lock:
+            self.generation += 1
+            if self.controller is None or not self.controller.is_alive():
+                return False
+            if not self.controller.is_newnym_available():
+                logger.debug(f"NEWNYM rate limited for {self.controller.get_newnym_wait():.1f}s")
+                return False
+            self.controller.signal(Signal.NEWNYM)
+            logger.info("Sent NEWNYM; new circuits for later requests")
+            return True
+
+    def stop(self):
+        """Detach from Tor, stopping it only if this manager started it."""
+        with self.lock:
+            if self.controller is not None:
+                self.controller.close()
+                self.controller = None
+            self.bootstrapped = self.socks_only = False
+            if self.process is not None:
+                self.process.terminate()
+                self.process.wait()
+                self.process = None
+            if self.started_service:
+                logger.info(f"Stopping the {self.service} service")
+                try:
+                    subprocess.run(["systemctl", "stop", self.service], check=True)
+                except (OSError, subprocess.CalledProcessError) as e:
+                    logger.error(f"systemctl could not stop {self.service}: {e}")
+                self.started_service = False
+
+
+_manager = None
+_manager_lock = threading.Lock()
+
+
+def get_tor() -> TorManager:
+    """The process-wide Tor manager (not started until start() is called)."""
+    global _manager
+    with _manager_lock:
+        if _manager is None:
+            _manager = TorManager()
+        return _manager
+
+
+@atexit.register
+def reset_tor():
+    """Stop the process-wide manager; the next get_tor() builds a new one."""
+    global _manager
+    with _manager_lock:
+        manager, _manager = _manager, None
+    if manager is not None:
+        manager.stop()
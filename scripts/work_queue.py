@@ -0,0 +1,364 @@
+import os
+import json
+import time
+import uuid
+import hashlib
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Optional
+
+from scripts.dispatcher import load_global_section
+
+ROOT = Path(__file__).parents[1]
+DEFAULT_QUEUE_URL = "sqlite:cache/cache.db"
+DEFAULT_LEASE_SECONDS = 300.0
+
+QUEUED, LEASED, DONE, FAILED = "queued", "leased", "done", "failed"
+# A FileWorkQueue job being finished sits in leased/ as .<id>.<token> + this
+CLAIM_SUFFIX = ".finishing"
+
+
+def load_work_config(path=None) -> dict:
+    """Read the `work_queue` section of global_config.yaml ({} if absent)."""
+    return load_global_section("work_queue", path)
+
+
+def open_work_queue(url: str = None):
+    """
+    Open a queue backend from a URL: `sqlite:<db path>` for workers on one
+    host, or `file:<directory>` for a directory shared between hosts.
+    Relative paths are resolved against the repository root.
+    """
+    url = url or load_work_config().get("url", DEFAULT_QUEUE_URL)
+    scheme, sep, location = url.partition(":")
+    if not sep or scheme not in BACKENDS:
+        raise ValueError(f"Unknown work queue URL {url!r}; use sqlite:<path> or file:<dir>")
+    path = Path(location)
+    return BACKENDS[scheme](path if path.is_absolute() else ROOT / path)
+
+
+class WorkQueue(ABC):
+    """
+    Jobs shared between `main.py submit` and any number of workers.
+
+    A job is one (module, selector) lookup. Workers lease jobs for a limited
+    time and must heartbeat to keep them; a lease that expires (the worker
+    died or lost its network) makes the job available again. Leases are
+    dicts with the job fields plus the owning worker and a lease `token`
+    that changes on every lease, so a worker whose lease lapsed cannot
+    complete a job someone else has since taken.
+    """
+
+    @abstractmethod
+    def put(self, jobs) -> int:
+        """Queue job dicts (module, category, selector, options); returns how many were new."""
+
+    @abstractmethod
+    def lease(self, worker: str, lease_seconds: float = DEFAULT_LEASE_SECONDS) -> Optional[dict]:
+        """Take the oldest ready job, or None if nothing is ready."""
+
+    @abstractmethod
+    def heartbeat(self, lease: dict, lease_seconds: float = DEFAULT_LEASE_SECONDS) -> bool:
+        """Extend a lease; False if it was lost."""
+
+    @abstractmethod
+    def complete(self, lease: dict, result, result_path: str = None) -> bool:
+        """Record a finished job; False if the lease was lost."""
+
+    @abstractmethod
+    def fail(self, lease: dict, error: str, retry_at: float = None) -> bool:
+        """Record a failed attempt: requeue it for `retry_at`, or fail it for good."""
+
+    @abstractmethod
+    def stats(self) -> dict:
+        """{status: jobs}, with every status present."""
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS work (
+    id INTEGER PRIMARY KEY,
+    module TEXT NOT NULL,
+    category TEXT NOT NULL,
+    selector TEXT NOT NULL,
+    options TEXT NOT NULL DEFAULT '{}',
+    status TEXT NOT NULL DEFAULT 'queued',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    worker TEXT,
+    lease_expires REAL,
+    not_before REAL NOT NULL DEFAULT 0,
+    result TEXT,
+    result_path TEXT,
+    error TEXT,
+    submitted_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL,
+    UNIQUE (module, selector)
+);
+CREATE INDEX IF NOT EXISTS idx_work_ready ON work(status, not_before);
+"""
+
+
+class SQLiteWorkQueue(WorkQueue):
+    """
+    Work queue in a SQLite database (WAL mode). Safe for any number of
+    worker processes on one host; leases are taken inside BEGIN IMMEDIATE
+    so two workers never get the same job. The lease token is the job's
+    attempt number.
+    """
+
+    def __init__(self, db_path):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(
+            self.db_path, timeout=30, isolation_level=None, check_same_thread=False
+        )
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        self.lock = threading.Lock()
+
+    def close(self):
+        self.conn.close()
+
+    def put(self, jobs) -> int:
+        now = time.time()
+        with self.lock:
+            before = self.conn.total_changes
+            self.conn.execute("BEGIN")
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO work (module, category, selector, options, submitted_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (
+                    (j["module"], j["category"], j["selector"], json.dumps(j.get("options", {})), now)
+                    for j in jobs
+                ),
+            )
+            self.conn.execute("COMMIT")
+            return self.conn.total_changes - before
+
+    def lease(self, worker, lease_seconds=DEFAULT_LEASE_SECONDS):
+        now = time.time()
+        with self.lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self.conn.execute(
+                    "SELECT id, module, category, selector, options, attempts FROM work "
+                    "WHERE (status = ? AND not_before <= ?) OR (status = ? AND lease_expires < ?) "
+                    "ORDER BY id LIMIT 1",
+                    (QUEUED, now, LEASED, now),
+                ).fetchone()
+                if row is None:
+                    return None
+                job_id, module, category, selector, options, attempts = row
+                self.conn.execute(
+                    "UPDATE work SET status = ?, worker = ?, lease_expires = ?, "
+                    "attempts = ?, started_at = ? WHERE id = ?",
+                    (LEASED, worker, now + lease_seconds, attempts + 1, now, job_id),
+                )
+            finally:
+                self.conn.execute("COMMIT")
+        return {
+            "id": job_id,
+            "module": module,
+            "category": category,
+            "selector": selector,
+            "options": json.loads(options),
+            "attempts": attempts + 1,
+            "worker": worker,
+            "token": attempts + 1,
+        }
+
+    def _update_leased(self, lease: dict, sql: str, params) -> bool:
+        with self.lock:
+            cur = self.conn.execute(
+                f"UPDATE work SET {sql} WHERE id = ? AND status = ? AND worker = ? AND attempts = ?",
+                (*params, lease["id"], LEASED, lease["worker"], lease["token"]),
+            )
+        return cur.rowcount == 1
+
+    def heartbeat(self, lease, lease_seconds=DEFAULT_LEASE_SECONDS):
+        return self._update_leased(lease, "lease_expires = ?", (time.time() + lease_seconds,))
+
+    def complete(self, lease, result, result_path=None):
+        return self._update_leased(
+            lease,
+            "status = ?, result = ?, result_path = ?, error = NULL, finished_at = ?",
+            (DONE, json.dumps(result, default=str), result_path, time.time()),
+        )
+
+    def fail(self, lease, error, retry_at=None):
+        if retry_at is None:
+            return self._update_leased(
+                lease, "status = ?, error = ?, finished_at = ?", (FAILED, error, time.time())
+            )
+        return self._update_leased(
+            lease, "status = ?, error = ?, not_before = ?", (QUEUED, error, retry_at)
+        )
+
+    def stats(self):
+        with self.lock:
+            rows = self.conn.execute("SELECT status, COUNT(*) FROM work GROUP BY status").fetchall()
+        return {**dict.fromkeys((QUEUED, LEASED, DONE, FAILED), 0), **dict(rows)}
+
+
+class FileWorkQueue(WorkQueue):
+    """
+    Work queue as JSON files in a directory, for hosts that share a mount
+    (NFS, SMB) rather than a database. Each job is one file that moves
+    between queued/, leased/, done/ and failed/ by atomic rename, so only
+    one worker can win a lease. A leased file's mtime is set to its lease
+    expiry; any worker requeues files whose mtime has passed.
+    """
+
+    STATES = (QUEUED, LEASED, DONE, FAILED)
+
+    def __init__(self, root):
+        self.root = Path(root)
+        for state in (*self.STATES, "keys"):
+            (self.root / state).mkdir(parents=True, exist_ok=True)
+
+    def _path(self, state: str, name: str) -> Path:
+        return self.root / state / name
+
+    def _write(self, path: Path, job: dict, mtime: float = None):
+        tmp = path.with_name(f".{path.name}.{uuid.uuid4().hex}.tmp")
+        with open(tmp, "w") as f:
+            json.dump(job, f)
+        if mtime is not None:
+            os.utime(tmp, (mtime, mtime))
+        os.replace(tmp, path)
+
+    def _read(self, path: Path) -> Optional[dict]:
+        try:
+            with open(path) as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def put(self, jobs) -> int:
+        added = 0
+        for job in jobs:
+            key = hashlib.sha1(f"{job['module']}\0{job['selector']}".encode()).hexdigest()
+            try:
+                # The key file makes (module, selector) unique across submitters
+                os.close(os.open(self._path("keys", key), os.O_CREAT | os.O_EXCL))
+            except FileExistsError:
+                continue
+            name = f"{time.time_ns():020d}-{key[:12]}.json"
+            record = {
+                "module": job["module"],
+                "category": job["category"],
+                "selector": job["selector"],
+                "options": job.get("options", {}),
+                "attempts": 0,
+                "not_before": 0,
+                "submitted_at": time.time(),
+            }
+            self._write(self._path(QUEUED, name), record)
+            added += 1
+        return added
+
+    def _requeue_expired(self, now: float):
+        for entry in os.scandir(self.root / LEASED):
+            if entry.name.endswith(".json"):
+                name = entry.name
+            elif entry.name.endswith(CLAIM_SUFFIX):
+                # A worker died while finishing; the claim keeps the lease mtime
+                name = entry.name[1:].rsplit(".", 2)[0]
+            else:
+                continue
+            try:
+                if entry.stat().st_mtime < now:
+                    os.rename(entry.path, self._path(QUEUED, name))
+            except FileNotFoundError:
+                pass  # another worker got there first
+
+    def lease(self, worker, lease_seconds=DEFAULT_LEASE_SECONDS):
+        now = time.time()
+        self._requeue_expired(now)
+        for name in sorted(n for n in os.listdir(self.root / QUEUED) if n.endswith(".json")):
+            source = self._path(QUEUED, name)
+            job = self._read(source)
+            if job is None or job.get("not_before", 0) > now:
+                continue
+            target = self._path(LEASED, name)
+            expires = now + lease_seconds
+            try:
+                # Stamp the expiry first so the file never sits in leased/
+                # looking expired; a losing racer's stamp is harmless.
+                os.utime(source, (expires, expires))
+                os.rename(source, target)
+            except FileNotFoundError:
+                continue  # leased by someone else meanwhile
+            job.update(
+                attempts=job["attempts"] + 1,
+                worker=worker,
+                token=uuid.uuid4().hex,
+                started_at=now,
+            )
+            self._write(target, job, mtime=expires)
+            return {**job, "id": name}
+        return None
+
+    def _owned(self, lease: dict) -> Optional[dict]:
+        job = self._read(self._path(LEASED, lease["id"]))
+        return job if job and job.get("token") == lease["token"] else None
+
+    def heartbeat(self, lease, lease_seconds=DEFAULT_LEASE_SECONDS):
+        if self._owned(lease) is None:
+            return False
+        expires = time.time() + lease_seconds
+        try:
+            os.utime(self._path(LEASED, lease["id"]), (expires, expires))
+        except FileNotFoundError:
+            return False
+        return True
+
+    def _finish(self, lease: dict, state: str, **fields) -> bool:
+        # Take the file out of leased/ by rename before checking the token,
+        # so a worker that re-leased it after expiry cannot lose it between
+        # the check and the move.
+        claim = self._path(LEASED, f".{lease['id']}.{lease['token']}{CLAIM_SUFFIX}")
+        try:
+            os.rename(self._path(LEASED, lease["id"]), claim)
+        except FileNotFoundError:
+            return False
+        job = self._read(claim)
+        if not job or job.get("token") != lease["token"]:
+            # Someone else's lease now: put it back untouched
+            os.rename(claim, self._path(LEASED, lease["id"]))
+            return False
+        job.update(fields)
+        self._write(self._path(state, lease["id"]), job)
+        os.remove(claim)
+        return True
+
+    def complete(self, lease, result, result_path=None):
+        return self._finish(
+            lease, DONE, result=result, result_path=result_path, finished_at=time.time()
+        )
+
+    def fail(self, lease, error, retry_at=None):
+        if retry_at is None:
+            return self._finish(lease, FAILED, error=error, finished_at=time.time())
+        return self._finish(lease, QUEUED, error=error, not_before=retry_at)
+
+    def stats(self):
+        return {
+            state: sum(1 for n in os.listdir(self.root / state) if n.endswith(".json"))
+            for state in self.STATES
+        }
+
+
+BACKENDS = {"sqlite": SQLiteWorkQueue, "file": FileWorkQueue}
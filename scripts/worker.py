@@ -0,0 +1,220 @@
+import os
+import time
+import shutil
+import socket
+import logging
+import threading
+from pathlib import Path
+from itertools import islice
+from argparse import Namespace
+
+from scripts import input_parser
+from scripts.batch_input import iter_selectors
+from scripts.classifier import classify_bulk
+from scripts.correlation_engine import OUTPUT_DIR, written_outputs
+from scripts.dispatcher import Dispatcher
+from scripts.scheduler import Scheduler
+from scripts.job_queue import (
+    DEFAULT_BACKOFF,
+    DEFAULT_BACKOFF_MAX,
+    DEFAULT_MAX_ATTEMPTS,
+    ensure_result,
+    load_queue_config,
+    result_path,
+)
+from scripts.work_queue import ROOT, DEFAULT_LEASE_SECONDS, load_work_config
+
+DEFAULT_HEARTBEAT_SECONDS = 60.0
+DEFAULT_POLL_SECONDS = 2.0
+# Selectors classified and queued per put() when submitting a batch file
+SUBMIT_CHUNK = 10_000
+# Per-job options forwarded to lookups_for (social discovery hints)
+JOB_OPTIONS = ("user_id", "discriminator")
+
+logger = logging.getLogger("worker")
+
+
+def jobs_for(selectors, options: dict = None):
+    """Yield one work-queue job per (module, selector) the selectors fan out to."""
+    options = {k: v for k, v in (options or {}).items() if k in JOB_OPTIONS and v}
+    args = Namespace(**options)
+    buckets = classify_bulk(selectors)
+    for item in buckets.pop("invalid"):
+        logger.warning(f"Could not classify input: {item}")
+    for category, items in buckets.items():
+        for item in items:
+            item = item.lstrip("@") if category == "username" else item
+            for module, *_ in input_parser.lookups_for(category, item, args):
+                yield {"module": module, "category": category, "selector": item, "options": options}
+
+
+def submit(queue, selectors=(), batch_input=None, options: dict = None) -> int:
+    """Queue lookups for `selectors` and/or a batch file; returns how many were new."""
+    added = queue.put(list(jobs_for(list(selectors), options)))
+    if batch_input:
+        stream = iter_selectors(batch_input)
+        while chunk := list(islice(stream, SUBMIT_CHUNK)):
+            added += queue.put(list(jobs_for(chunk, options)))
+    return added
+
+
+def outputs_store(outputs=None) -> Path:
+    """
+    The shared outputs store: `outputs`, else work_queue.outputs, else
+    data/outputs. Relative paths are resolved against the repository root.
+    """
+    outputs = Path(outputs or load_work_config().get("outputs") or OUTPUT_DIR)
+    return outputs if outputs.is_absolute() else ROOT / outputs
+
+
+def copy_outputs(paths, store: Path) -> dict:
+    """
+    Copy the output files in `paths` into the shared `store`. Each copy
+    lands under a temporary name first, so readers of the store never see
+    a partial file. Returns {source path: path in the store}; files already
+    in the store map to themselves.
+    """
+    store.mkdir(parents=True, exist_ok=True)
+    copied = {}
+    for path in map(Path, dict.fromkeys(paths)):
+        target = store / path.name
+        if not path.is_file():
+            continue
+        if path.resolve() != target.resolve():
+            tmp = store / f".{path.name}.{os.getpid()}.tmp"
+            shutil.copy2(path, tmp)
+            os.replace(tmp, target)
+        copied[str(path)] = str(target)
+    return copied
+
+
+class Worker:
+    """
+    Lease jobs from a shared work queue and run them through a Dispatcher.
+
+    Each worker process keeps at most `concurrency` leases in flight (still
+    subject to the per-module dispatcher limits) and renews all of them from
+    a heartbeat thread. A failed lookup goes back on the queue with
+    exponential backoff until job_queue.max_attempts, so any worker may
+    retry it. The files each job wrote (everything its lookup passed to
+    index_output, plus the path its result names) are copied into the
+    shared `outputs` store, which is where the coordinator correlates from.
+    """
+
+    def __init__(
+        self,
+        queue,
+        worker_id: str = None,
+        concurrency: int = None,
+        lease_seconds: float = None,
+        heartbeat_seconds: float = None,
+        outputs=None,
+        poll_seconds: float = None,
+    ):
+        config = load_work_config()
+        retry = load_queue_config()
+        self.queue = queue
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+        self.lease_seconds = lease_seconds or config.get("lease_seconds", DEFAULT_LEASE_SECONDS)
+        self.heartbeat_seconds = heartbeat_seconds or config.get(
+            "heartbeat_seconds", DEFAULT_HEARTBEAT_SECONDS
+        )
+        self.poll_seconds = poll_seconds or config.get("poll_seconds", DEFAULT_POLL_SECONDS)
+        self.outputs = outputs_store(outputs)
+        self.max_attempts = retry.get("max_attempts", DEFAULT_MAX_ATTEMPTS)
+        self.backoff = retry.get("backoff", DEFAULT_BACKOFF)
+        self.backoff_max = retry.get("backoff_max", DEFAULT_BACKOFF_MAX)
+        # Timings recorded here inform the scheduler on later runs
+        self.scheduler = Scheduler()
+        self.dispatcher = Dispatcher(max_workers=concurrency, scheduler=self.scheduler)
+        self.lock = threading.Lock()
+        self.slot_free = threading.Condition(self.lock)
+        self.inflight = {}
+        self.counts = {"done": 0, "failed": 0, "retried": 0, "lost": 0}
+        self.stopping = threading.Event()
+
+    def _count(self, field: str):
+        with self.lock:
+            self.counts[field] += 1
+
+    def _heartbeat_loop(self):
+        while not self.stopping.wait(self.heartbeat_seconds):
+            with self.lock:
+                leases = list(self.inflight.values())
+            for lease in leases:
+                if not self.queue.heartbeat(lease, self.lease_seconds):
+                    logger.warning(f"Lost lease on {lease['module']} → {lease['selector']}")
+
+    def _execute(self, lease: dict):
+        """Run the leased lookup; returns (result, output files it wrote)."""
+        args = Namespace(**lease["options"])
+        for module, func, func_args, func_kwargs in input_parser.lookups_for(
+            lease["category"], lease["selector"], args
+        ):
+            if module != lease["module"]:
+                continue
+            with written_outputs() as written:
+                result = ensure_result(module, func(*func_args, **func_kwargs))
+            return result, written
+        raise LookupError(f"No {lease['module']} lookup for {lease['category']} input")
+
+    def _finished(self, future, lease: dict):
+        try:
+            error = future.exception()
+            if error is None:
+                result, written = future.result()
+                path = result_path(result)
+                copied = copy_outputs(written + ([path] if path else []), self.outputs)
+                path = copied.get(path, path)
+                ok = self.queue.complete(lease, result, path)
+                self._count("done" if ok else "lost")
+            elif lease["attempts"] < self.max_attempts:
+                delay = min(self.backoff_max, self.backoff * 2 ** (lease["attempts"] - 1))
+                ok = self.queue.fail(lease, str(error), retry_at=time.time() + delay)
+                self._count("retried" if ok else "lost")
+            else:
+                ok = self.queue.fail(lease, str(error))
+                self._count("failed" if ok else "lost")
+        finally:
+            with self.slot_free:
+                self.inflight.pop(lease["id"], None)
+                self.slot_free.notify_all()
+
+    def run(self, exit_when_empty: bool = False, max_jobs: int = None) -> dict:
+        """
+        Lease and run jobs until stopped, or with `exit_when_empty` until no
+        job is queued or leased anywhere. Returns this worker's counters.
+        """
+        heartbeat = threading.Thread(target=self._heartbeat_loop, daemon=True)
+        heartbeat.start()
+        leased = 0
+        try:
+            while not self.stopping.is_set() and (max_jobs is None or leased < max_jobs):
+                with self.slot_free:
+                    self.slot_free.wait_for(
+                        lambda: len(self.inflight) < self.dispatcher.max_workers
+                    )
+                lease = self.queue.lease(self.worker_id, self.lease_seconds)
+                if lease is None:
+                    with self.lock:
+                        idle = not self.inflight
+                    if exit_when_empty and idle:
+                        stats = self.queue.stats()
+                        if not stats["queued"] and not stats["leased"]:
+                            break
+                    time.sleep(self.poll_seconds)
+                    continue
+                leased += 1
+                with self.lock:
+                    self.inflight[lease["id"]] = lease
+                future = self.dispatcher.submit(lease["module"], self._execute, lease)
+                future.add_done_callback(lambda f, lease=lease: self._finished(f, lease))
+        finally:
+            self.dispatcher.shutdown()
+            self.scheduler.close()
+            self.stopping.set()
+            heartbeat.join()
+        return self.counts
+
+    def stop(self):
+        self.stopping.set()
@@ -0,0 +1,29 @@
+import pytest
+from scripts import correlation_engine, correlation_index, http_cache, rate_limiter
+
+
+@pytest.fixture(autouse=True)
+def isolated_cache_db(monkeypatch, tmp_path):
+    """
+    Keep cache/cache.db (correlation index, job queue, module timings,
+    response cache) and the correlation results out of the repository.
+    """
+    monkeypatch.setattr(correlation_index, "CACHE_DB", tmp_path / "cache.db")
+    monkeypatch.setattr(correlation_engine, "OUTPUT_DIR", tmp_path / "outputs")
+    monkeypatch.setattr(correlation_engine, "CORRELATED_OUTPUT", tmp_path / "correlated.json")
+
+
+@pytest.fixture(autouse=True)
+def fresh_http_cache():
+    """Reopen the process-wide response cache (in the test's cache.db) per test."""
+    http_cache.reset_cache()
+    yield
+    http_cache.reset_cache()
+
+
+@pytest.fixture(autouse=True)
+def fresh_rate_limiter():
+    """Start every test with empty per-host buckets."""
+    rate_limiter.reset_limiter()
+    yield
+    rate_limiter.reset_limiter()
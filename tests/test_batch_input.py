@@ -0,0 +1,138 @@
+import threading
+import tracemalloc
+from argparse import Namespace
+
+from scripts import batch_input, input_parser
+from scripts.batch_input import iter_selectors, run_batch
+from scripts.dispatcher import Dispatcher
+from scripts.job_queue import JobQueue
+
+
+def fake_lookups(monkeypatch, fail_on=()):
+    calls = []
+    lock = threading.Lock()
+
+    def make(module):
+        def lookup(item, **kwargs):
+            if item in fail_on:
+                raise RuntimeError("boom")
+            with lock:
+                calls.append((module, item))
+
+        return lookup
+
+    for name, module in [
+        ("phone_lookup", "phone_lookup"),
+        ("verify_email", "email_verification"),
+        ("search_username", "username_search"),
+        ("social_discovery", "social_discovery"),
+        ("domain_ip_lookup", "domain_ip_lookup"),
+    ]:
+        monkeypatch.setattr(input_parser, name, make(module))
+    return calls
+
+
+def test_iter_selectors_formats(tmp_path):
+    txt = tmp_path / "in.txt"
+    txt.write_text("# comment\nalice@example.com\n\n  example.org  \n")
+    assert list(iter_selectors(txt)) == ["alice@example.com", "example.org"]
+
+    csv_file = tmp_path / "in.csv"
+    csv_file.write_text("name,selector\nAlice,@alice\nBob,+15551234567\n")
+    assert list(iter_selectors(csv_file)) == ["@alice", "+15551234567"]
+
+    jsonl = tmp_path / "in.jsonl"
+    jsonl.write_text('"example.com"\n{"target": "bob@example.com"}\n{"other": 1}\n')
+    assert list(iter_selectors(jsonl)) == ["example.com", "bob@example.com"]
+
+
+def test_run_batch_dedupes_and_counts(tmp_path, monkeypatch):
+    calls = fake_lookups(monkeypatch, fail_on={"broken.com"})
+    batch = tmp_path / "targets.txt"
+    batch.write_text(
+        "Alice@Example.com\nalice@example.com\n@carol\nCAROL\nexample.org\n"
+        "broken.com\n!!!\n"
+    )
+
+    counts = run_batch(batch, Namespace(concurrency=2, silent=True))
+
+    assert sorted(calls) == [
+        ("domain_ip_lookup", "example.org"),
+        ("email_verification", "Alice@Example.com"),
+        ("social_discovery", "carol"),
+        ("username_search", "carol"),
+    ]
+    assert counts == {
+        "read": 7,
+        "duplicate": 2,
+        "invalid": 1,
+        "resumed": 0,
+        "queued": 5,
+        "done": 4,
+        "failed": 1,
+    }
+
+
+def test_run_batch_classifies_in_chunks(tmp_path, monkeypatch):
+    calls = fake_lookups(monkeypatch)
+    monkeypatch.setattr(batch_input, "CLASSIFY_CHUNK", 3)
+    passes = []
+
+    def classify_codes(lines):
+        passes.append(len(lines))
+        return real(lines)
+
+    real = batch_input.classify_codes
+    monkeypatch.setattr(batch_input, "classify_codes", classify_codes)
+    batch = tmp_path / "targets.txt"
+    batch.write_text("a.example.com\nb.example.com\n!!!\n+15551234567\nc.example.com\n")
+
+    counts = run_batch(batch, Namespace(concurrency=2, silent=True))
+
+    assert passes == [3, 2]
+    assert counts["invalid"] == 1 and counts["done"] == 4
+    assert ("phone_lookup", "+15551234567") in calls
+
+
+def test_run_batch_memory_is_flat(tmp_path, monkeypatch):
+    fake_lookups(monkeypatch)
+    monkeypatch.setattr(input_parser, "domain_ip_lookup", lambda item: None)
+
+    def peak_for(lines):
+        batch = tmp_path / f"batch_{lines}.txt"
+        with open(batch, "w") as f:
+            for i in range(lines):
+                f.write(f"host{i}.example.com\n")
+        tracemalloc.start()
+        run_batch(batch, Namespace(concurrency=4, silent=True))
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        return peak
+
+    small, large = peak_for(1_000), peak_for(10_000)
+    assert large < small * 2
+
+
+def test_run_batch_with_a_job_queue_keeps_backpressure(tmp_path, monkeypatch):
+    # The job queue treats a None return as a failure, so name an output file
+    monkeypatch.setattr(
+        input_parser, "domain_ip_lookup", lambda item, **kwargs: f"data/outputs/{item}.json"
+    )
+    peaks = []
+
+    class Probe(Dispatcher):
+        def _take_ready(self):
+            # Called with the lock held after every submit, defer and finish
+            peaks.append(self.outstanding)
+            return super()._take_ready()
+
+    monkeypatch.setattr(batch_input, "Dispatcher", Probe)
+    batch = tmp_path / "targets.txt"
+    batch.write_text("".join(f"host{i}.example.com\n" for i in range(300)))
+
+    with JobQueue(tmp_path / "cache.db") as queue:
+        queue.begin({"batch": str(batch)})
+        counts = run_batch(batch, Namespace(concurrency=2, silent=True), queue=queue)
+
+    assert counts["done"] == 300
+    assert max(peaks) <= 2 * batch_input.BACKLOG_PER_WORKER
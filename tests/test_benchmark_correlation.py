@@ -0,0 +1,88 @@
+import os
+import json
+
+import pytest
+from scripts import correlation_engine as ce
+from scripts.correlation_index import CorrelationIndex
+from tools.synthetic_corpus import SyntheticCorpus, generate_corpus
+from tools.benchmark_correlation import benchmark_size, compare
+
+
+def test_synthetic_corpus_is_deterministic(tmp_path):
+    a = generate_corpus(tmp_path / "a", 50, seed=7)
+    b = generate_corpus(tmp_path / "b", 50, seed=7)
+    assert [p.name for p in a] == [p.name for p in b]
+    assert [p.read_text() for p in a] == [p.read_text() for p in b]
+
+    producers = {ce.get_extractor(p.name) for p in a}
+    assert None not in producers  # every generated output carries entities
+    assert len(producers) >= 4
+
+
+def test_overlap_controls_shared_entities():
+    low = benchmark_size(300, overlap=0.0)
+    high = benchmark_size(300, overlap=0.5)
+    assert sum(low["shared"].values()) < sum(high["shared"].values())
+    assert high["clusters"] > 0
+
+
+def test_benchmark_reports_every_phase():
+    report = benchmark_size(200)
+    phases = {p["phase"]: p for p in report["phases"]}
+    assert list(phases) == [
+        "generate", "cold_sync", "correlate", "warm_rerun", "incremental", "add_one",
+        "query_2hop",
+    ]
+    assert phases["cold_sync"]["changed"] == 200
+    assert all(p["wall_s"] >= 0 and p["peak_rss_mb"] > 0 for p in phases.values())
+
+    slower = [
+        {**report, "phases": [{**p, "wall_s": p["wall_s"] * 3 + 1} for p in report["phases"]]}
+    ]
+    assert compare(slower, [report])
+    assert not compare([report], slower)
+
+
+def fuzzy_values():
+    with CorrelationIndex() as index:
+        return {(etype, v) for etype in ce.FUZZY_TYPES for v in index.iter_values(etype)}
+
+
+def test_one_new_output_is_correlated_incrementally(monkeypatch):
+    generate_corpus(ce.OUTPUT_DIR, 300, seed=3)
+    ce.correlate_data()
+    before = fuzzy_values()
+
+    corpus = SyntheticCorpus(seed=3)
+    for i in range(301):
+        name, doc = corpus.output(i)
+    (ce.OUTPUT_DIR / name).write_text(json.dumps(doc))
+
+    parsed, matched = [], []
+    real_read, real_update = ce.read_output, ce.update_pairs
+
+    def read_output(path, *args, **kwargs):
+        parsed.append(path.name)
+        return real_read(path, *args, **kwargs)
+
+    def update_pairs(*args, **kwargs):
+        matched.append(real_update(*args, **kwargs))
+        return matched[-1]
+
+    monkeypatch.setattr(ce, "read_output", read_output)
+    monkeypatch.setattr(ce, "update_pairs", update_pairs)
+    ce.correlate_data()
+
+    # Only the new file is parsed, and only its new values are fuzzy-matched
+    new_values = fuzzy_values() - before
+    assert parsed == [name]
+    assert new_values and matched == [len(new_values)]
+
+
+@pytest.mark.skipif(
+    not os.environ.get("AUTON_BENCHMARK"), reason="timing benchmark; set AUTON_BENCHMARK=1"
+)
+def test_one_new_output_is_fast():
+    phases = {p["phase"]: p["wall_s"] for p in benchmark_size(5_000)["phases"]}
+    assert phases["add_one"] < 1.0
+    assert phases["add_one"] < phases["correlate"] / 2
@@ -0,0 +1,73 @@
+import random
+
+import pytest
+from scripts import classifier
+from scripts.classifier import classify_bulk, detect_input_type
+from tools.benchmark_classifier import benchmark, synthetic_lines
+
+
+@pytest.mark.parametrize(
+    "item, expected",
+    [
+        ("8.8.8.8", "ip"),
+        ("255.255.255.255", "ip"),
+        ("256.1.1.1", "username"),
+        ("(555) 123-4567", "phone"),
+        ("+1 555 123 4567", "phone"),
+        ("+15551234567", "phone"),
+        ("alice@example.com", "email"),
+        ("example.com", "domain"),
+        ("sub.example.co.uk", "domain"),
+        ("@john.doe", "username"),
+        ("john_doe", "username"),
+        ("-bad.com", "username"),
+        ("a@b", None),
+        ("!!!", None),
+    ],
+)
+def test_detect_input_type(item, expected):
+    assert detect_input_type(item) == expected
+
+
+def reference(lines):
+    buckets = {t: [] for t in [*classifier.PATTERNS, classifier.INVALID]}
+    for line in lines:
+        line = line.strip()
+        if line:
+            buckets[detect_input_type(line) or "invalid"].append(line)
+    return buckets
+
+
+def test_bulk_matches_per_item_rules():
+    rng = random.Random(7)
+    alphabets = ["0123456789.", "0125+() -.", "abz-.09", "ab@.c-_", "a1 \t.@é"]
+    lines = synthetic_lines(2_000, seed=3) + [
+        "".join(rng.choice(a) for _ in range(rng.randint(0, 14)))
+        for a in alphabets
+        for _ in range(4_000)
+    ]
+    lines += ["x." + "a" * 70, "a" * 64 + ".com", "a@b.c.", "a@b..c.", "", "  pad.com  "]
+
+    assert classify_bulk(lines) == reference(lines)
+    assert classify_bulk("\n".join(lines)) == reference(lines)
+
+
+def test_buffer_input_forms():
+    text = "alice@example.com\r\n\n  8.8.8.8 \n@bob\nnope!\n"
+    expected = {
+        "email": ["alice@example.com"],
+        "ip": ["8.8.8.8"],
+        "phone": [],
+        "domain": [],
+        "username": ["@bob"],
+        "invalid": ["nope!"],
+    }
+    assert classify_bulk(text) == expected
+    assert classify_bulk(text.encode()) == expected
+    assert classify_bulk(iter(text.splitlines())) == expected
+
+
+def test_benchmark_reports_every_mode():
+    rows = benchmark(2_000)
+    assert [r["mode"] for r in rows][2:] == ["classify_bulk(list)", "classify_bulk(buffer)"]
+    assert rows[1]["counts"] == rows[2]["counts"] == rows[3]["counts"]
@@ -0,0 +1,219 @@
+import json
+import pytest
+from scripts import correlation_engine as ce
+from scripts import correlation_index as ci
+
+
+@pytest.fixture
+def corr_paths(tmp_path):
+    # conftest points OUTPUT_DIR, CORRELATED_OUTPUT and CACHE_DB into tmp_path
+    ce.OUTPUT_DIR.mkdir()
+    return tmp_path
+
+
+def write_output(outputs, name, data):
+    with open(outputs / name, "w") as f:
+        json.dump(data, f)
+
+
+def load_result(corr_paths):
+    with open(corr_paths / "correlated.json") as f:
+        return json.load(f)
+
+
+def test_correlate_data_groups_shared_values(corr_paths):
+    outputs = corr_paths / "outputs"
+    write_output(outputs, "a.json", {"xposed_breaches": ["Adobe", "Canva"]})
+    write_output(outputs, "b.json", {"xposed_breaches": ["Adobe"]})
+    write_output(outputs, "c.json", {"found_on": [{"site": "GitHub"}]})
+
+    ce.correlate_data()
+
+    result = load_result(corr_paths)
+    assert result["breaches"] == {"Adobe": ["a.json", "b.json"]}
+    assert result["usernames"] == {}
+
+
+def test_index_output_is_picked_up_and_removals_pruned(corr_paths):
+    outputs = corr_paths / "outputs"
+    write_output(outputs, "a.json", {"E164": "+1 555 0100"})
+    write_output(outputs, "b.json", {"International": "+1-555-0100"})
+    ce.index_output(outputs / "a.json")
+
+    ce.correlate_data()
+    assert load_result(corr_paths)["phones"] == {"+15550100": ["a.json", "b.json"]}
+
+    (outputs / "b.json").unlink()
+    ce.correlate_data()
+    assert load_result(corr_paths)["phones"] == {}
+
+
+def test_shared_values_uses_partial_index(corr_paths):
+    with ci.CorrelationIndex() as index:
+        index.add_artifact("a.json", {"domain": ["example.com"]})
+        index.add_artifact("b.json", {"domain": ["example.com", "other.org"]})
+        # Re-adding replaces rather than duplicates postings
+        index.add_artifact("b.json", {"domain": ["example.com"]})
+
+        plan = " ".join(
+            str(row)
+            for row in index.conn.execute(
+                "EXPLAIN QUERY PLAN SELECT type, value FROM entities "
+                "WHERE artifact_count > 1 ORDER BY type, value"
+            )
+        )
+        assert "idx_entities_shared" in plan
+        assert index.shared_values() == {"domain": {"example.com": ["a.json", "b.json"]}}
+
+
+def test_incremental_sync_only_parses_new_or_changed(corr_paths, monkeypatch):
+    outputs = corr_paths / "outputs"
+    write_output(outputs, "social_b.json", {"domain": "example.com"})
+    write_output(outputs, "social_c.json", {"domain": "other.org"})
+    ce.correlate_data()
+
+    parsed = []
+    original = ce.load_output
+
+    def counting_load_output(path, raw=None):
+        parsed.append(path.name)
+        return original(path, raw)
+
+    monkeypatch.setattr(ce, "load_output", counting_load_output)
+
+    # Late arrival that sorts before everything already processed
+    write_output(
+        outputs, "domain_ip_lookup_a.json", {"target": "example.com", "type": "domain"}
+    )
+    ce.correlate_data()
+    assert parsed == ["domain_ip_lookup_a.json"]
+    assert load_result(corr_paths)["domains"] == {
+        "example.com": ["domain_ip_lookup_a.json", "social_b.json"]
+    }
+
+    # Changed content replaces the artifact's old postings
+    write_output(outputs, "social_c.json", {"domain": "example.com", "pad": 1})
+    parsed.clear()
+    ce.correlate_data()
+    assert parsed == ["social_c.json"]
+    assert len(load_result(corr_paths)["domains"]["example.com"]) == 3
+
+    parsed.clear()
+    ce.correlate_data()
+    assert parsed == []
+
+
+def test_parallel_sync_matches_serial(corr_paths, monkeypatch):
+    outputs = corr_paths / "outputs"
+    for i in range(40):
+        write_output(
+            outputs,
+            f"out_{i:02d}.json",
+            {"domain": f"d{i % 7}.com", "xposed_breaches": [f"b{i % 5}"]},
+        )
+    monkeypatch.setattr(ce, "SHARD_SIZE", 6)
+
+    ce.correlate_data()
+    serial = load_result(corr_paths)
+
+    monkeypatch.setattr(ci, "CACHE_DB", corr_paths / "parallel.db")
+    (corr_paths / "correlated.json").unlink()
+    ce.correlate_data(workers=3)
+    assert load_result(corr_paths) == serial
+
+
+def test_large_outputs_are_streamed(corr_paths, monkeypatch):
+    outputs = corr_paths / "outputs"
+    sites = [{"site": f"site{i}", "url": f"https://site{i}/x"} for i in range(200)]
+    write_output(outputs, "normalized_username_a.json", {"found_on": sites})
+    write_output(outputs, "normalized_username_b.json", {"found_on": sites[:3]})
+    monkeypatch.setattr(ce, "STREAM_THRESHOLD", 0)
+    monkeypatch.setattr(
+        ce, "load_output", lambda *a: pytest.fail("large output loaded whole")
+    )
+
+    ce.correlate_data()
+
+    assert sorted(load_result(corr_paths)["usernames"]) == ["site0", "site1", "site2"]
+
+
+def test_clusters_link_artifacts_transitively(corr_paths):
+    outputs = corr_paths / "outputs"
+    write_output(outputs, "phone.json", {"E164": "+15550100", "domain": "acme.io"})
+    write_output(outputs, "email.json", {"domain": "acme.io", "xposed_breaches": ["X"]})
+    write_output(outputs, "email2.json", {"xposed_breaches": ["X"]})
+    write_output(outputs, "lonely.json", {"ip": "10.0.0.1"})
+    write_output(outputs, "a.json", {"ip": "8.8.8.8"})
+    write_output(outputs, "b.json", {"ip": "8.8.8.8"})
+
+    ce.correlate_data()
+
+    clusters = load_result(corr_paths)["clusters"]
+    assert clusters == [
+        {
+            "size": 3,
+            "artifacts": ["email.json", "email2.json", "phone.json"],
+            "bridges": {"breach": ["X"], "domain": ["acme.io"]},
+        },
+        {"size": 2, "artifacts": ["a.json", "b.json"], "bridges": {"ip": ["8.8.8.8"]}},
+    ]
+
+
+def test_fuzzy_usernames_section(corr_paths):
+    outputs = corr_paths / "outputs"
+    write_output(
+        outputs,
+        "normalized_username_a.json",
+        {"username": "john_doe", "found_on": [{"site": "GitHub", "url": "https://github.com/John_Doe/"}]},
+    )
+    write_output(
+        outputs,
+        "normalized_social_b.json",
+        {"username": "j0hndoe", "found_on": [{"site": "github", "url": "github.com/johndoe"}]},
+    )
+
+    ce.correlate_data()
+
+    fuzzy = load_result(corr_paths)["fuzzy_usernames"]
+    assert {
+        "type": "handle",
+        "similarity": 1.0,
+        "values": {"j0hndoe": ["normalized_social_b.json"], "john_doe": ["normalized_username_a.json"]},
+    } in fuzzy
+    assert any(
+        pair["type"] == "profile_url"
+        and set(pair["values"]) == {"github.com/john_doe", "github.com/johndoe"}
+        for pair in fuzzy
+    )
+
+
+def test_correlate_reads_the_shared_store(corr_paths):
+    store = corr_paths / "store"
+    store.mkdir()
+    write_output(store, "a.json", {"xposed_breaches": ["Adobe"]})
+    write_output(store, "b.json", {"xposed_breaches": ["Adobe"]})
+    write_output(corr_paths / "outputs", "local.json", {"xposed_breaches": ["Adobe"]})
+
+    ce.correlate_data(outputs=store)
+
+    assert load_result(corr_paths)["breaches"] == {"Adobe": ["a.json", "b.json"]}
+
+
+def test_each_outputs_root_is_synced_separately(corr_paths):
+    store = corr_paths / "store"
+    store.mkdir()
+    write_output(corr_paths / "outputs", "local.json", {"xposed_breaches": ["Adobe"]})
+    write_output(store, "remote.json", {"xposed_breaches": ["Adobe"]})
+
+    with ci.CorrelationIndex() as index:
+        assert ce.sync_index(index) == 1
+        assert ce.sync_index(index, outputs=store) == 1
+        # Neither root drops the other's artifacts, so nothing is reindexed
+        assert ce.sync_index(index) == 0
+        assert ce.sync_index(index, outputs=store) == 0
+        assert sorted(name for _, name in index.iter_artifacts()) == ["local.json", "remote.json"]
+
+        (store / "remote.json").unlink()
+        assert ce.sync_index(index) == 0
+        assert ce.sync_index(index, outputs=store) == 1
+        assert [name for _, name in index.iter_artifacts()] == ["local.json"]
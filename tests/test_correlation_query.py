@@ -0,0 +1,63 @@
+import pytest
+from scripts.correlation_index import CorrelationIndex
+from scripts.correlation_query import parse_entity, query_entity
+
+
+@pytest.fixture
+def index(tmp_path):
+    index = CorrelationIndex(tmp_path / "cache.db")
+    # a ↔ b through the IP, b ↔ c through the domain, d is unrelated
+    index.add_artifact("a.json", {"ip": ["1.2.3.4"], "phone": ["+15551234567"]})
+    index.add_artifact("b.json", {"ip": ["1.2.3.4"], "domain": ["example.com"]})
+    index.add_artifact("c.json", {"domain": ["example.com"], "breach": ["Adobe"]})
+    index.add_artifact("d.json", {"breach": ["Canva"]})
+    index.commit()
+    yield index
+    index.close()
+
+
+def test_query_expands_bounded_hops(index):
+    one = query_entity(index, "ip", "1.2.3.4", hops=1)
+    assert one["found"]
+    assert [a["name"] for a in one["artifacts"]] == ["a.json", "b.json"]
+    assert one["entities"] == {
+        "domain": {"example.com": 1},
+        "phone": {"+15551234567": 1},
+    }
+
+    two = query_entity(index, "ip", "1.2.3.4", hops=2)
+    assert two["artifacts"][-1] == {"name": "c.json", "hop": 2}
+    assert two["entities"]["breach"] == {"Adobe": 2}
+    assert "d.json" not in [a["name"] for a in two["artifacts"]]
+
+
+def test_query_normalizes_and_reports_misses(index):
+    assert query_entity(index, "domain", "EXAMPLE.com.")["found"]
+    missing = query_entity(index, "ip", "9.9.9.9", hops=3)
+    assert not missing["found"]
+    assert missing["artifacts"] == []
+
+
+def test_parse_entity():
+    assert parse_entity("ip:1.2.3.4") == ("ip", "1.2.3.4")
+    assert parse_entity("profile_url:https://x.com/jd/") == ("profile_url", "x.com/jd")
+    with pytest.raises(ValueError):
+        parse_entity("1.2.3.4")
+    with pytest.raises(ValueError):
+        parse_entity("mac:00:11:22:33:44:55")
+
+
+def test_username_and_email_queries_reach_their_artifacts(index):
+    index.add_artifact("normalized_username_a.json", {"handle": ["alice"], "username": ["GitHub"]})
+    index.add_artifact("email_verification_a.json", {"email": ["alice@example.com"]})
+    index.commit()
+
+    etype, value = parse_entity("username:@Alice")
+    assert (etype, value) == ("handle", "alice")
+    assert query_entity(index, etype, value)["artifacts"][0]["name"] == "normalized_username_a.json"
+    assert parse_entity("site:GitHub") == ("username", "GitHub")
+
+    etype, value = parse_entity("email:Alice@Example.com")
+    found = query_entity(index, etype, value)
+    assert found["found"]
+    assert found["artifacts"] == [{"name": "email_verification_a.json", "hop": 1}]
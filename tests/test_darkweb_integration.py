@@ -1,20 +1,20 @@
+import json
+
 import pytest
+import requests
 from modules.darkweb.darkweb_integration import search_darksearch, torbot_crawl, darkweb_lookup
 
 
 @pytest.fixture
 def mock_darksearch_response(monkeypatch):
-    def mock_get(*args, **kwargs):
-        class MockResponse:
-            def raise_for_status(self):
-                pass
-
-            def json(self):
-                return {
-                    "data": [{"title": "Test Result", "link": "http://example.onion"}]
-                }
-
-        return MockResponse()
+    def mock_get(url, *args, **kwargs):
+        resp = requests.Response()
+        resp.status_code, resp.url = 200, url
+        resp.headers["Content-Type"] = "application/json"
+        resp._content = json.dumps(
+            {"data": [{"title": "Test Result", "link": "http://example.onion"}]}
+        ).encode()
+        return resp
 
     monkeypatch.setattr("requests.get", mock_get)
 
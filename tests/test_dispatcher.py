@@ -0,0 +1,118 @@
+import time
+import threading
+from argparse import Namespace
+
+import pytest
+from scripts import input_parser
+from scripts.dispatcher import Dispatcher
+
+
+class Probe:
+    """Fake lookup that sleeps and records peak concurrency per module."""
+
+    def __init__(self, delay=0.2):
+        self.delay = delay
+        self.lock = threading.Lock()
+        self.active = {}
+        self.peak = {}
+        self.calls = []
+
+    def __call__(self, module):
+        def lookup(item, **kwargs):
+            with self.lock:
+                self.active[module] = self.active.get(module, 0) + 1
+                self.peak[module] = max(self.peak.get(module, 0), self.active[module])
+                self.calls.append((module, item))
+            time.sleep(self.delay)
+            with self.lock:
+                self.active[module] -= 1
+            return item
+
+        return lookup
+
+
+def test_mixed_jobs_run_concurrently():
+    probe = Probe()
+    start = time.perf_counter()
+    with Dispatcher(max_workers=8) as dispatcher:
+        futures = [
+            dispatcher.submit(module, probe(module), i)
+            for i, module in enumerate(["phone_lookup", "email_verification", "domain_ip_lookup"] * 2)
+        ]
+    elapsed = time.perf_counter() - start
+
+    assert [f.result() for f in futures] == list(range(6))
+    assert elapsed < 0.2 * 6 / 2
+
+
+def test_module_limit_is_respected_without_starving_others():
+    probe = Probe(delay=0.1)
+    with Dispatcher(max_workers=3, module_limits={"username_search": 1}) as dispatcher:
+        slow = [dispatcher.submit("username_search", probe("username_search"), i) for i in range(4)]
+        fast = dispatcher.submit("domain_ip_lookup", probe("domain_ip_lookup"), "x")
+        fast.result(timeout=0.3)  # not stuck behind the queued username jobs
+    assert probe.peak["username_search"] == 1
+    assert all(f.done() for f in slow)
+
+
+def test_failed_job_does_not_stop_the_rest():
+    def broken(item):
+        raise RuntimeError("boom")
+
+    with Dispatcher(max_workers=2) as dispatcher:
+        bad = dispatcher.submit("phone_lookup", broken, "1")
+        good = dispatcher.submit("phone_lookup", lambda item: item, "2")
+    with pytest.raises(RuntimeError):
+        bad.result()
+    assert good.result() == "2"
+
+
+@pytest.fixture
+def fake_modules(monkeypatch):
+    probe = Probe(delay=0.05)
+    for name, module in [
+        ("phone_lookup", "phone_lookup"),
+        ("verify_email", "email_verification"),
+        ("search_username", "username_search"),
+        ("social_discovery", "social_discovery"),
+        ("domain_ip_lookup", "domain_ip_lookup"),
+    ]:
+        monkeypatch.setattr(input_parser, name, probe(module))
+    probe.correlations = []
+    probe.renders = []
+    monkeypatch.setattr(
+        input_parser, "correlate_data", lambda: probe.correlations.append(1)
+    )
+    monkeypatch.setattr(
+        input_parser, "visualize_correlations", lambda: probe.renders.append(1)
+    )
+    return probe
+
+
+def test_input_parser_dispatches_every_bucket(fake_modules):
+    input_parser.main(
+        Namespace(input="+15551234567,a@b.com,@alice,example.com,test.org", concurrency=4)
+    )
+
+    assert sorted(fake_modules.calls) == [
+        ("domain_ip_lookup", "example.com"),
+        ("domain_ip_lookup", "test.org"),
+        ("email_verification", "a@b.com"),
+        ("phone_lookup", "+15551234567"),
+        ("social_discovery", "alice"),
+        ("username_search", "alice"),
+    ]
+    # main.py correlates once after the parser returns
+    assert fake_modules.correlations == []
+
+
+def test_standalone_parser_correlates_once_per_run(fake_modules, monkeypatch):
+    monkeypatch.setattr("sys.argv", ["input_parser", "@alice,@bob,@carol,example.com"])
+    input_parser.main()
+    assert fake_modules.correlations == [1]
+    assert fake_modules.renders == [1]
+
+
+def test_live_mode_correlates_per_username(fake_modules):
+    input_parser.main(Namespace(input="@alice,@bob,example.com", live=True))
+    assert fake_modules.correlations == [1, 1]
@@ -0,0 +1,46 @@
+from scripts.extractors import extract_members, get_extractor, producer_of
+from scripts.json_stream import document_members
+
+
+def extract(name, data):
+    return extract_members(name, document_members(data))
+
+
+def test_producer_dispatch_by_filename():
+    assert producer_of("normalized_social_john_doe_20250101_120000.json") == "normalized_social"
+    assert producer_of("domain_ip_lookup_8_8_8_8_20250101_120000.json") == "domain_ip_lookup"
+    assert producer_of("custom_tool_20250101.json") is None
+    assert get_extractor("maigret_john_20250101_120000.json") is None
+
+
+def test_domain_ip_lookup_uses_target_and_resolved_ip():
+    domain = {"target": "Example.com", "type": "domain", "resolved_ip": "93.184.216.34"}
+    ip = {"target": "8.8.8.8", "type": "ip", "reverse_dns": "dns.google"}
+    failed = {"target": "nx.invalid", "resolved_ip": "Failed to resolve: [Errno -2]"}
+
+    assert extract("domain_ip_lookup_a.json", domain) == {
+        "domain": ["example.com"],
+        "ip": ["93.184.216.34"],
+    }
+    assert extract("domain_ip_lookup_b.json", ip) == {"ip": ["8.8.8.8"]}
+    assert extract("domain_ip_lookup_c.json", failed) == {"domain": ["nx.invalid"]}
+
+
+def test_email_verification_indexes_the_address():
+    data = {"email": "Alice@Example.com", "xposed_breaches": ["Adobe"]}
+    assert extract("email_verification_alice_20250101.json", data) == {
+        "email": ["alice@example.com"],
+        "breach": ["Adobe"],
+    }
+
+
+def test_extractors_only_read_their_own_schema():
+    data = {"E164": "+1 555 0100", "xposed_breaches": ["Adobe"], "domain": "x.io"}
+    assert extract("phone_lookup_1555_20250101.json", data) == {"phone": ["+15550100"]}
+    assert extract("email_verification_a_20250101.json", data) == {"breach": ["Adobe"]}
+    # Unregistered producers fall back to probing every known key
+    assert extract("other_20250101.json", data) == {
+        "phone": ["+15550100"],
+        "breach": ["Adobe"],
+        "domain": ["x.io"],
+    }
@@ -0,0 +1,91 @@
+import random
+import string
+
+from scripts.correlation_engine import FUZZY_TYPES
+from scripts.correlation_index import CorrelationIndex
+from scripts.fuzzy_match import (
+    fuzzy_key,
+    similar_pairs,
+    similar_urls,
+    split_profile_url,
+    update_pairs,
+)
+
+
+def test_fuzzy_key_folds_separators_and_leetspeak():
+    assert fuzzy_key("John_Doe") == fuzzy_key("j0hn.doe") == fuzzy_key("@johndoe")
+
+
+def test_similar_pairs_finds_near_duplicates_only():
+    values = ["john_doe", "johndoe", "j0hndoe", "johndoe1", "alice", "bob_smith"]
+    pairs = {(a, b): sim for a, b, sim in similar_pairs(values, threshold=0.6)}
+
+    assert pairs[("john_doe", "johndoe")] == 1.0
+    assert pairs[("j0hndoe", "john_doe")] == 1.0
+    assert 0.6 <= pairs[("johndoe", "johndoe1")] < 1.0
+    assert not any("alice" in pair or "bob_smith" in pair for pair in pairs)
+
+
+def test_profile_urls_compare_handles_within_a_host():
+    assert split_profile_url("reddit.com/user/mark") == ("reddit.com", "mark")
+    urls = [
+        "instagram.com/bob", "instagram.com/rob",
+        "twitter.com/alice", "twitter.com/alina",
+        "reddit.com/user/mark", "reddit.com/user/mike",
+        "github.com/john_doe", "github.com/johndoe", "gitlab.com/johndoe",
+        "reddit.com/u/jdoe", "reddit.com/user/jdoe",
+    ]
+    pairs = {(a, b): sim for a, b, sim in similar_urls(urls)}
+    assert pairs == {
+        ("github.com/john_doe", "github.com/johndoe"): 1.0,
+        ("reddit.com/u/jdoe", "reddit.com/user/jdoe"): 1.0,
+    }
+
+
+def test_shared_host_does_not_make_candidates():
+    rng = random.Random(1)
+    handles = {"".join(rng.choices(string.ascii_lowercase, k=10)) for _ in range(3000)}
+    urls = [f"{host}/{handle}" for host in ("github.com", "x.com") for handle in handles]
+    assert similar_urls(urls) == []
+
+
+def stored_pairs(index):
+    return {(*sorted((a, b)), sim) for _, _, a, _, b, sim in index.iter_fuzzy_pairs()}
+
+
+def test_incremental_pairs_match_a_full_pass(tmp_path):
+    handles = ["john_doe", "johndoe", "j0hndoe", "johndoe1", "alice", "bob_smith", "alice_b"]
+    urls = ["github.com/john_doe", "github.com/johndoe", "x.com/johndoe", "x.com/alice"]
+    expected = set(similar_pairs(handles)) | set(similar_urls(urls))
+
+    with CorrelationIndex(tmp_path / "cache.db") as index:
+        index.add_artifact("a.json", {"handle": handles[:3], "profile_url": urls[:2]})
+        assert update_pairs(index, FUZZY_TYPES) == 5
+        index.add_artifact("b.json", {"handle": handles[3:], "profile_url": urls[2:]})
+        # Only the entities new since the last pass are matched
+        assert update_pairs(index, FUZZY_TYPES) == 6
+        assert update_pairs(index, FUZZY_TYPES) == 0
+        assert stored_pairs(index) == expected
+
+    for name, order in (("full", handles), ("reversed", handles[::-1])):
+        with CorrelationIndex(tmp_path / f"{name}.db") as index:
+            index.add_artifact("a.json", {"handle": order, "profile_url": urls[::-1]})
+            update_pairs(index, FUZZY_TYPES)
+            assert stored_pairs(index) == expected
+
+
+def test_stored_key_still_gets_its_neighbours(tmp_path):
+    values = ["johndoe1", "john_doe", "johndoe"]
+    expected = set(similar_pairs(values))
+    assert ("johndoe", "johndoe1", 0.7) in expected
+
+    with CorrelationIndex(tmp_path / "one.db") as index:
+        index.add_artifact("a.json", {"handle": values})
+        update_pairs(index, FUZZY_TYPES)
+        assert stored_pairs(index) == expected
+
+    with CorrelationIndex(tmp_path / "split.db") as index:
+        for i, value in enumerate(values):
+            index.add_artifact(f"{i}.json", {"handle": [value]})
+            update_pairs(index, FUZZY_TYPES)
+        assert stored_pairs(index) == expected
@@ -0,0 +1,140 @@
+import time
+
+import pytest
+import requests
+from scripts import correlation_index
+from scripts.http_cache import (
+    HttpCache,
+    cached_get,
+    entry_size,
+    get_cache,
+    normalize_url,
+    request_key,
+    set_cache_mode,
+)
+
+
+@pytest.fixture
+def fake_network(monkeypatch):
+    """requests.get answering from a {url: (status, body)} table, counting calls."""
+    calls = []
+    pages = {}
+
+    def get(url, params=None, headers=None, **kwargs):
+        calls.append(url)
+        status, body = pages.get(url, (404, b""))
+        resp = requests.Response()
+        resp.status_code, resp._content, resp.url = status, body, url
+        resp.headers["Content-Type"] = "application/json"
+        return resp
+
+    monkeypatch.setattr(requests, "get", get)
+    return pages, calls
+
+
+def test_requests_are_keyed_by_normalized_form():
+    assert normalize_url("HTTPS://Example.COM:443/a?b=2&a=1#frag") == "https://example.com/a?a=1&b=2"
+    assert normalize_url("http://h:8080", {"q": "x"}) == "http://h:8080/?q=x"
+    assert request_key("get", "https://e.com/x?b=1", {"a": 2}) == request_key(
+        "GET", "https://E.com/x?a=2&b=1", headers={"User-Agent": "other"}
+    )
+    assert request_key("GET", "https://e.com/x", headers={"Key": "1"}) != request_key(
+        "GET", "https://e.com/x", headers={"Key": "2"}
+    )
+
+
+def test_hits_skip_the_network_and_404s_are_cached(fake_network):
+    pages, calls = fake_network
+    pages["http://ip-api.com/json/1.2.3.4"] = (200, b'{"country": "NL"}')
+    pages["https://down.example/x"] = (500, b"")
+
+    assert cached_get("http://ip-api.com/json/1.2.3.4").json() == {"country": "NL"}
+    hit = cached_get("http://IP-API.com/json/1.2.3.4")
+    assert hit.from_cache and hit.json() == {"country": "NL"} and hit.status_code == 200
+    assert hit.headers["content-type"] == "application/json"
+
+    assert cached_get("https://api.xposedornot.com/v1/check-email/a@b.c").status_code == 404
+    missing = cached_get("https://api.xposedornot.com/v1/check-email/a@b.c")
+    assert missing.from_cache and not missing.ok
+    with pytest.raises(requests.HTTPError):
+        missing.raise_for_status()
+
+    cached_get("https://down.example/x")
+    cached_get("https://down.example/x")  # errors are never cached
+    assert len(calls) == 4
+
+
+def test_refresh_and_no_cache_modes(fake_network):
+    pages, calls = fake_network
+    url = "https://darksearch.io/api/search?query=x"
+    pages[url] = (200, b"[]")
+    cached_get(url)
+
+    set_cache_mode("refresh")
+    assert not getattr(cached_get(url), "from_cache", False)
+    set_cache_mode("off")
+    pages[url] = (200, b"[1]")
+    cached_get(url)
+    set_cache_mode("on")
+    assert cached_get(url).json() == []  # the refresh was stored, the bypass was not
+    assert len(calls) == 3
+    with pytest.raises(ValueError):
+        set_cache_mode("sometimes")
+
+
+def test_per_endpoint_ttls_and_expiry(tmp_path):
+    cache = HttpCache(tmp_path / "c.db")
+    cache.ttls = [("ip-api.com/json", 600), ("ip-api.com", 60)]
+    assert cache.ttl_for("http://ip-api.com/json/1.1.1.1", 200) == 600
+    assert cache.ttl_for("http://ip-api.com/batch", 200) == 60
+    assert cache.ttl_for("https://other.org/", 200) == cache.default_ttl
+    assert cache.ttl_for("http://ip-api.com/json/x", 404) == cache.negative_ttl
+
+    cache.put("k", "https://other.org/", 200, {}, b"x", ttl=0.05)
+    assert cache.get("k") is not None
+    time.sleep(0.1)
+    assert cache.get("k") is None
+
+
+def test_lru_eviction_keeps_recently_used_entries(tmp_path):
+    cache = HttpCache(tmp_path / "c.db")
+    row = entry_size("https://e.com/", "{}", b"x" * 300)
+    cache.max_bytes = int(3.4 * row)
+    for i in range(4):
+        cache.put(f"k{i}", "https://e.com/", 200, {}, b"x" * 300)
+        time.sleep(0.01)
+        if i == 1:
+            cache.get("k0")  # k0 is now more recent than k1
+            time.sleep(0.01)
+    assert [k for k in ("k0", "k1", "k2", "k3") if cache.get(k)] == ["k0", "k2", "k3"]
+    assert cache.stats()["bytes"] == 3 * row
+
+
+def test_bodiless_verdicts_count_towards_the_bound(tmp_path):
+    cache = HttpCache(tmp_path / "c.db")
+    cache.max_bytes = 20 * entry_size("https://e.com/u00", "{}", b"")
+    for i in range(100):
+        cache.put_verdict(f"k{i}", f"https://e.com/u{i:02}", i % 2 == 0)
+    assert 0 < cache.stats()["entries"] <= 20
+    assert cache.stats()["bytes"] <= cache.max_bytes
+
+
+def test_expired_rows_are_purged_on_schedule(tmp_path):
+    cache = HttpCache(tmp_path / "c.db")
+    cache.purge_interval = 0
+    cache.put("old", "https://e.com/a", 200, {}, b"x", ttl=0.05)
+    time.sleep(0.1)
+    cache.put("new", "https://e.com/b", 200, {}, b"x")
+    assert cache.stats()["entries"] == 1
+    # Within the interval nothing is scanned
+    cache.purge_interval = 3600
+    cache.put("brief", "https://e.com/c", 200, {}, b"x", ttl=0.05)
+    cache.put("other", "https://e.com/d", 200, {}, b"x")
+    time.sleep(0.1)
+    cache.put("last", "https://e.com/e", 200, {}, b"x")
+    assert cache.stats()["entries"] == 4
+
+
+def test_process_wide_cache_is_shared():
+    assert get_cache() is get_cache()
+    assert get_cache().db_path == correlation_index.CACHE_DB
@@ -0,0 +1,125 @@
+import threading
+from argparse import Namespace
+
+import pytest
+from scripts import correlation_index, input_parser
+from scripts.dispatcher import Dispatcher
+from scripts.job_queue import DONE, FAILED, PENDING, JobQueue
+
+
+@pytest.fixture
+def queue(tmp_path):
+    queue = JobQueue(tmp_path / "cache.db", max_attempts=2, backoff=0.01)
+    yield queue
+    queue.close()
+
+
+class Flaky:
+    """Fake lookup that fails its first `failures` calls per item."""
+
+    def __init__(self, failures=0, result=lambda item: f"data/outputs/{item}.json"):
+        self.failures = failures
+        self.result = result
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def __call__(self, item, **kwargs):
+        with self.lock:
+            self.calls.append(item)
+            if self.calls.count(item) <= self.failures:
+                raise RuntimeError("boom")
+        return self.result(item)
+
+
+def job(queue, module, selector):
+    rows = queue.conn.execute(
+        "SELECT status, attempts, result_path, error, duration, next_attempt_at "
+        "FROM jobs WHERE module = ? AND selector = ?",
+        (module, selector),
+    ).fetchall()
+    return dict(zip(("status", "attempts", "result_path", "error", "duration", "next"), rows[0]))
+
+
+def test_retries_with_backoff_then_records_result(queue):
+    queue.begin({"input": "example.com"})
+    lookup = Flaky(failures=1)
+    with Dispatcher(max_workers=2) as dispatcher:
+        future = queue.submit(dispatcher, "domain_ip_lookup", "example.com", lookup, "example.com")
+
+    assert future.result() == "data/outputs/example.com.json"
+    assert lookup.calls == ["example.com", "example.com"]
+    row = job(queue, "domain_ip_lookup", "example.com")
+    assert row["status"] == DONE and row["attempts"] == 2
+    assert row["result_path"] == "data/outputs/example.com.json"
+    assert row["error"] is None and row["duration"] >= 0
+    assert queue.completed("domain_ip_lookup", "example.com") == row["result_path"]
+
+
+def test_exhausted_job_fails_and_none_counts_as_failure(queue):
+    queue.begin({})
+    with Dispatcher(max_workers=2) as dispatcher:
+        future = queue.submit(dispatcher, "phone_lookup", "+15551234567", lambda n: None, "+15551234567")
+    with pytest.raises(LookupError):
+        future.result()
+    row = job(queue, "phone_lookup", "+15551234567")
+    assert row["status"] == FAILED and row["attempts"] == 2 and row["next"] is None
+    assert queue.finish() == {FAILED: 1}
+    assert queue.interrupted()["id"] == queue.run_id  # still resumable
+
+
+def test_resume_skips_finished_lookups(tmp_path, monkeypatch):
+    lookups = {name: Flaky() for name in ("domain_ip_lookup", "verify_email")}
+    lookups["verify_email"].failures = 5
+    for name, fake in lookups.items():
+        monkeypatch.setattr(input_parser, name, fake)
+    args = Namespace(input="example.com,test.org,a@b.com", concurrency=2)
+
+    with JobQueue(tmp_path / "cache.db", max_attempts=1, backoff=0) as queue:
+        queue.begin({"input": args.input})
+        input_parser.dispatch(
+            {"domain": ["example.com", "test.org"], "email": ["a@b.com"]}, args, queue
+        )
+        # simulate a crash mid-lookup
+        queue._update("domain_ip_lookup", "test.org", status="running")
+        assert queue.finish()[FAILED] == 1
+
+    lookups["verify_email"].failures = 0
+    with JobQueue(tmp_path / "cache.db", max_attempts=1, backoff=0) as queue:
+        assert queue.resume() == {"input": "example.com,test.org,a@b.com"}
+        assert queue.counts()[PENDING] == 1
+        results = input_parser.dispatch(
+            {"domain": ["example.com", "test.org"], "email": ["a@b.com"]}, args, queue
+        )
+        assert queue.finish() == {DONE: 3}
+        assert queue.interrupted() is None
+
+    assert sorted(lookups["domain_ip_lookup"].calls) == ["example.com", "test.org", "test.org"]
+    assert lookups["verify_email"].calls == ["a@b.com", "a@b.com"]
+    assert results[("domain_ip_lookup", "example.com")] == "data/outputs/example.com.json"
+
+
+def test_backoff_frees_the_slot_and_is_not_timed(queue):
+    queue.backoff = 0.5
+    queue.begin({})
+    recorded = []
+    scheduler = Namespace(score=lambda module, waited: 0.0, record=lambda *r: recorded.append(r))
+    order = []
+    flaky = Flaky(failures=1, result=lambda item: order.append(item) or item)
+    steady = Flaky(result=lambda item: order.append(item) or item)
+    with Dispatcher(max_workers=1, scheduler=scheduler) as dispatcher:
+        retried = queue.submit(dispatcher, "phone_lookup", "flaky", flaky, "flaky")
+        other = queue.submit(dispatcher, "phone_lookup", "steady", steady, "steady")
+        # The steady job runs while the flaky one waits out its backoff
+        assert other.result(timeout=0.4) == "steady"
+        assert retried.result() == "flaky"
+
+    assert order == ["steady", "flaky"]
+    assert [ok for _, _, ok in recorded] == [False, True, True]
+    assert all(duration < 0.4 for _, duration, _ in recorded)
+    assert job(queue, "phone_lookup", "flaky")["duration"] < 0.4
+
+
+def test_default_path_follows_the_index(monkeypatch, tmp_path):
+    monkeypatch.setattr(correlation_index, "CACHE_DB", tmp_path / "elsewhere.db")
+    with JobQueue() as queue:
+        assert queue.db_path == tmp_path / "elsewhere.db"
@@ -0,0 +1,34 @@
+import io
+import json
+import hashlib
+import pytest
+from scripts.json_stream import document_members, stream_members
+
+
+DOC = {
+    "username": "johndoe",
+    "count": 1234567,
+    "ratio": -1.5e3,
+    "verified": True,
+    "empty": [],
+    "nothing": {},
+    "found_on": [{"site": "GitHub", "url": "https://github.com/johndoe"}] * 3,
+    "sites": {"Reddit": {"status": "claimed", "tags": ["social"]}, "Ünïcode": None},
+}
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 64 * 1024])
+def test_stream_members_matches_document_members(chunk_size):
+    raw = json.dumps(DOC, indent=2, ensure_ascii=False).encode("utf-8")
+    hasher = hashlib.sha256()
+
+    events = list(stream_members(io.BytesIO(raw), hasher, chunk_size=chunk_size))
+
+    assert events == list(document_members(DOC))
+    assert hasher.hexdigest() == hashlib.sha256(raw).hexdigest()
+
+
+def test_stream_members_rejects_truncated_input():
+    raw = json.dumps(DOC).encode("utf-8")[:-20]
+    with pytest.raises(ValueError):
+        list(stream_members(io.BytesIO(raw), chunk_size=16))
@@ -0,0 +1,39 @@
+import numpy as np
+from scripts.correlation_index import CorrelationIndex
+from scripts.posting_lists import PostingLists
+
+
+def build_index(tmp_path, artifacts):
+    index = CorrelationIndex(tmp_path / "cache.db")
+    for name, entities in artifacts.items():
+        index.add_artifact(name, entities)
+    index.commit()
+    return index
+
+
+def test_posting_lists_intern_and_intersect(tmp_path):
+    index = build_index(
+        tmp_path,
+        {
+            "d.json": {"breach": ["Adobe"], "domain": ["example.com"]},
+            "a.json": {"breach": ["Adobe"]},
+            "c.json": {"domain": ["example.com"], "breach": ["Canva"]},
+            "b.json": {"breach": ["Canva"], "domain": ["solo.org"]},
+        },
+    )
+    lists = PostingLists.from_index(index)
+
+    assert lists.postings.dtype == np.uint32
+    assert lists.names_for(lists.lookup("breach", "Adobe")) == ["a.json", "d.json"]
+    assert len(lists.lookup("domain", "solo.org")) == 0
+
+    both = lists.artifacts_sharing_all("breach", "domain")
+    assert lists.names_for(both) == ["c.json", "d.json"]
+    assert lists.to_sections() == index.shared_values()
+
+
+def test_posting_lists_empty_index(tmp_path):
+    lists = PostingLists.from_index(build_index(tmp_path, {"a.json": {"ip": ["1.1.1.1"]}}))
+    assert len(lists) == 0
+    assert lists.to_sections() == {}
+    assert len(lists.artifacts_sharing_all("ip", "domain")) == 0
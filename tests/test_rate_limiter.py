@@ -0,0 +1,101 @@
+import time
+import threading
+from email.utils import formatdate
+
+import pytest
+import requests
+from scripts import rate_limiter
+from scripts.rate_limiter import (
+    RateLimiter,
+    TokenBucket,
+    load_rate_limits,
+    parse_rate,
+    polite_get,
+    retry_after_seconds,
+)
+
+
+def test_parse_rate_and_retry_after():
+    assert parse_rate("45/minute") == (0.75, 1)
+    assert parse_rate({"rate": "1000/days", "burst": 10}) == (1000 / 86400, 10)
+    assert parse_rate("2") == (2.0, 1)
+    with pytest.raises(ValueError):
+        parse_rate("5/fortnight")
+    assert retry_after_seconds("7") == 7.0
+    assert 25 < retry_after_seconds(formatdate(time.time() + 30, usegmt=True)) <= 30
+    assert retry_after_seconds(None) is None and retry_after_seconds("soon") is None
+
+
+def test_limits_are_collected_from_module_yamls(tmp_path):
+    (tmp_path / "flat.yaml").write_text("timeout: 5\nrate_limits:\n  A.example: 1/second\n")
+    (tmp_path / "nested.yaml").write_text(
+        "mod:\n  rate_limits:\n    b.example: {rate: 10/minute, burst: 3}\n"
+    )
+    assert load_rate_limits(tmp_path) == {
+        "a.example": "1/second",
+        "b.example": {"rate": "10/minute", "burst": 3},
+    }
+
+
+def test_bucket_paces_after_the_burst():
+    bucket = TokenBucket(rate=20, burst=2)
+    delays = [bucket.reserve() for _ in range(5)]
+    assert delays[:2] == [0.0, 0.0]
+    assert delays[2:] == pytest.approx([0.05, 0.10, 0.15], abs=0.01)
+    assert TokenBucket().reserve() == 0.0  # undeclared host: no pacing
+
+
+def test_throttling_pauses_slows_and_recovers():
+    bucket = TokenBucket(rate=10, burst=5)
+    assert bucket.throttled(retry_after=0.3) == 0.3
+    assert bucket.reserve() >= 0.25
+    assert bucket.rate == 5
+    for _ in range(10):
+        bucket.succeeded()
+    assert bucket.rate == 10
+
+    unknown = TokenBucket()
+    assert unknown.throttled() == 2.0 and unknown.throttled() == 4.0  # no Retry-After
+    unknown.succeeded()
+    assert unknown.strikes == 0
+
+
+def test_hosts_share_buckets_and_inherit_parent_limits():
+    limiter = RateLimiter({"example.com": "10/second", "api.example.com": "1/second"})
+    assert limiter.bucket("https://www.example.com/a") is limiter.bucket("http://WWW.example.com/b")
+    assert limiter.bucket("https://cdn.example.com/").max_rate == 10
+    assert limiter.bucket("https://api.example.com/").max_rate == 1
+    assert limiter.bucket("https://other.org/").max_rate is None
+
+
+def test_concurrent_callers_are_held_to_the_rate():
+    limiter = RateLimiter({"api.test": "20/second"})
+    start = time.perf_counter()
+    threads = [
+        threading.Thread(target=limiter.acquire, args=("https://api.test/x",)) for _ in range(8)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert time.perf_counter() - start >= 7 / 20 - 0.02
+
+
+def test_polite_get_honours_retry_after(monkeypatch):
+    answers = [(429, {"Retry-After": "0.2"}), (200, {})]
+    sent = []
+
+    def get(url, **kwargs):
+        sent.append(time.perf_counter())
+        resp = requests.Response()
+        resp.status_code, headers = answers.pop(0)
+        resp.headers.update(headers)
+        return resp
+
+    monkeypatch.setattr(requests, "get", get)
+    monkeypatch.setattr(rate_limiter, "_limiter", RateLimiter({}))
+    assert polite_get("https://api.test/x").status_code == 200
+    assert sent[1] - sent[0] >= 0.19
+
+    answers[:] = [(429, {"Retry-After": "3600"})]
+    assert polite_get("https://api.test/x").status_code == 429  # too long to wait here
@@ -0,0 +1,105 @@
+import time
+import threading
+from argparse import Namespace
+
+import pytest
+from scripts import input_parser
+from scripts.dispatcher import Dispatcher
+from scripts.scheduler import Scheduler, parse_priorities
+
+
+def test_costs_are_learned_and_persist(tmp_path):
+    db = tmp_path / "stats.db"
+    with Scheduler(db_path=db) as scheduler:
+        assert scheduler.expected_cost("username_search") == 300.0  # prior
+        scheduler.record("username_search", 10.0, ok=True)
+        scheduler.record("username_search", 20.0, ok=False)
+        assert scheduler.stats["username_search"]["samples"] == 2
+        latency = 0.8 * 10.0 + 0.2 * 20.0
+        assert scheduler.expected_cost("username_search") == pytest.approx(latency / 0.8)
+
+    with Scheduler(db_path=db) as reopened:
+        assert reopened.expected_cost("username_search") == pytest.approx(latency / 0.8)
+        assert reopened.summary()["domain_ip_lookup"]["samples"] == 0
+
+
+def test_order_by_strategy_and_priority(tmp_path):
+    lookups = [
+        ("username_search", "alice"),
+        ("phone_lookup", "+15551234567"),
+        ("domain_ip_lookup", "example.com"),
+    ]
+    with Scheduler("sejf", db_path=tmp_path / "s.db") as scheduler:
+        assert [m for m, _ in scheduler.order(lookups)] == [
+            "domain_ip_lookup", "phone_lookup", "username_search"
+        ]
+        assert scheduler.order(lookups, {"alice": 1})[0] == ("username_search", "alice")
+    with Scheduler("ljf", db_path=tmp_path / "s.db") as scheduler:
+        assert scheduler.order(lookups)[0][0] == "username_search"
+    with Scheduler("fifo", db_path=tmp_path / "s.db") as scheduler:
+        assert scheduler.order(lookups) == lookups
+    with pytest.raises(ValueError):
+        Scheduler("random", db_path=tmp_path / "s.db")
+
+
+def test_parse_priorities():
+    assert parse_priorities(["@alice=5", "example.com=-1"]) == {"alice": 5, "example.com": -1}
+    assert parse_priorities(None) == {}
+    with pytest.raises(ValueError):
+        parse_priorities(["alice"])
+
+
+def test_dispatcher_starts_cheapest_queued_job_first(tmp_path):
+    started = []
+    gate = threading.Event()
+
+    def job(name):
+        started.append(name)
+        if name == "blocker":
+            gate.wait(5)
+        return name
+
+    with Scheduler(db_path=tmp_path / "s.db") as scheduler:
+        with Dispatcher(max_workers=1, scheduler=scheduler) as dispatcher:
+            # Jobs feed their timing back, so the first two use other modules
+            dispatcher.submit("setup", job, "blocker")
+            dispatcher.submit("username_search", job, "slow")
+            dispatcher.submit("phone_lookup", job, "medium")
+            dispatcher.submit("domain_ip_lookup", job, "fast")
+            dispatcher.submit("social_discovery", job, "urgent", priority=1)
+            gate.set()
+        assert started == ["blocker", "urgent", "fast", "medium", "slow"]
+        assert scheduler.stats["phone_lookup"]["samples"] == 1
+
+
+def test_waiting_jobs_age_ahead_of_cheaper_ones(tmp_path):
+    with Scheduler(db_path=tmp_path / "s.db") as scheduler:
+        # A username scan queued for longer than its cost beats a fresh DNS lookup
+        assert scheduler.score("username_search", 301.0) < scheduler.score("domain_ip_lookup", 0.0)
+
+
+def test_dispatch_gets_first_result_from_the_cheapest_module(monkeypatch):
+    finished = []
+    lock = threading.Lock()
+
+    def make(module, delay):
+        def lookup(item, **kwargs):
+            time.sleep(delay)
+            with lock:
+                finished.append(module)
+            return item
+
+        return lookup
+
+    monkeypatch.setattr(input_parser, "search_username", make("username_search", 0.3))
+    monkeypatch.setattr(input_parser, "social_discovery", make("social_discovery", 0.1))
+    monkeypatch.setattr(input_parser, "domain_ip_lookup", make("domain_ip_lookup", 0.01))
+    buckets = {"username": ["alice", "bob"], "domain": ["example.com"]}
+
+    input_parser.dispatch(buckets, Namespace(concurrency=1))
+    assert finished[0] == "domain_ip_lookup"
+    assert finished[-2:] == ["username_search", "username_search"]
+
+    finished.clear()
+    input_parser.dispatch(buckets, Namespace(concurrency=1, priority=["bob=1"], schedule="fifo"))
+    assert finished[:2] == ["username_search", "social_discovery"]  # bob first
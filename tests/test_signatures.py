@@ -0,0 +1,79 @@
+import random
+
+from modules.username_search.utils import false_positive_reason, filter_false_positives
+from modules.social_media_discovery.utils import BodyScanner, platform_rule
+from scripts.signatures import NEGATIVE, POSITIVE, Signatures, compile_signatures
+
+
+def test_one_pass_reports_every_marker_with_its_kind():
+    signatures = Signatures(positive=["og:profile"], negative=["not found", "page not found"])
+    text = "<meta OG:Profile> ... Page Not Found ... not found"
+    assert signatures.matches(text) == [
+        (POSITIVE, "og:profile"),
+        (NEGATIVE, "page not found"),  # the longer marker wins at its position
+        (NEGATIVE, "not found"),
+    ]
+    assert signatures.search(text, 10) == (NEGATIVE, "page not found")
+    assert Signatures().search(text) is None and Signatures().matches(text) == []
+
+
+def brute_force_matches(markers, text):
+    # Earliest position first, then the longest marker starting there
+    found, pos = [], 0
+    while True:
+        hits = [(text.find(m, pos), -len(m), m) for m in markers if text.find(m, pos) != -1]
+        if not hits:
+            return found
+        at, _, marker = min(hits)
+        found.append(marker)
+        pos = at + len(marker)
+
+
+def test_shared_prefixes_match_like_a_marker_by_marker_scan():
+    rng = random.Random(5)
+    markers = {"".join(rng.choices("ab ", k=rng.randint(1, 5))) for _ in range(30)}
+    signatures = Signatures(negative=markers)
+    for _ in range(200):
+        text = "".join(rng.choices("ab c", k=rng.randint(0, 40)))
+        expected = brute_force_matches(markers, text)
+        assert [marker for _, marker in signatures.matches(text)] == expected
+
+
+def test_binary_signatures_and_compile_cache():
+    signatures = compile_signatures((), ("doesn’t exist",), binary=True)
+    assert signatures is compile_signatures((), ("doesn’t exist",), binary=True)
+    assert signatures.search("This page DOESN’T EXIST".encode()) == (
+        NEGATIVE, "doesn’t exist".encode()
+    )
+    # A marker listed on both sides counts as negative
+    assert Signatures(["404"], ["404"]).search("404") == (NEGATIVE, "404")
+
+
+def test_body_scanner_is_decided_by_the_first_marker():
+    rule = platform_rule({"found_markers": ["og:profile"], "not_found_markers": ["no such user"]})
+    scanner = BodyScanner(rule)
+    assert scanner.feed(b'<meta property="og:profile"> footer: 404 links') is True
+    assert scanner.reason == (POSITIVE, b"og:profile")
+
+    scanner = BodyScanner(rule)
+    assert scanner.feed(b"<h1>No such USER</h1> og:profile") is False
+    assert scanner.reason == (NEGATIVE, b"no such user")
+
+
+def test_url_filter_keeps_genuine_profiles_and_explains_drops():
+    entries = [
+        {"site": "GitHub", "url": "https://github.com/alice"},
+        {"site": "Foo", "url": "https://foo.com/Login?next=/alice"},
+        {"site": "localhost", "url": "http://localhost/alice"},
+        {"site": "Bar", "url": "https://bar.com/"},
+        {"site": "Baz", "url": ""},
+    ]
+    assert filter_false_positives(entries) == entries[:1]
+    assert false_positive_reason(entries[1]) == "URL contains 'login'"
+    assert false_positive_reason(entries[2]) == "ignored site localhost"
+    assert false_positive_reason(entries[3]) == "bare site root"
+
+    errorist = {"site": "Qux", "url": "https://qux.com/errorist"}
+    assert false_positive_reason(errorist) == "URL contains 'error'"
+    shadowed = Signatures(positive=["errorist"], negative=["error"])
+    assert false_positive_reason(errorist, shadowed) is None
@@ -0,0 +1,162 @@
+import time
+import asyncio
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from modules.social_media_discovery.async_probe import ProbeEngine, make_connector
+from modules.social_media_discovery.utils import BodyScanner, platform_rule, validate_url
+
+DELAY = 0.2
+
+
+class Profiles(BaseHTTPRequestHandler):
+    """/user* exists, /soft* is a 200 "not found" page, anything else 404s."""
+
+    hits = []
+
+    def do_GET(self):
+        self.hits.append(self.path)
+        time.sleep(DELAY)
+        if self.path.startswith("/user"):
+            status, body = 200, b"<html>profile</html>"
+        elif self.path.startswith("/soft"):
+            status, body = 200, b"<html>Page Not Found</html>"
+        elif self.path.startswith("/heavy"):
+            status, body = 200, b"<html>" + b"x" * 2_000_000 + b"not found</html>"
+        elif self.path.startswith("/busy"):
+            status, body = 429, b""
+        else:
+            status, body = 404, b""
+        self.send_response(status)
+        if status == 429:
+            self.send_header("Retry-After", "0")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class Server(ThreadingHTTPServer):
+    request_queue_size = 128
+    daemon_threads = True
+
+
+@pytest.fixture
+def server():
+    httpd = Server(("127.0.0.1", 0), Profiles)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+
+
+def test_probe_checks_all_urls_in_about_one_round_trip(server):
+    urls = [f"{server}/{kind}{i}" for i in range(10) for kind in ("user", "soft", "gone")]
+    with ProbeEngine(concurrency=64, limit_per_host=0, timeout=5) as engine:
+        start = time.perf_counter()
+        found = engine.probe(urls)
+        elapsed = time.perf_counter() - start
+    assert found == [url.rsplit("/", 1)[1].startswith("user") for url in urls]
+    assert elapsed < DELAY * 5  # 30 sequential requests would take 6 s
+
+
+def test_per_host_limit_and_failures(server):
+    with ProbeEngine(concurrency=64, limit_per_host=2, timeout=5) as engine:
+        start = time.perf_counter()
+        assert engine.probe([f"{server}/user{i}" for i in range(4)]) == [True] * 4
+        assert time.perf_counter() - start >= DELAY * 2  # two rounds of two
+        assert engine.probe(["http://127.0.0.1:1/user"]) == [False]
+
+
+def test_socks5h_proxy_resolves_through_the_proxy():
+    async def build():
+        connector = make_connector("socks5h://127.0.0.1:9050", 8, 2)
+        await connector.close()
+        return connector
+
+    connector = asyncio.run(build())
+    assert connector.limit == 8 and connector.limit_per_host == 2
+    assert connector._rdns is True
+
+
+def test_scanner_stops_at_markers_split_across_chunks():
+    scanner = BodyScanner(platform_rule({"found_markers": ["og:Profile"]}))
+    assert scanner.feed(b"<html>... Page Not F") is None
+    assert scanner.feed(b"OUND ...") is False
+
+    scanner = BodyScanner(platform_rule({"found_markers": ["og:Profile"]}))
+    assert scanner.feed(b'<meta property="OG:PRO') is None
+    assert scanner.feed(b'FILE">') is True
+    assert scanner.result() is True
+
+    capped = BodyScanner(platform_rule({"inspect_bytes": 10}))
+    assert capped.feed(b"x" * 8) is None
+    assert capped.feed(b"xx404") is True  # the marker lies past the cap
+
+
+class FakeResponse:
+    def __init__(self, status, headers, chunks):
+        self.status_code, self.headers, self.chunks = status, headers, chunks
+        self.read = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+    def iter_content(self, size):
+        for chunk in self.chunks:
+            self.read += 1
+            yield chunk
+
+
+class FakeSession:
+    def __init__(self, response):
+        self.response = response
+
+    def get(self, url, **kwargs):
+        assert kwargs["stream"] is True
+        return self.response
+
+
+def test_validate_url_reads_only_what_it_needs():
+    page = FakeResponse(200, {"Content-Type": "text/html"}, [b"a" * 8192] * 256)
+    rule = platform_rule({"inspect_bytes": 16384})
+    assert validate_url("https://a.test/page", session=FakeSession(page), rule=rule)
+    assert page.read == 2  # not the 2 MB body
+    # The verdict is cached: asking again does not touch the session
+    assert validate_url("https://a.test/page", session=None, rule=rule)
+
+    soft = FakeResponse(200, {}, [b"x" * 100, b"This page doesn\xe2\x80\x99t exist", b"y"])
+    assert not validate_url("https://a.test/soft", session=FakeSession(soft))
+    assert soft.read == 2
+
+    image = FakeResponse(200, {"Content-Type": "image/png"}, [b"404"])
+    assert validate_url("https://a.test/image", session=FakeSession(image)) and image.read == 0
+    missing = FakeResponse(404, {}, [b""])
+    assert not validate_url("https://a.test/gone", session=FakeSession(missing))
+    assert missing.read == 0
+
+
+def test_engine_streams_heavy_pages_up_to_the_rule(server):
+    with ProbeEngine(concurrency=8, limit_per_host=0, timeout=5) as engine:
+        found = engine.probe(
+            [f"{server}/heavy1", f"{server}/heavy2"],
+            [platform_rule(), platform_rule({"inspect_bytes": 3_000_000})],
+        )
+    # The soft-404 text sits after 2 MB: only a rule that reads that far sees it
+    assert found == [True, False]
+
+
+def test_probe_verdicts_are_served_from_the_response_cache(server):
+    urls = [f"{server}/user1", f"{server}/gone1", "http://127.0.0.1:1/user", f"{server}/busy"]
+    Profiles.hits.clear()
+    with ProbeEngine(concurrency=8, limit_per_host=0, timeout=5) as engine:
+        assert engine.probe(urls) == [True, False, False, False]
+        assert engine.probe(urls) == [True, False, False, False]
+    # Found and missing profiles were cached; errors and throttling were not
+    assert sorted(Profiles.hits) == ["/busy", "/busy", "/gone1", "/user1"]
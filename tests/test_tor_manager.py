@@ -0,0 +1,275 @@
+import socket
+import struct
+import threading
+from types import SimpleNamespace
+from socketserver import StreamRequestHandler, ThreadingTCPServer
+
+import pytest
+from python_socks.sync import Proxy
+
+from scripts import tor_manager
+from scripts.tor_manager import TorManager, TorUnavailable, bootstrap_progress
+
+
+class Server(ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, handler, port=0):
+        super().__init__(("127.0.0.1", port), handler)
+        self.log = []
+        self.phases = [100]
+        self.thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self.thread.start()
+
+    @property
+    def port(self):
+        return self.server_address[1]
+
+    def close(self):
+        self.shutdown()
+        self.server_close()
+
+
+class ControlPort(StreamRequestHandler):
+    """Tor control protocol stand-in: no auth, scripted bootstrap progress."""
+
+    def reply(self, *lines):
+        self.wfile.write("".join(line + "\r\n" for line in lines).encode())
+
+    def handle(self):
+        for raw in self.rfile:
+            command = raw.decode().strip()
+            self.server.log.append(command)
+            keyword, _, arg = command.partition(" ")
+            if keyword == "PROTOCOLINFO":
+                self.reply(
+                    "250-PROTOCOLINFO 1",
+                    "250-AUTH METHODS=NULL",
+                    '250-VERSION Tor="0.4.8.10"',
+                    "250 OK",
+                )
+            elif keyword == "GETINFO" and arg == "status/bootstrap-phase":
+                phases = self.server.phases
+                progress = phases.pop(0) if len(phases) > 1 else phases[0]
+                self.reply(
+                    f"250-status/bootstrap-phase=NOTICE BOOTSTRAP PROGRESS={progress} TAG=x",
+                    "250 OK",
+                )
+            elif keyword == "GETCONF":
+                self.reply(f"250 {arg}")
+            elif keyword == "QUIT":
+                self.reply("250 closing connection")
+                return
+            elif keyword in ("AUTHENTICATE", "SETEVENTS", "SIGNAL"):
+                self.reply("250 OK")
+            else:
+                self.reply(f'510 Unrecognized command "{keyword}"')
+
+
+class Socks(StreamRequestHandler):
+    """SOCKS5 stand-in recording (username, password, host) per connection."""
+
+    def handle(self):
+        _, count = self.rfile.read(2)
+        methods = self.rfile.read(count)
+        login = (None, None)
+        if 2 in methods:
+            self.wfile.write(b"\x05\x02")
+            _, size = self.rfile.read(2)
+            user = self.rfile.read(size).decode()
+            size = self.rfile.read(1)[0]
+            login = (user, self.rfile.read(size).decode())
+            self.wfile.write(b"\x01\x00")
+        else:
+            self.wfile.write(b"\x05\x00")
+        _, _, _, kind = self.rfile.read(4)
+        if kind == 3:
+            host = self.rfile.read(self.rfile.read(1)[0]).decode()
+        else:
+            host = socket.inet_ntoa(self.rfile.read(4))
+        struct.unpack("!H", self.rfile.read(2))
+        self.server.log.append((*login, host))
+        self.wfile.write(b"\x05\x00\x00\x01" + b"\x00" * 6)
+
+
+@pytest.fixture(autouse=True)
+def quick_polls(monkeypatch):
+    monkeypatch.setattr(tor_manager, "POLL_INTERVAL", 0.01)
+
+
+@pytest.fixture
+def control():
+    server = Server(ControlPort)
+    yield server
+    server.close()
+
+
+@pytest.fixture
+def socks():
+    server = Server(Socks)
+    yield server
+    server.close()
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def manager(control_port, socks_port=9050, **settings):
+    return TorManager(
+        {
+            "proxy_url": f"socks5h://127.0.0.1:{socks_port}",
+            "controller": {
+                "control_port": control_port,
+                "launch": "none",
+                "bootstrap_timeout": 5,
+                "circuits": 3,
+                **settings,
+            },
+        }
+    )
+
+
+def fetch(proxy_url):
+    """Open a connection through `proxy_url` the way a SOCKS client would."""
+    _, rest = proxy_url.split("://", 1)
+    sock = Proxy.from_url("socks5://" + rest, rdns=True).connect("example.onion", 80, timeout=5)
+    sock.close()
+
+
+def test_bootstrap_progress_parses_phase():
+    assert bootstrap_progress('NOTICE BOOTSTRAP PROGRESS=85 TAG=ap_conn SUMMARY="x"') == 85
+    assert bootstrap_progress("") == 0
+
+
+def test_start_waits_for_full_bootstrap(control):
+    control.phases = [10, 50, 100]
+    with manager(control.port) as tor:
+        assert tor.running
+        assert control.log.count("GETINFO status/bootstrap-phase") == 3
+        tor.start()  # already up: no second wait
+        assert control.log.count("GETINFO status/bootstrap-phase") == 3
+
+
+def test_stalled_bootstrap_times_out(control):
+    control.phases = [40]
+    tor = manager(control.port, bootstrap_timeout=0.2)
+    with pytest.raises(TorUnavailable, match="40%"):
+        tor.start()
+    assert not tor.running
+    tor.stop()
+
+
+def test_missing_tor_is_reported_without_launching(monkeypatch):
+    monkeypatch.setattr(tor_manager.subprocess, "run", lambda *a, **k: pytest.fail("launched"))
+    with pytest.raises(TorUnavailable):
+        manager(free_port(), free_port()).start()
+
+
+def test_failed_start_is_cached(monkeypatch):
+    tor = manager(free_port(), free_port())
+    with pytest.raises(TorUnavailable):
+        tor.start()
+    monkeypatch.setattr(tor, "_connect", lambda: pytest.fail("retried"))
+    with pytest.raises(TorUnavailable, match="No Tor control port"):
+        tor.start()
+
+
+def systemctl_stub(monkeypatch, active, on_start=None):
+    """Record systemctl verbs; `is-active` answers per `active`."""
+    calls = []
+
+    def run(cmd, check):
+        calls.append(cmd[1])
+        if cmd[1] == "start" and on_start:
+            on_start()
+        return SimpleNamespace(returncode=0 if cmd[1] == "is-active" and active else 3)
+
+    monkeypatch.setattr(tor_manager.subprocess, "run", run)
+    return calls
+
+
+def test_systemctl_start_once_then_stop_what_we_started(monkeypatch):
+    port = free_port()
+    servers = []
+
+    def start():
+        server = Server(ControlPort, port)
+        server.phases = [0, 100]
+        servers.append(server)
+
+    calls = systemctl_stub(monkeypatch, active=False, on_start=start)
+    tor = manager(port, free_port(), launch="systemctl")
+    tor.start()
+    tor.start()
+    tor.stop()
+    servers[0].close()
+    assert calls == ["is-active", "start", "stop"]
+
+
+def test_running_service_without_control_port_is_used_over_socks(monkeypatch, socks):
+    calls = systemctl_stub(monkeypatch, active=True)
+    tor = manager(free_port(), socks.port, launch="systemctl").start()
+    assert tor.running and tor.socks_only
+    # No NEWNYM without a control port, but later logins still move on
+    before = tor.proxy("alice")
+    assert not tor.rotate()
+    assert tor.proxy("alice") != before
+    fetch(tor.proxy("alice"))
+    tor.stop()
+    # Not ours: never started, never stopped
+    assert calls == []
+
+
+def test_active_service_is_waited_for_but_not_owned(monkeypatch):
+    port = free_port()
+    calls = systemctl_stub(monkeypatch, active=True)
+    tor = manager(port, free_port(), launch="systemctl", bootstrap_timeout=2)
+    servers = []
+    # The service opens its control port a moment after we look
+    timer = threading.Timer(0.1, lambda: servers.append(Server(ControlPort, port)))
+    timer.start()
+    tor.start()
+    tor.stop()
+    timer.join()
+    servers[0].close()
+    assert calls == ["is-active"]
+
+
+def test_attached_tor_is_left_running(control, monkeypatch):
+    monkeypatch.setattr(tor_manager.subprocess, "run", lambda *a, **k: pytest.fail("systemctl"))
+    tor = manager(control.port, launch="systemctl").start()
+    tor.stop()
+    assert tor.controller is None and not tor.running
+
+
+def test_pool_gives_isolated_socks_logins(socks):
+    tor = manager(9051, socks.port)
+    for url in [tor.proxy("alice"), tor.proxy("alice"), *tor.proxies()]:
+        fetch(url)
+    users = [user for user, _, _ in socks.log]
+    assert users[0] == users[1]
+    assert len(set(users[2:])) == 3
+    assert {host for _, _, host in socks.log} == {"example.onion"}
+    # Round robin without a key
+    assert len({tor.proxy() for _ in range(3)}) == 3
+
+
+def test_rotate_sends_newnym_and_renews_logins(control, socks):
+    tor = manager(control.port, socks.port).start()
+    before = tor.proxy("alice")
+    assert tor.rotate()
+    after = tor.proxy("alice")
+    fetch(before)
+    fetch(after)
+    assert "SIGNAL NEWNYM" in control.log
+    (user1, pass1, _), (user2, pass2, _) = socks.log
+    assert user1 == user2 and pass1 != pass2
+    # Tor takes one NEWNYM per ten seconds; credentials still move on
+    assert not tor.rotate()
+    assert control.log.count("SIGNAL NEWNYM") == 1
+    assert tor.proxy("alice") != after
+    tor.stop()
@@ -0,0 +1,112 @@
+import json
+from enum import Enum
+from types import SimpleNamespace
+
+from modules.username_search import maigret_driver, username_search, utils
+from modules.username_search.maigret_driver import is_claimed, report_from_results
+from scripts.tor_manager import TorUnavailable
+
+
+def never(what):
+    raise AssertionError(f"{what} should not run")
+
+
+class Status(Enum):
+    CLAIMED = "Claimed"
+    AVAILABLE = "Available"
+
+
+def results():
+    """Maigret-style results: check objects with an enum status, site objects with tags."""
+    return {
+        "GitHub": {
+            "site": SimpleNamespace(tags=["coding"]),
+            "status": SimpleNamespace(status=Status.CLAIMED),
+            "url_user": "https://github.com/alice",
+        },
+        "Reddit": {
+            "site": SimpleNamespace(tags=[]),
+            "status": SimpleNamespace(status=Status.AVAILABLE),
+            "url_user": "https://www.reddit.com/user/alice",
+        },
+        "Broken": {"site": None, "status": None},
+    }
+
+
+def test_is_claimed_reads_enum_or_plain_status():
+    assert is_claimed(SimpleNamespace(status=Status.CLAIMED))
+    assert is_claimed("Claimed")
+    assert not is_claimed(SimpleNamespace(status=Status.AVAILABLE))
+    assert not is_claimed(None)
+
+
+def test_report_from_results_matches_parser_shape():
+    report = report_from_results("alice", results())
+    assert report["username"] == "alice"
+    assert report["sites"]["GitHub"] == {
+        "status": "claimed",
+        "url_user": "https://github.com/alice",
+        "category": None,
+        "tags": ["coding"],
+    }
+    assert report["sites"]["Reddit"]["status"] == "available"
+    assert report["sites"]["Broken"]["status"] == "available"
+
+
+def test_parse_username_output_takes_in_memory_report(monkeypatch, tmp_path):
+    indexed = []
+    monkeypatch.setattr(utils, "OUTPUT_DIR", tmp_path)
+    monkeypatch.setattr(utils, "index_output", lambda path, doc=None: indexed.append(doc))
+    report = report_from_results("alice", results())
+
+    path = utils.parse_username_output({"method": "maigret", "username": "alice", "report": report})
+
+    with open(path) as f:
+        normalized = json.load(f)
+    assert normalized["username"] == "alice"
+    assert [entry["site"] for entry in normalized["found_on"]] == ["GitHub"]
+    assert indexed == [normalized]
+    # Only the normalized document is written; no raw report lands on disk
+    assert [p.name.split("_")[0] for p in tmp_path.iterdir()] == ["normalized"]
+
+
+def test_search_username_uses_driver_when_available(monkeypatch, tmp_path):
+    monkeypatch.setattr(utils, "OUTPUT_DIR", tmp_path)
+    monkeypatch.setattr(utils, "index_output", lambda path, doc=None: None)
+    monkeypatch.setattr(maigret_driver, "available", lambda: True)
+    monkeypatch.setattr(username_search, "run_maigret", lambda u: never("subprocess"))
+    searched = []
+
+    class Driver:
+        def search(self, username, timeout=None, proxy=None):
+            searched.append(username)
+            return report_from_results(username, results())
+
+    monkeypatch.setattr(username_search, "get_driver", lambda: Driver())
+
+    result = username_search.search_username("alice")
+
+    assert searched == ["alice"]
+    assert result["method"] == "maigret"
+    assert result["normalized"] == result["file"]
+
+
+def test_search_username_keeps_subprocess_without_library(monkeypatch):
+    monkeypatch.setattr(maigret_driver, "available", lambda: False)
+    monkeypatch.setattr(username_search, "get_driver", lambda: never("driver"))
+    monkeypatch.setattr(username_search, "run_maigret", lambda u: None)
+    monkeypatch.setattr(username_search, "run_sherlock", lambda u: None)
+
+    assert username_search.search_username("alice") == {"error": "Both tools failed"}
+
+
+def test_maigret_is_skipped_when_tor_is_required_but_down(monkeypatch):
+    class Down:
+        def start(self):
+            raise TorUnavailable("no control port")
+
+    monkeypatch.setitem(username_search.config, "use_tor", True)
+    monkeypatch.setattr(username_search, "get_tor", lambda: Down())
+    monkeypatch.setattr(username_search, "get_driver", lambda: never("driver"))
+
+    assert username_search.search_maigret("alice") is None
@@ -0,0 +1,194 @@
+import time
+import threading
+
+import pytest
+from scripts import input_parser, worker as worker_module
+from scripts.work_queue import DONE, FAILED, QUEUED, open_work_queue
+from scripts.correlation_engine import index_output
+from scripts.work_queue import ROOT
+from scripts.worker import Worker, copy_outputs, jobs_for, outputs_store, submit
+
+
+@pytest.fixture(params=["sqlite", "file"])
+def queue_url(request, tmp_path):
+    location = tmp_path / ("queue.db" if request.param == "sqlite" else "queue")
+    return f"{request.param}:{location}"
+
+
+class Calls(list):
+    peak = 0
+
+
+@pytest.fixture
+def fake_lookups(monkeypatch, tmp_path):
+    """
+    Replace every lookup with a 50 ms fake that records (module, selector),
+    and the most lookups that ever ran at once in `calls.peak`.
+    """
+    outputs = tmp_path / "outputs"
+    outputs.mkdir()
+    monkeypatch.setattr(worker_module, "OUTPUT_DIR", outputs)
+    calls = Calls()
+    active = [0]
+    lock = threading.Lock()
+
+    def make(module):
+        def lookup(item, **kwargs):
+            with lock:
+                active[0] += 1
+                calls.peak = max(calls.peak, active[0])
+            time.sleep(0.05)
+            with lock:
+                active[0] -= 1
+                calls.append((module, item))
+            path = outputs / f"{module}_{item}.json"
+            path.write_text("{}")
+            return str(path)
+
+        return lookup
+
+    for name, module in [
+        ("phone_lookup", "phone_lookup"),
+        ("verify_email", "email_verification"),
+        ("search_username", "username_search"),
+        ("social_discovery", "social_discovery"),
+        ("domain_ip_lookup", "domain_ip_lookup"),
+    ]:
+        monkeypatch.setattr(input_parser, name, make(module))
+    return calls
+
+
+def test_submit_fans_out_and_dedupes(queue_url):
+    with open_work_queue(queue_url) as queue:
+        assert submit(queue, ["@alice", "example.com", "!!!"], options={"user_id": "42"}) == 3
+        assert submit(queue, ["alice"]) == 0
+        assert queue.stats() == {QUEUED: 3, "leased": 0, DONE: 0, FAILED: 0}
+    jobs = list(jobs_for(["@alice"], {"user_id": "42", "ignored": "x"}))
+    assert {j["module"] for j in jobs} == {"username_search", "social_discovery"}
+    assert jobs[0]["options"] == {"user_id": "42"}
+
+
+def test_lease_is_exclusive_and_expires(queue_url):
+    with open_work_queue(queue_url) as a, open_work_queue(queue_url) as b:
+        a.put([{"module": "domain_ip_lookup", "category": "domain", "selector": "example.com"}])
+        lease = a.lease("a", lease_seconds=0.3)
+        assert lease["attempts"] == 1
+        assert b.lease("b", lease_seconds=0.3) is None
+        assert a.heartbeat(lease, lease_seconds=0.3)
+
+        time.sleep(0.4)  # worker "a" died without heartbeating
+        taken = b.lease("b", lease_seconds=5)
+        assert taken["selector"] == "example.com" and taken["attempts"] == 2
+        assert not a.heartbeat(lease) and not a.complete(lease, "stale")
+        assert b.complete(taken, "data/outputs/x.json", "data/outputs/x.json")
+        assert b.stats()[DONE] == 1
+
+
+def test_file_queue_recovers_a_job_abandoned_while_finishing(tmp_path):
+    with open_work_queue(f"file:{tmp_path / 'queue'}") as queue:
+        queue.put([{"module": "domain_ip_lookup", "category": "domain", "selector": "example.com"}])
+        lease = queue.lease("a", lease_seconds=0.2)
+        # Worker "a" dies after claiming the file, before writing done/
+        queue._write = lambda *args, **kwargs: 1 / 0
+        with pytest.raises(ZeroDivisionError):
+            queue.complete(lease, "lost")
+        del queue._write
+
+        assert queue.lease("b") is None
+        time.sleep(0.3)
+        taken = queue.lease("b")
+        assert taken["id"] == lease["id"] and taken["attempts"] == 2
+        assert not queue.complete(lease, "stale")
+        assert queue.complete(taken, "ok")
+        assert queue.stats() == {QUEUED: 0, "leased": 0, DONE: 1, FAILED: 0}
+
+
+def test_failed_job_is_retried_after_backoff(queue_url):
+    with open_work_queue(queue_url) as queue:
+        queue.put([{"module": "phone_lookup", "category": "phone", "selector": "+15551234567"}])
+        lease = queue.lease("w")
+        assert queue.fail(lease, "boom", retry_at=time.time() + 0.2)
+        assert queue.lease("w") is None
+        time.sleep(0.25)
+        retry = queue.lease("w")
+        assert retry["attempts"] == 2
+        assert queue.fail(retry, "boom again")
+        assert queue.stats()[FAILED] == 1
+
+
+def test_workers_share_the_queue_and_scale(queue_url, fake_lookups, tmp_path):
+    selectors = [f"host{i}.example.com" for i in range(24)]
+    with open_work_queue(queue_url) as queue:
+        submit(queue, selectors)
+    counts = []
+
+    def run(n):
+        with open_work_queue(queue_url) as queue:
+            counts.append(
+                Worker(
+                    queue, worker_id=f"w{n}", concurrency=1, poll_seconds=0.01,
+                    outputs=tmp_path / "store",
+                ).run(exit_when_empty=True)
+            )
+
+    threads = [threading.Thread(target=run, args=(n,)) for n in range(3)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert sorted(s for _, s in fake_lookups) == sorted(selectors)  # each exactly once
+    assert sum(c["done"] for c in counts) == len(selectors)
+    # Single-slot workers only overlap lookups when they drain the queue together
+    assert fake_lookups.peak > 1
+    assert (tmp_path / "store" / "domain_ip_lookup_host0.example.com.json").exists()
+
+
+def test_copy_outputs_maps_files_into_the_store(tmp_path):
+    source, store = tmp_path / "src", tmp_path / "store"
+    source.mkdir()
+    (source / "a.json").write_text("{}")
+    a = str(source / "a.json")
+    assert copy_outputs([a, a, source / "gone.json"], store) == {a: str(store / "a.json")}
+    assert (store / "a.json").read_text() == "{}"
+    # Already in the store: nothing to copy
+    kept = str(store / "a.json")
+    assert copy_outputs([kept], store) == {kept: kept}
+    assert sorted(p.name for p in store.iterdir()) == ["a.json"]
+
+
+def test_outputs_store_resolution(monkeypatch, tmp_path):
+    monkeypatch.setattr(worker_module, "load_work_config", lambda: {"outputs": "shared/out"})
+    assert outputs_store() == ROOT / "shared/out"
+    assert outputs_store(tmp_path) == tmp_path
+    monkeypatch.setattr(worker_module, "load_work_config", lambda: {})
+    assert outputs_store() == worker_module.OUTPUT_DIR
+
+
+def test_worker_copies_only_what_the_job_wrote(tmp_path, monkeypatch):
+    outputs, store = tmp_path / "outputs", tmp_path / "store"
+    outputs.mkdir()
+    (outputs / "unrelated.json").write_text("{}")
+    monkeypatch.setattr(worker_module, "OUTPUT_DIR", outputs)
+
+    def lookup(item, **kwargs):
+        raw, normalized = outputs / f"raw_{item}.json", outputs / f"normalized_{item}.json"
+        for path in (raw, normalized):
+            path.write_text("{}")
+            index_output(path, {})
+        return {"file": str(raw)}
+
+    monkeypatch.setattr(input_parser, "domain_ip_lookup", lookup)
+    with open_work_queue(f"sqlite:{tmp_path / 'queue.db'}") as queue:
+        submit(queue, ["example.com"])
+        counts = Worker(queue, concurrency=1, poll_seconds=0.01, outputs=store).run(
+            exit_when_empty=True
+        )
+        job = queue.conn.execute("SELECT result_path FROM work").fetchone()
+
+    assert counts["done"] == 1
+    assert sorted(p.name for p in store.iterdir()) == [
+        "normalized_example.com.json",
+        "raw_example.com.json",
+    ]
+    assert job[0] == str(store / "raw_example.com.json")
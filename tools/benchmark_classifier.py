@@ -0,0 +1,108 @@
+import re
+import time
+import random
+
+from scripts.classifier import INVALID, PATTERNS, classify_bulk, detect_input_type
+
+DEFAULT_LINES = 1_000_000
+
+# The per-pattern loop detect_input_type used before the combined classifier
+LEGACY_PATTERNS = {
+    "phone": re.compile(r"^\+?\d[\d\s\-\(\)\.]+$"),
+    "email": re.compile(r"^[^@]+@[^@]+\.[^@]+$"),
+    "ip": re.compile(r"^(?:\d{1,3}\.){3}\d{1,3}$"),
+    "domain": re.compile(r"^[A-Za-z0-9\.\-]+\.[A-Za-z]{2,}$"),
+    "username": re.compile(r"^@?[A-Za-z0-9_.\-]{3,}$"),
+}
+
+_SHAPES = [
+    lambda r, i: f"user{i}@example.com",
+    lambda r, i: f"{r.randrange(1, 256)}.{r.randrange(256)}.{r.randrange(256)}.{r.randrange(256)}",
+    lambda r, i: f"+1555{i % 10_000_000:07d}",
+    lambda r, i: f"({r.randrange(200, 999)}) {r.randrange(100, 999)}-{i % 10_000:04d}",
+    lambda r, i: f"host{i}.example.org",
+    lambda r, i: f"@handle_{i}",
+    lambda r, i: f"john.doe{i}",
+    lambda r, i: "not a selector!",
+]
+
+
+def synthetic_lines(n: int, seed: int = 0) -> list:
+    """A deterministic mix of every selector shape plus some noise."""
+    rng = random.Random(seed)
+    return [rng.choice(_SHAPES)(rng, i) for i in range(n)]
+
+
+def legacy_classify(lines: list) -> dict:
+    buckets = {t: [] for t in LEGACY_PATTERNS}
+    buckets["invalid"] = []
+    for item in lines:
+        item = item.strip()
+        if not item:
+            continue
+        for t, rx in LEGACY_PATTERNS.items():
+            if rx.fullmatch(item):
+                buckets[t].append(item)
+                break
+        else:
+            buckets["invalid"].append(item)
+    return buckets
+
+
+def per_item_classify(lines: list) -> dict:
+    buckets = {t: [] for t in [*PATTERNS, INVALID]}
+    for item in lines:
+        item = item.strip()
+        if item:
+            buckets[detect_input_type(item) or INVALID].append(item)
+    return buckets
+
+
+def benchmark(n: int = DEFAULT_LINES, seed: int = 0) -> list:
+    """Time each classifier over the same `n` lines; returns one row per mode."""
+    lines = synthetic_lines(n, seed)
+    buffer = "\n".join(lines)
+    modes = [
+        ("legacy loop", lambda: legacy_classify(lines)),
+        ("detect_input_type loop", lambda: per_item_classify(lines)),
+        ("classify_bulk(list)", lambda: classify_bulk(lines)),
+        ("classify_bulk(buffer)", lambda: classify_bulk(buffer)),
+    ]
+    rows = []
+    for name, run in modes:
+        start = time.perf_counter()
+        buckets = run()
+        elapsed = time.perf_counter() - start
+        rows.append(
+            {
+                "mode": name,
+                "wall_s": round(elapsed, 3),
+                "lines_per_s": round(n / elapsed),
+                "counts": {k: len(v) for k, v in buckets.items()},
+            }
+        )
+    return rows
+
+
+def print_report(rows: list):
+    baseline = rows[0]["wall_s"]
+    print(f"{'mode':<26}{'wall s':>10}{'M lines/s':>12}{'speedup':>10}")
+    for row in rows:
+        print(
+            f"{row['mode']:<26}{row['wall_s']:>10}{row['lines_per_s'] / 1e6:>12.2f}"
+            f"{baseline / row['wall_s']:>9.1f}x"
+        )
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmark bulk input classification")
+    parser.add_argument("--lines", type=int, default=DEFAULT_LINES)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+    print_report(benchmark(args.lines, args.seed))
+
+
+if __name__ == "__main__":
+    main()
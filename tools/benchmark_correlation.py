@@ -0,0 +1,255 @@
+import io
+import sys
+import json
+import time
+import random
+import resource
+import tempfile
+import contextlib
+from pathlib import Path
+
+from scripts import correlation_engine, correlation_index
+from scripts.correlation_index import CorrelationIndex
+from scripts.correlation_query import query_entity
+from tools.synthetic_corpus import DEFAULT_OVERLAP, SyntheticCorpus, generate_corpus
+
+DEFAULT_SIZES = (1_000, 10_000)
+TOUCH_FRACTION = 0.01
+QUERY_SAMPLES = 100
+# Allowed slowdown against a baseline before a phase counts as a regression
+DEFAULT_TOLERANCE = 0.25
+
+
+def _proc_io() -> dict:
+    """Bytes this process has read and written (Linux /proc/self/io), or {}."""
+    try:
+        with open("/proc/self/io") as f:
+            return {k: int(v) for k, v in (line.split(": ") for line in f)}
+    except OSError:
+        return {}
+
+
+def _reset_peak_rss() -> bool:
+    """Reset VmHWM so the next reading is the peak of one phase (Linux only)."""
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def _peak_rss_mb() -> float:
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    own = int(line.split()[1])
+                    break
+            else:
+                raise OSError
+    except OSError:
+        own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    return round(max(own, children) / 1024, 1)
+
+
+def _index_mb(db_path: Path) -> float:
+    size = sum(
+        p.stat().st_size
+        for p in (db_path, db_path.with_name(db_path.name + "-wal"))
+        if p.exists()
+    )
+    return round(size / 2**20, 2)
+
+
+@contextlib.contextmanager
+def measure(phase: str, results: list, db_path: Path):
+    """Record wall time, peak RSS and I/O for the enclosed phase."""
+    _reset_peak_rss()
+    io_before = _proc_io()
+    start = time.perf_counter()
+    record = {"phase": phase}
+    yield record
+    record["wall_s"] = round(time.perf_counter() - start, 3)
+    record["peak_rss_mb"] = _peak_rss_mb()
+    io_after = _proc_io()
+    if io_after:
+        record["read_mb"] = round((io_after["rchar"] - io_before["rchar"]) / 2**20, 2)
+        record["write_mb"] = round((io_after["wchar"] - io_before["wchar"]) / 2**20, 2)
+    record["index_mb"] = _index_mb(db_path)
+    results.append(record)
+
+
+@contextlib.contextmanager
+def isolated_paths(workdir: Path):
+    """Point the correlation engine at a scratch output dir, result file and index."""
+    saved = (
+        correlation_engine.OUTPUT_DIR,
+        correlation_engine.CORRELATED_OUTPUT,
+        correlation_index.CACHE_DB,
+    )
+    correlation_engine.OUTPUT_DIR = workdir / "outputs"
+    correlation_engine.CORRELATED_OUTPUT = workdir / "correlated_results.json"
+    correlation_index.CACHE_DB = workdir / "cache.db"
+    try:
+        yield correlation_engine.OUTPUT_DIR, correlation_index.CACHE_DB
+    finally:
+        (
+            correlation_engine.OUTPUT_DIR,
+            correlation_engine.CORRELATED_OUTPUT,
+            correlation_index.CACHE_DB,
+        ) = saved
+
+
+def benchmark_size(
+    artifacts: int, overlap: float = DEFAULT_OVERLAP, seed: int = 0, workers: int = 1
+) -> dict:
+    """
+    Run every correlation phase against one synthetic corpus: generate,
+    cold sync, correlate, warm rerun, incremental rerun (1% of outputs
+    changed), a rerun after one new output and queries.
+    """
+    results = []
+    with tempfile.TemporaryDirectory() as tmp, isolated_paths(Path(tmp)) as (
+        out_dir,
+        db_path,
+    ), contextlib.redirect_stdout(io.StringIO()):
+        with measure("generate", results, db_path):
+            paths = generate_corpus(out_dir, artifacts, overlap=overlap, seed=seed)
+
+        with measure("cold_sync", results, db_path) as record:
+            with CorrelationIndex() as index:
+                record["changed"] = correlation_engine.sync_index(index, workers=workers)
+
+        with measure("correlate", results, db_path):
+            correlation_engine.correlate_data(workers=workers)
+        with open(correlation_engine.CORRELATED_OUTPUT) as f:
+            correlated = json.load(f)
+
+        with measure("warm_rerun", results, db_path):
+            correlation_engine.correlate_data(workers=workers)
+
+        rng = random.Random(seed)
+        touched = rng.sample(paths, max(1, int(len(paths) * TOUCH_FRACTION)))
+        for path in touched:
+            with open(path, "a") as f:
+                f.write("\n")
+        with measure("incremental", results, db_path) as record:
+            record["touched"] = len(touched)
+            correlation_engine.correlate_data(workers=workers)
+
+        # The corpus continued by one artifact, as a finished lookup would add it
+        corpus = SyntheticCorpus(seed=seed, overlap=overlap)
+        for i in range(artifacts + 1):
+            name, doc = corpus.output(i)
+        with open(out_dir / name, "w") as f:
+            json.dump(doc, f, indent=4)
+        with measure("add_one", results, db_path):
+            correlation_engine.correlate_data(workers=workers)
+
+        with CorrelationIndex() as index:
+            seeds = [
+                (etype, value)
+                for etype, values in index.shared_values().items()
+                for value in values
+            ]
+            seeds = rng.sample(seeds, min(QUERY_SAMPLES, len(seeds)))
+            with measure("query_2hop", results, db_path) as record:
+                for etype, value in seeds:
+                    query_entity(index, etype, value, hops=2)
+                record["queries"] = len(seeds)
+
+    return {
+        "artifacts": artifacts,
+        "overlap": overlap,
+        "workers": workers,
+        "shared": {
+            section: len(correlated[section])
+            for section in correlation_engine.ENTITY_SECTIONS.values()
+        },
+        "clusters": len(correlated["clusters"]),
+        "phases": results,
+    }
+
+
+def compare(report: list, baseline: list, tolerance: float = DEFAULT_TOLERANCE) -> list:
+    """Return a message for every phase slower than its baseline by more than `tolerance`."""
+    expected = {
+        (run["artifacts"], phase["phase"]): phase["wall_s"]
+        for run in baseline
+        for phase in run["phases"]
+    }
+    regressions = []
+    for run in report:
+        for phase in run["phases"]:
+            before = expected.get((run["artifacts"], phase["phase"]))
+            # Sub-10ms phases are dominated by noise
+            if before is None or max(before, phase["wall_s"]) < 0.01:
+                continue
+            if phase["wall_s"] > before * (1 + tolerance):
+                regressions.append(
+                    f"{run['artifacts']} artifacts / {phase['phase']}: "
+                    f"{phase['wall_s']}s vs baseline {before}s"
+                )
+    return regressions
+
+
+def print_report(report: list):
+    header = f"{'phase':<12}{'wall s':>10}{'peak MB':>10}{'read MB':>10}{'write MB':>10}{'index MB':>10}"
+    for run in report:
+        print(
+            f"\n📊 {run['artifacts']} artifacts (overlap {run['overlap']}, "
+            f"{run['workers']} workers) — {run['clusters']} clusters"
+        )
+        print(header)
+        for p in run["phases"]:
+            print(
+                f"{p['phase']:<12}{p['wall_s']:>10}{p['peak_rss_mb']:>10}"
+                f"{p.get('read_mb', '-'):>10}{p.get('write_mb', '-'):>10}{p['index_mb']:>10}"
+            )
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmark the correlation engine")
+    parser.add_argument(
+        "--sizes",
+        type=int,
+        nargs="+",
+        default=list(DEFAULT_SIZES),
+        help="Corpus sizes (artifact counts) to benchmark.",
+    )
+    parser.add_argument("--overlap", type=float, default=DEFAULT_OVERLAP)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--output", type=Path, help="Write the report as JSON.")
+    parser.add_argument(
+        "--baseline", type=Path, help="Fail if any phase is slower than this report."
+    )
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    args = parser.parse_args(argv)
+
+    report = [
+        benchmark_size(n, overlap=args.overlap, seed=args.seed, workers=args.workers)
+        for n in args.sizes
+    ]
+    print_report(report)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=4)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(report, json.load(f), args.tolerance)
+        for message in regressions:
+            print(f"❌ Regression: {message}")
+        if regressions:
+            sys.exit(1)
+        print("\n✅ No regressions against baseline.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+import json
+import random
+from pathlib import Path
+from datetime import datetime, timedelta
+
+# Relative frequency of each producer in a generated corpus
+DEFAULT_MIX = {
+    "phone_lookup": 2,
+    "email_verification": 3,
+    "normalized_username": 2,
+    "normalized_social": 1,
+    "domain_ip_lookup": 3,
+    "darkweb": 1,
+}
+DEFAULT_OVERLAP = 0.2
+
+SITES = ["github", "twitter", "reddit", "instagram", "gitlab", "keybase", "medium"]
+BREACHES = [
+    "Adobe", "Canva", "Dropbox", "LinkedIn", "MyFitnessPal", "Zynga", "Dubsmash",
+    "Verifications.io", "Collection1", "Gravatar", "Twitter200M", "Wattpad",
+]
+TLDS = ["com", "net", "org", "io", "ru", "info"]
+_SYLLABLES = [c + v for c in "bcdfghjklmnprstvz" for v in "aeiou"]
+_EPOCH = datetime(2024, 1, 1)
+
+
+class SyntheticCorpus:
+    """
+    Deterministic generator of module outputs shaped like the real ones.
+
+    Every identifying value (phone, handle, domain, IP, breach, keyword) is
+    drawn from a small shared pool with probability `overlap` and is random
+    otherwise, so the overlap rate directly controls how many entities the
+    correlation engine finds shared between artifacts. A quarter of shared
+    handles are respelled (case, separators, leetspeak) to exercise fuzzy
+    matching.
+    """
+
+    def __init__(self, seed: int = 0, overlap: float = DEFAULT_OVERLAP, mix=None):
+        if not 0.0 <= overlap <= 1.0:
+            raise ValueError("overlap must be between 0 and 1")
+        self.rng = random.Random(seed)
+        self.overlap = overlap
+        self.mix = mix or DEFAULT_MIX
+        self.producers = list(self.mix)
+        self.weights = [self.mix[p] for p in self.producers]
+        self.counter = 0
+        self.pools = {}
+
+    def _word(self) -> str:
+        return "".join(self.rng.choices(_SYLLABLES, k=self.rng.randint(2, 4)))
+
+    def _fresh(self, kind: str) -> str:
+        self.counter += 1
+        n = self.counter
+        if kind == "phone":
+            return f"+1{self.rng.randint(2000000000, 9999999999)}"
+        if kind == "handle":
+            return f"{self._word()}{self.rng.choice(['', '_', '.'])}{self._word()}"
+        if kind == "domain":
+            return f"{self._word()}.{self.rng.choice(TLDS)}"
+        if kind == "ip":
+            return f"10.{n >> 16 & 255}.{n >> 8 & 255}.{n & 255}"
+        if kind == "keyword":
+            return self._word()
+        raise ValueError(kind)
+
+    def _respell(self, handle: str) -> str:
+        variant = handle.replace("_", "").replace(".", "")
+        if self.rng.random() < 0.5:
+            variant = variant.replace("o", "0").replace("e", "3")
+        return variant.capitalize() if self.rng.random() < 0.5 else variant
+
+    def value(self, kind: str) -> str:
+        """A fresh value, or with probability `overlap` one from the shared pool."""
+        if self.rng.random() >= self.overlap:
+            return self._fresh(kind)
+        pool = self.pools.setdefault(kind, [self._fresh(kind) for _ in range(64)])
+        value = self.rng.choice(pool)
+        if kind == "handle" and self.rng.random() < 0.25:
+            return self._respell(value)
+        return value
+
+    def output(self, i: int) -> tuple:
+        """Return (filename, document) for the i-th artifact."""
+        producer = self.rng.choices(self.producers, self.weights)[0]
+        stamp = (_EPOCH + timedelta(seconds=i)).strftime("%Y%m%d_%H%M%S")
+        doc, subject = getattr(self, f"_{producer}")()
+        safe = "".join(c if c.isalnum() else "_" for c in subject)
+        return f"{producer}_{safe}_{stamp}.json", doc
+
+    def _phone_lookup(self):
+        e164 = self.value("phone")
+        local = e164[2:]
+        doc = {
+            "Numverify scan": [f"https://numverify.com/lookup/{local}"],
+            "Googlesearch scan": [
+                f"https://www.google.com/search?q=%22{local}%22",
+                f"https://www.google.com/search?q=intext%3A%22{e164}%22",
+            ],
+            "Raw local": local,
+            "Local": f"({local[:3]}) {local[3:6]}-{local[6:]}",
+            "E164": e164,
+            "International": e164[1:],
+        }
+        return doc, e164
+
+    def _email_verification(self):
+        user = self.value("handle")
+        domain = self.value("domain")
+        breaches = self.rng.sample(BREACHES, self.rng.randint(0, 4))
+        doc = {"xposed_breaches": breaches}
+        if breaches:
+            doc["h8mail_output"] = "\n".join(
+                f"[>] {user}@{domain} BREACH {b}" for b in breaches
+            )
+        return doc, f"{user}_at_{domain}"
+
+    def _found_on(self, handle: str) -> list:
+        return [
+            {
+                "site": site,
+                "url": f"https://{site}.com/{handle}",
+                "category": "social",
+                "tags": [],
+            }
+            for site in self.rng.sample(SITES, self.rng.randint(1, 4))
+        ]
+
+    def _normalized_username(self):
+        handle = self.value("handle")
+        doc = {"username": handle, "method": "maigret", "found_on": self._found_on(handle)}
+        return doc, handle
+
+    def _normalized_social(self):
+        handle = self.value("handle")
+        doc = {
+            "username": handle,
+            "found_on": self._found_on(handle),
+            "method": "social_media_discovery",
+            "timestamp": _EPOCH.isoformat(),
+        }
+        return doc, handle
+
+    def _domain_ip_lookup(self):
+        if self.rng.random() < 0.5:
+            ip = self.value("ip")
+            doc = {
+                "target": ip,
+                "type": "ip",
+                "reverse_dns": "",
+                "ip_geolocation": json.dumps({"country": "US", "org": "Example"}),
+                "asn_info": "",
+                "blacklists": json.dumps({"zen.spamhaus.org": False}),
+            }
+            return doc, ip
+        domain = self.value("domain")
+        doc = {
+            "target": domain,
+            "type": "domain",
+            "resolved_ip": self.value("ip"),
+            "dns_records": json.dumps({"A": [], "MX": [f"mail.{domain}"]}),
+            "whois": json.dumps({"registrar": "Example Registrar"}),
+        }
+        return doc, domain
+
+    def _darkweb(self):
+        keyword = self.value("keyword")
+        links = [
+            {"title": f"Result for {keyword}", "link": f"http://{self.value('keyword')}.onion"}
+            for _ in range(self.rng.randint(0, 3))
+        ]
+        doc = {
+            "keyword": keyword,
+            "darksearch": links,
+            "torbot": [],
+            "timestamp": _EPOCH.isoformat(),
+            "source": "darkweb",
+        }
+        return doc, keyword
+
+
+def generate_corpus(
+    out_dir, artifacts: int, overlap: float = DEFAULT_OVERLAP, seed: int = 0, mix=None
+) -> list:
+    """Write `artifacts` synthetic outputs into `out_dir`; returns their paths."""
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    corpus = SyntheticCorpus(seed=seed, overlap=overlap, mix=mix)
+    paths = []
+    for i in range(artifacts):
+        name, doc = corpus.output(i)
+        path = out_dir / name
+        with open(path, "w") as f:
+            json.dump(doc, f, indent=4)
+        paths.append(path)
+    return paths